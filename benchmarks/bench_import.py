@@ -0,0 +1,62 @@
+"""
+Замер стоимости импорта модулей exap_api.
+
+Каждый импорт выполняется в отдельном процессе (холодный sys.modules),
+берётся медиана по нескольким повторам. Заодно проверяется, что решатели
+не подтягивают GUI и графику.
+
+Запуск: python -m benchmarks.bench_import [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "exap_api",
+    "exap_api.utils",
+    "exap_api.dinic",
+    "exap_api.johnson",
+    "exap_api.main",
+]
+
+GUI_MODULES = ("tkinter", "matplotlib")
+
+_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "gui": [m for m in {gui!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 5) -> dict:
+    times = []
+    gui = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, gui=GUI_MODULES)],
+                             capture_output=True, text=True, check=True).stdout
+        data = json.loads(out.strip().splitlines()[-1])
+        times.append(data["seconds"])
+        gui = data["gui"]
+    return {"name": f"import:{module}", "seconds": statistics.median(times), "gui_modules": gui}
+
+
+def run(repeat: int = 5) -> list:
+    return [measure_import(module, repeat) for module in MODULES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for row in run(args.repeat):
+        gui = ", ".join(row["gui_modules"]) or "—"
+        print(f"{row['name']:<28} {row['seconds'] * 1000:8.1f} ms   GUI: {gui}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Детерминированные генераторы графов для бенчмарков.
+
+Обёртки над exap_api.generators: все принимают seed и возвращают
+(граф, позиции) в формате редактора GraphApp — вершины именуются
+строками, позиции лежат в квадрате [-10, 10] x [-10, 10], чтобы
+эвристика A* работала в тех же масштабах.
+"""
+from exap_api import generators as _gen
+
+
+def random_sparse(n: int, avg_degree: float = 3.0, seed: int = 0):
+    """
+    Случайный ориентированный граф с ~avg_degree исходящими рёбрами на вершину.
+
+    Содержит случайное остовное дерево, поэтому граф слабо связен
+    и подходит для алгоритма Прима.
+    """
+    return _gen.to_editor_graph(*_gen.erdos_renyi(n, avg_degree=avg_degree, seed=seed))
+
+
+def random_dense(n: int, p: float = 0.5, seed: int = 0):
+    """Граф Эрдёша–Реньи G(n, p) с положительными весами"""
+    return _gen.to_editor_graph(*_gen.erdos_renyi(n, p=p, seed=seed, connected=False))
+
+
+def grid(rows: int, cols: int, seed: int = 0):
+    """Решётка с рёбрами в обе стороны; вес близок к длине ребра"""
+    return _gen.to_editor_graph(*_gen.grid(rows, cols, seed=seed))
+
+
+def layered_flow(layers: int, width: int, seed: int = 0):
+    """
+    Слоистая сеть для максимального потока.
+
+    Исток 's' добавляется первым, сток 't' последним, поэтому после
+    networkx_to_dinic_format их индексы равны 0 и n - 1. Пропускные
+    способности хранятся в атрибуте weight, как их читает конвертер.
+    """
+    return _gen.to_editor_graph(*_gen.layered_flow(layers, width, seed=seed))
+
+
+def negative_dag(n: int, p: float = 0.2, seed: int = 0):
+    """Ациклический граф (рёбра только i -> j при i < j) с отрицательными весами"""
+    return _gen.to_editor_graph(*_gen.negative_dag(n, p=p, seed=seed))
+
+
+def geometric(n: int, avg_degree: float = 6.0, seed: int = 0):
+    """Случайный геометрический граф; евклидово расстояние — нижняя оценка пути"""
+    return _gen.to_editor_graph(*_gen.geometric(n, avg_degree=avg_degree, seed=seed))
@@ -0,0 +1,232 @@
+"""
+Набор бенчмарков для алгоритмов и конвертеров.
+
+Запуск:
+    python -m benchmarks.run                       # быстрый набор, вывод в консоль
+    python -m benchmarks.run --preset full -o out.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline       # перезаписать эталон
+
+Результаты сохраняются в JSON. При сравнении с эталоном случай считается
+регрессией, если его время выросло больше чем на --tolerance (по умолчанию
+25 %) и при этом больше чем на --min-delta секунд (шумовой порог для
+коротких случаев); при регрессиях код возврата равен 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from exap_api.dinic import DinicSolver
+from exap_api.johnson import JohnsonSolver
+from exap_api.scc import SCCSolver
+from exap_api.mst import MSTSolver
+from exap_api.astar import AStarSolver
+from exap_api.utils import (networkx_to_dinic_format, networkx_to_adjacency_list_with_labels,
+                            convert_to_networkx, adjacency_list_to_networkx)
+
+from . import generators
+from .bench_import import run as run_import_benchmarks
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+PRESETS = {
+    "quick": {
+        "sparse": [200, 1000],
+        "dense": [60],
+        "grid": [(15, 15)],
+        "flow": [(6, 10)],
+        "dag": [40],
+        "geometric": [500],
+        "repeat": 5,
+    },
+    "full": {
+        "sparse": [200, 1000, 2000],
+        "dense": [60, 150],
+        "grid": [(15, 15), (40, 40)],
+        "flow": [(6, 10), (12, 30)],
+        "dag": [40, 80],
+        "geometric": [500, 5000],
+        "repeat": 5,
+    },
+}
+
+
+def _measure(setup, func, repeat):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return {"seconds": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def _astar_case(graph, pos, start, goal):
+    # Время запроса вместе с переводом графа в CompactGraph, как при вызове из редактора
+    def search():
+        solver = AStarSolver.from_networkx(graph, pos)
+        index = solver.graph.index
+        solver.search(index[start], index[goal])
+    return search
+
+
+def build_cases(preset: dict):
+    """Возвращает список (имя, setup, func); setup вызывается перед каждым повтором"""
+    cases = []
+
+    for n in preset["sparse"]:
+        g, pos = generators.random_sparse(n, seed=n)
+        tag = f"sparse[n={n}]"
+        cases.append((f"utils.networkx_to_dinic_format/{tag}", lambda g=g: (g,), networkx_to_dinic_format))
+        cases.append((f"utils.networkx_to_adjacency_list_with_labels/{tag}", lambda g=g: (g,),
+                      networkx_to_adjacency_list_with_labels))
+        adj, labels = networkx_to_adjacency_list_with_labels(g)
+        cases.append((f"utils.adjacency_list_to_networkx/{tag}", lambda a=adj, l=labels: (a, l),
+                      adjacency_list_to_networkx))
+        residual, res_labels = networkx_to_dinic_format(g)
+        cases.append((f"utils.convert_to_networkx/{tag}", lambda r=residual, l=res_labels: (r, l),
+                      convert_to_networkx))
+        cases.append((f"scc.find_components/{tag}", lambda g=g: (g,),
+                      lambda g: SCCSolver.from_networkx(g).find_components()))
+        cases.append((f"mst.solve/{tag}", lambda g=g: (g,), lambda g: MSTSolver.from_networkx(g).solve()))
+        cases.append((f"astar.search/{tag}", tuple, _astar_case(g, pos, '0', str(n - 1))))
+
+    for n in preset["dense"]:
+        g, pos = generators.random_dense(n, seed=n)
+        tag = f"dense[n={n}]"
+        cases.append((f"mst.solve/{tag}", lambda g=g: (g,), lambda g: MSTSolver.from_networkx(g).solve()))
+        cases.append((f"scc.find_components/{tag}", lambda g=g: (g,),
+                      lambda g: SCCSolver.from_networkx(g).find_components()))
+
+    for rows, cols in preset["grid"]:
+        g, pos = generators.grid(rows, cols, seed=rows)
+        tag = f"grid[{rows}x{cols}]"
+        goal = f"{rows - 1}_{cols - 1}"
+        cases.append((f"astar.search/{tag}", tuple, _astar_case(g, pos, '0_0', goal)))
+
+    for n in preset.get("geometric", []):
+        g, pos = generators.geometric(n, seed=n)
+        tag = f"geometric[n={n}]"
+        cases.append((f"astar.search/{tag}", tuple, _astar_case(g, pos, '0', str(n - 1))))
+
+    for layers, width in preset["flow"]:
+        g, _ = generators.layered_flow(layers, width, seed=layers)
+        tag = f"layered[{layers}x{width}]"
+
+        def flow_setup(g=g):
+            adjacency, _ = networkx_to_dinic_format(g)
+            return DinicSolver(len(adjacency), adjacency), len(adjacency)
+
+        cases.append((f"dinic.max_flow/{tag}", flow_setup, lambda solver, n: solver.max_flow(0, n - 1)))
+
+    for n in preset["dag"]:
+        g, _ = generators.negative_dag(n, seed=n)
+        tag = f"negative_dag[n={n}]"
+
+        def johnson_setup(g=g):
+            adjacency, _ = networkx_to_adjacency_list_with_labels(g)
+            return JohnsonSolver(len(adjacency), adjacency),
+
+        cases.append((f"johnson.johnsons_algorithm/{tag}", johnson_setup,
+                      lambda solver: solver.johnsons_algorithm()))
+
+    return cases
+
+
+def run(preset_name: str = "quick", pattern: str = None, with_imports: bool = False) -> dict:
+    preset = PRESETS[preset_name]
+    results = []
+    for name, setup, func in build_cases(preset):
+        if pattern and pattern not in name:
+            continue
+        row = {"name": name}
+        try:
+            row.update(_measure(setup, func, preset["repeat"]))
+        except RecursionError:
+            row["error"] = "RecursionError"
+        results.append(row)
+        _print_row(row)
+
+    if with_imports:
+        for row in run_import_benchmarks():
+            results.append(row)
+            _print_row(row)
+
+    return {
+        "meta": {
+            "preset": preset_name,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def _print_row(row):
+    if "error" in row:
+        print(f"{row['name']:<70} {row['error']}")
+    else:
+        print(f"{row['name']:<70} {row['seconds'] * 1000:10.2f} ms")
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta: float = 0.0) -> list:
+    """Возвращает список регрессий (имя, эталон, текущее, отношение)"""
+    base = {row["name"]: row for row in baseline["results"] if "seconds" in row}
+    regressions = []
+    for row in current["results"]:
+        old = base.get(row["name"])
+        if old is None:
+            continue
+        if "seconds" not in row:
+            regressions.append((row["name"], old["seconds"], None, None))
+            continue
+        ratio = row["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        if ratio > 1 + tolerance and row["seconds"] - old["seconds"] > min_delta:
+            regressions.append((row["name"], old["seconds"], row["seconds"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("-k", dest="pattern", help="запускать только случаи, содержащие подстроку")
+    parser.add_argument("-o", "--output", help="файл для JSON-результатов")
+    parser.add_argument("--baseline", help="JSON-эталон для сравнения")
+    parser.add_argument("--save-baseline", action="store_true", help=f"записать результаты в {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=0.005)
+    parser.add_argument("--imports", action="store_true", help="добавить замер времени импорта")
+    args = parser.parse_args()
+
+    current = run(args.preset, args.pattern, args.imports)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\nРегрессии (больше чем на {args.tolerance:.0%}):")
+            for name, old, new, ratio in regressions:
+                if new is None:
+                    print(f"  {name}: ошибка (эталон {old * 1000:.2f} ms)")
+                else:
+                    print(f"  {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms (x{ratio:.2f})")
+            sys.exit(1)
+        print("\nРегрессий нет.")
+
+
+if __name__ == "__main__":
+    main()
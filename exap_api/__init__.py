@@ -1 +1,7 @@
-from .main import ExapApi
\ No newline at end of file
+# GUI (tkinter, matplotlib) подгружается только при первом обращении к ExapApi,
+# чтобы решатели и утилиты импортировались быстро и на машинах без дисплея.
+def __getattr__(name):
+    if name == "ExapApi":
+        from .main import ExapApi
+        return ExapApi
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,217 @@
+import heapq
+
+import numpy as np
+
+from exap_api.compact import CompactGraph
+from exap_api.dataclass import Result
+from .Bidirectional import BidirectionalSolver
+
+INF = float('inf')
+
+
+class AStarSolver:
+    """
+    Поиск кратчайшего пути A* на CompactGraph.
+
+    Открытое множество — двоичная куча пар (f, вершина) с ленивым
+    удалением: при улучшении g в кучу кладётся новая запись, а устаревшие
+    (f больше текущего f вершины или вершина уже закрыта) пропускаются при
+    извлечении. Закрытые вершины не переоткрываются, как и раньше.
+
+    Эвристика до цели считается один раз на запрос для всех вершин сразу
+    (массив NumPy, затем список для горячего цикла). По умолчанию это
+    heuristic_to(goal): евклидово расстояние по координатам xy, умноженное
+    на euclidean_scale(), — веса рёбер не обязаны следовать геометрии, и
+    без множителя оценка могла бы превысить настоящее расстояние. С
+    ориентирами heuristic_to(goal, landmarks) — оценка ALT. Обе оценки
+    согласованы: закрытые вершины переоткрывать не нужно.
+
+    При trace=True в self.trace пишется таблица шагов с содержимым
+    открытого множества, а в self.result — шаг на каждую раскрытую
+    вершину; без трассировки открытое множество не строится.
+    """
+
+    def __init__(self, graph: CompactGraph, xy: np.ndarray = None, trace: bool = False):
+        self.graph = graph
+        self.n = graph.n
+        self.xy = None if xy is None else np.asarray(xy, dtype=float).reshape(-1, 2)
+        self.trace_enabled = trace
+        self.trace: list[str] = []
+        self.result = Result()
+        self.metrics = self.result.metrics
+        self.found = False
+        self.path: list[int] = []
+        self.cost = INF
+        self.expanded = 0
+        self.step_count = 0
+        self._snapshot = None
+        self._scale = None
+        # Задача exap_api.executor.Job при фоновом запуске: точки отмены и прогресс
+        self.job = None
+
+    @classmethod
+    def from_networkx(cls, graph, pos: dict, trace: bool = False) -> "AStarSolver":
+        """pos — координаты вершин {метка: (x, y)}, как в редакторе"""
+        return cls.from_compact(CompactGraph.from_networkx(graph), pos, trace)
+
+    @classmethod
+    def from_compact(cls, compact: CompactGraph, pos: dict, trace: bool = False) -> "AStarSolver":
+        xy = np.array([pos[node] for node in compact.labels], dtype=float)
+        return cls(compact, xy, trace)
+
+    def _log(self, title: str, data: str = ""):
+        # Граф при поиске не меняется: все шаги делят один снимок
+        self.step_count += 1
+        self.metrics.count("snapshots")
+        with self.metrics.phase("snapshot"):
+            if self._snapshot is None:
+                self._snapshot = self.graph.to_networkx()
+        self.result.add_step(f"{self.step_count}. {title}", self._snapshot, data)
+
+    def euclidean_to(self, goal: int) -> np.ndarray:
+        """Евклидово расстояние от каждой вершины до goal"""
+        return np.sqrt(((self.xy - self.xy[goal]) ** 2).sum(axis=1))
+
+    def euclidean_scale(self) -> float:
+        """
+        Наименьшее отношение веса ребра к его длине на плоскости: вес любого
+        пути не меньше его длины, умноженной на это число, а значит, и
+        евклидова расстояния между концами. Рёбра нулевой длины не
+        ограничивают множитель; при отрицательных весах он равен 0.
+        """
+        if self._scale is None:
+            src, dst = self.graph.sources(), self.graph.indices
+            length = np.sqrt(((self.xy[src] - self.xy[dst]) ** 2).sum(axis=1))
+            spread = length > 0
+            ratios = self.graph.weights[spread] / length[spread]
+            self._scale = max(float(ratios.min()), 0.0) if len(ratios) else 1.0
+        return self._scale
+
+    def has_negative_weights(self) -> bool:
+        return bool((self.graph.weights < 0).any())
+
+    def heuristic_to(self, goal: int, landmarks=None) -> np.ndarray:
+        """Нижняя оценка dist(v, goal): ALT по ориентирам, без них — евклидова с множителем euclidean_scale()"""
+        if landmarks is not None:
+            return landmarks.lower_bounds(goal)
+        return self.euclidean_to(goal) * self.euclidean_scale()
+
+    def heuristic_from(self, start: int, landmarks=None) -> np.ndarray:
+        """Оценка dist(start, v) того же вида — для обратной стороны двунаправленного поиска"""
+        if landmarks is not None:
+            return landmarks.lower_bounds_from(start)
+        return self.euclidean_to(start) * self.euclidean_scale()
+
+    def compare_bidirectional(self, start: int, goal: int, landmarks=None) -> list:
+        """
+        Тот же запрос двунаправленным Дейкстрой и двунаправленным A* с теми
+        же оценками. Возвращает [(название, решатель)], первым — этот A*
+        (search должен быть уже выполнен). Если оценки не согласованы,
+        двунаправленный A* сам переходит на Дейкстру, и название это отражает.
+        """
+        reverse = self.graph.reverse()
+        bounds = (self.heuristic_to(goal, landmarks), self.heuristic_from(start, landmarks))
+        runs = [("A* (однонаправленный)", self)]
+        for title, h in (("Дейкстра (двунаправленный)", ()), ("A* (двунаправленный)", bounds)):
+            solver = BidirectionalSolver(self.graph, reverse)
+            solver.job = self.job
+            solver.search(start, goal, *h)
+            if solver.fallback:
+                title = "A* (двунаправл. → Дейкстра)"
+            runs.append((title, solver))
+        return runs
+
+    def protocol(self) -> list:
+        """Таблица шагов (только при trace=True)"""
+        return ["\n" + "-" * 80,
+                f"{'Шаг':<4} | {'Текущая':<10} | {'g(текущей)':<10} | {'f(текущей)':<10} | "
+                f"{'Открытое множество (вершина: f)':<40}",
+                "-" * 80] + self.trace
+
+    def report(self) -> list:
+        """Строки итога для найденного пути"""
+        labels = self.graph.labels
+        return [f"Кратчайший путь: {' → '.join(labels[v] for v in self.path)}",
+                f"Стоимость пути: {self.cost:.2f}",
+                f"Количество шагов: {self.expanded}"]
+
+    def search(self, start: int, goal: int, heuristic=None) -> list:
+        """Возвращает путь (номера вершин) или [], если цель недостижима"""
+        with self.metrics.phase("heuristic"):
+            h = (self.heuristic_to(goal) if heuristic is None else np.asarray(heuristic, dtype=float)).tolist()
+        with self.metrics.phase("search"):
+            self._search(start, goal, h)
+        self.metrics.count("expanded", self.expanded)
+        return self.path
+
+    def _search(self, start: int, goal: int, h: list):
+        indptr, indices, weights = self.graph.adjacency_lists()
+        labels = self.graph.labels
+        trace = self.trace_enabled
+        n = self.n
+        g_score = [INF] * n
+        f_score = [INF] * n
+        parent = [-1] * n
+        closed = [False] * n
+        g_score[start] = 0
+        f_score[start] = h[start]
+        heap = [(f_score[start], start)]
+        open_set = {start} if trace else None
+        expanded = 0
+        pushes = 1
+        job = self.job
+        self.found = False
+
+        while heap:
+            f, current = heapq.heappop(heap)
+            if closed[current] or f > f_score[current]:
+                continue
+            closed[current] = True
+            expanded += 1
+            if job is not None and not expanded & 1023:
+                job.tick(expanded, n, "раскрыто вершин")
+
+            if trace:
+                logged = len(self.trace)
+                open_set.discard(current)
+                open_str = ", ".join(f"{labels[v]}: {f_score[v]:.2f}" for v in sorted(open_set, key=f_score.__getitem__))
+                self.trace.append(f"{expanded:<4} | {labels[current]:<10} | {g_score[current]:<10.2f} | "
+                                  f"{f_score[current]:<10.2f} | {open_str or '∅'}")
+
+            if current == goal:
+                self.found = True
+                if trace:
+                    self._log(f"Раскрыта {labels[current]} (цель)", "\n".join(self.trace[logged:]))
+                break
+
+            g_current = g_score[current]
+            for p in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[p]
+                if closed[neighbor]:
+                    continue
+                tentative_g = g_current + weights[p]
+                if tentative_g < g_score[neighbor]:
+                    parent[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    f_score[neighbor] = tentative_g + h[neighbor]
+                    heapq.heappush(heap, (f_score[neighbor], neighbor))
+                    pushes += 1
+                    if trace:
+                        open_set.add(neighbor)
+                        self.trace.append(f"      → Обновление {labels[neighbor]}: g={tentative_g:.2f}, "
+                                          f"f={f_score[neighbor]:.2f} (через {labels[current]})")
+            if trace:
+                self._log(f"Раскрыта {labels[current]}", "\n".join(self.trace[logged:]))
+
+        self.expanded = expanded
+        self.metrics.count("heap_pushes", pushes)
+        if self.found:
+            path = [goal]
+            while parent[path[-1]] != -1:
+                path.append(parent[path[-1]])
+            path.reverse()
+            self.path = path
+            self.cost = g_score[goal]
+        else:
+            self.path = []
+            self.cost = INF
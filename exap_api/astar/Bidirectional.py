@@ -0,0 +1,155 @@
+import heapq
+
+import numpy as np
+
+from exap_api.compact import CompactGraph
+from exap_api.dataclass import Result
+
+INF = float('inf')
+
+
+class BidirectionalSolver:
+    """
+    Двунаправленный поиск start -> goal: прямой Дейкстра по графу и
+    обратный по обращённому графу, на каждом шаге раскрывается сторона с
+    меньшим ключом вершины кучи.
+
+    Без эвристик это обычный двунаправленный Дейкстра. С согласованными
+    нижними оценками h_goal(v) <= dist(v, goal) и h_start(v) <= dist(start, v)
+    используется средний потенциал p(v) = (h_goal(v) - h_start(v)) / 2:
+    приведённый вес w(u, v) - p(u) + p(v) неотрицателен в обе стороны, и
+    поиск идёт как двунаправленный Дейкстра по приведённым весам
+    (двунаправленный A*). Длина любого пути start -> goal в приведённых
+    весах отличается от настоящей на константу p(goal) - p(start).
+
+    Остановка: сумма ключей вершин двух куч не меньше лучшего найденного
+    пути mu — более короткого пути уже быть не может.
+    Вершины с бесконечной оценкой (goal из них недостижима или они
+    недостижимы из start) отбрасываются сразу.
+
+    Согласованность оценок проверяется перед поиском: если хоть один
+    приведённый вес отрицателен, потенциал отбрасывается и выполняется
+    двунаправленный Дейкстра (self.fallback = True) — иначе остановка по mu
+    могла бы вернуть не кратчайший путь.
+    """
+
+    def __init__(self, graph: CompactGraph, reverse: CompactGraph = None):
+        self.graph = graph
+        self.reverse = reverse if reverse is not None else graph.reverse()
+        self.n = graph.n
+        self.result = Result()
+        self.metrics = self.result.metrics
+        self.found = False
+        self.path: list[int] = []
+        self.cost = INF
+        self.expanded = 0
+        self.expanded_forward = 0
+        self.expanded_backward = 0
+        self.fallback = False
+        # Задача exap_api.executor.Job при фоновом запуске: точки отмены и прогресс
+        self.job = None
+
+    def search(self, start: int, goal: int, h_goal=None, h_start=None) -> list:
+        """Возвращает путь (номера вершин) или []; без h_goal/h_start — двунаправленный Дейкстра"""
+        with self.metrics.phase("potential"):
+            if h_goal is None or h_start is None:
+                potential = [0.0] * self.n
+                blocked = bytearray(self.n)
+            else:
+                h_goal = np.asarray(h_goal, dtype=float)
+                h_start = np.asarray(h_start, dtype=float)
+                finite = np.isfinite(h_goal) & np.isfinite(h_start)
+                with np.errstate(invalid="ignore"):
+                    potential = np.where(finite, (h_goal - h_start) / 2, 0.0).tolist()
+                blocked = bytearray((~finite).astype(np.uint8).tobytes())
+                self.fallback = not self._consistent(np.array(potential), finite)
+                if self.fallback:
+                    self.metrics.count("fallback")
+                    potential = [0.0] * self.n
+                    blocked = bytearray(self.n)
+        with self.metrics.phase("search"):
+            self._search(start, goal, potential, blocked)
+        self.metrics.count("expanded", self.expanded)
+        return self.path
+
+    def _consistent(self, p: np.ndarray, finite: np.ndarray) -> bool:
+        """Приведённые веса рёбер между вершинами с конечной оценкой неотрицательны"""
+        src, dst = self.graph.sources(), self.graph.indices
+        keep = finite[src] & finite[dst]
+        weights = self.graph.weights[keep]
+        reduced = weights - p[src[keep]] + p[dst[keep]]
+        return bool((reduced >= -1e-9 * np.maximum(1.0, np.abs(weights))).all())
+
+    def _search(self, start: int, goal: int, p: list, blocked: bytearray):
+        n = self.n
+        sides = []
+        for graph, root, sign in ((self.graph, start, 1.0), (self.reverse, goal, -1.0)):
+            indptr, indices, weights = graph.adjacency_lists()
+            dist = [INF] * n
+            dist[root] = 0.0
+            sides.append({"indptr": indptr, "indices": indices, "weights": weights, "sign": sign,
+                          "dist": dist, "parent": [-1] * n, "done": bytearray(n), "heap": [(0.0, root)],
+                          "expanded": 0})
+        forward, backward = sides
+
+        mu = INF
+        meet = None  # (вершина прямой стороны, вершина обратной стороны)
+        job = self.job
+        self.found = False
+
+        while forward["heap"] and backward["heap"]:
+            if forward["heap"][0][0] + backward["heap"][0][0] >= mu:
+                break
+            side, other = (forward, backward) if forward["heap"][0][0] <= backward["heap"][0][0] \
+                else (backward, forward)
+            d, u = heapq.heappop(side["heap"])
+            if side["done"][u] or d > side["dist"][u]:
+                continue
+            side["done"][u] = 1
+            side["expanded"] += 1
+            if job is not None and not side["expanded"] & 1023:
+                job.tick(forward["expanded"] + backward["expanded"], n, "раскрыто вершин")
+
+            indptr, indices, weights = side["indptr"], side["indices"], side["weights"]
+            dist, parent, heap = side["dist"], side["parent"], side["heap"]
+            other_dist = other["dist"]
+            # Прямая сторона: приведённый вес w - p(u) + p(v); обратная идёт по обращённым рёбрам v -> u,
+            # и для исходного ребра v -> u приведённый вес тот же: w - p(v) + p(u)
+            sign = side["sign"]
+            p_u = p[u]
+            for q in range(indptr[u], indptr[u + 1]):
+                v = indices[q]
+                if blocked[v]:
+                    continue
+                nd = d + weights[q] + sign * (p[v] - p_u)
+                if nd < dist[v]:
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(heap, (nd, v))
+                if other_dist[v] < INF and nd + other_dist[v] < mu:
+                    mu = nd + other_dist[v]
+                    meet = (u, v) if side is forward else (v, u)
+
+        self.expanded_forward = forward["expanded"]
+        self.expanded_backward = backward["expanded"]
+        self.expanded = self.expanded_forward + self.expanded_backward
+        if meet is None:
+            self.path = [start] if start == goal else []
+            self.cost = 0.0 if start == goal else INF
+            self.found = start == goal
+            return
+
+        # Путь: start .. a (прямые родители), ребро a -> b, b .. goal (обратные родители)
+        a, b = meet
+        head = [a]
+        while forward["parent"][head[-1]] != -1:
+            head.append(forward["parent"][head[-1]])
+        head.reverse()
+        tail = [b]
+        while backward["parent"][tail[-1]] != -1:
+            tail.append(backward["parent"][tail[-1]])
+        if a == b:
+            tail = tail[1:]
+        self.path = head + tail
+        self.found = True
+        self.cost = mu - p[goal] + p[start]
@@ -0,0 +1,3 @@
+from .AStar import AStarSolver
+from .Bidirectional import BidirectionalSolver
+from .landmarks import Landmarks, LandmarkCache
\ No newline at end of file
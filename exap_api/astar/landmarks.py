@@ -0,0 +1,142 @@
+"""
+Предобработка ALT (A*, Landmarks, Triangle inequality).
+
+Для k ориентиров L хранятся расстояния d(L, v) и d(v, L) до всех вершин.
+По неравенству треугольника для любой цели t
+
+    dist(v, t) >= max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L)),
+
+и эта оценка допустима и согласована, поэтому годится как эвристика A*
+при неотрицательных весах. Расстояния лежат в двух массивах (k, n),
+оценки для цели считаются одной векторной операцией.
+"""
+import heapq
+import time
+
+import numpy as np
+
+from exap_api.compact import CompactGraph
+
+INF = float('inf')
+
+
+def dijkstra_distances(graph: CompactGraph, source: int) -> np.ndarray:
+    """Расстояния от source до всех вершин (inf — недостижима); веса неотрицательны"""
+    indptr, indices, weights = graph.adjacency_lists()
+    dist = [INF] * graph.n
+    done = bytearray(graph.n)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        for p in range(indptr[u], indptr[u + 1]):
+            v = indices[p]
+            nd = d + weights[p]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return np.array(dist)
+
+
+class Landmarks:
+
+    def __init__(self, nodes: np.ndarray, dist_from: np.ndarray, dist_to: np.ndarray, build_time: float = 0.0):
+        self.nodes = nodes          # номера вершин-ориентиров (k,)
+        self.dist_from = dist_from  # d(L, v), (k, n)
+        self.dist_to = dist_to      # d(v, L), (k, n)
+        self.build_time = build_time
+
+    @classmethod
+    def build(cls, graph: CompactGraph, k: int = 8, seed: int = 0, job=None) -> "Landmarks":
+        """
+        Выбор ориентиров «самый дальний»: первый — самая удалённая вершина
+        от случайной, каждый следующий — достижимая вершина с наибольшим
+        расстоянием до ближайшего из уже выбранных. 2k запусков Дейкстры.
+        job — задача exap_api.executor: отмена между запусками.
+        """
+        start = time.perf_counter()
+        n = graph.n
+        k = min(k, n)
+        reverse = graph.reverse()
+        rng = np.random.default_rng(seed)
+
+        probe = dijkstra_distances(graph, int(rng.integers(n)))
+        nodes, dist_from, dist_to = [], [], []
+        nearest = np.full(n, INF)
+        candidate = probe
+        for i in range(k):
+            if job is not None:
+                job.tick(i, k, "ориентиров ALT")
+            reachable = np.isfinite(candidate)
+            if nodes:
+                reachable[nodes] = False
+            if not reachable.any():
+                break
+            landmark = int(np.flatnonzero(reachable)[np.argmax(candidate[reachable])])
+            nodes.append(landmark)
+            dist_from.append(dijkstra_distances(graph, landmark))
+            dist_to.append(dijkstra_distances(reverse, landmark))
+            nearest = np.minimum(nearest, dist_from[-1])
+            candidate = nearest
+        return cls(np.array(nodes, dtype=np.int64), np.array(dist_from), np.array(dist_to),
+                   time.perf_counter() - start)
+
+    @property
+    def k(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dist_from.nbytes + self.dist_to.nbytes
+
+    def lower_bounds(self, goal: int) -> np.ndarray:
+        """Нижние оценки dist(v, goal) для всех v; inf — goal из v недостижима"""
+        with np.errstate(invalid="ignore"):
+            forward = self.dist_from[:, goal, None] - self.dist_from
+            backward = self.dist_to - self.dist_to[:, goal, None]
+            # inf - inf даёт nan: такой ориентир ничего не говорит, fmax его пропускает
+            bound = np.fmax.reduce(np.fmax(forward, backward), axis=0)
+        return self._finish(bound, goal)
+
+    def lower_bounds_from(self, source: int) -> np.ndarray:
+        """Нижние оценки dist(source, v) для всех v (для обратной стороны двунаправленного поиска)"""
+        with np.errstate(invalid="ignore"):
+            forward = self.dist_from - self.dist_from[:, source, None]
+            backward = self.dist_to[:, source, None] - self.dist_to
+            bound = np.fmax.reduce(np.fmax(forward, backward), axis=0)
+        return self._finish(bound, source)
+
+    @staticmethod
+    def _finish(bound: np.ndarray, root: int) -> np.ndarray:
+        bound[np.isnan(bound)] = 0.0
+        np.maximum(bound, 0.0, out=bound)
+        bound[root] = 0.0
+        return bound
+
+
+class LandmarkCache:
+    """
+    Ориентиры для текущего графа редактора. Пересчитываются, только
+    когда меняется версия графа (счётчик правок GraphApp) или k.
+    """
+
+    def __init__(self, k: int = 8):
+        self.k = k
+        self._key = None
+        self._landmarks = None
+
+    def get(self, version, graph: CompactGraph, job=None) -> Landmarks:
+        if not self.is_fresh(version):
+            self._landmarks = Landmarks.build(graph, self.k, job=job)
+            self._key = (version, self.k)
+        return self._landmarks
+
+    def is_fresh(self, version) -> bool:
+        return self._landmarks is not None and self._key == (version, self.k)
+
+    def clear(self):
+        self._key = None
+        self._landmarks = None
@@ -0,0 +1,175 @@
+"""
+Кэш результатов алгоритмов по отпечатку графа.
+
+Отпечаток — сумма по модулю 2^64 хэшей элементов графа: вершин вместе с
+их номером (от порядка вершин зависят индексы истока и стока и нумерация
+в решателях) и рёбер вместе с весом. Сумма меняется за O(1) на правку:
+добавление прибавляет хэш элемента, удаление вычитает. Порядок рёбер в
+отпечаток не входит: от него зависит только порядок обхода в протоколе,
+а не сам ответ. Хэши считаются blake2b от repr, а не встроенным hash(),
+который у строк меняется от запуска к запуску, — иначе записи с диска
+никогда бы не совпали.
+
+ResultCache хранит Result целиком со всеми снимками шагов и отдаёт тот же
+объект без копирования: окно результата шаги только читает. Размер записи
+— длина её pickle по шагам; result_size() считает её потоково, без копии
+байтов в памяти, и вызывается там же, где работал решатель (в фоновом потоке), а
+не в put() из потока Tk. При превышении max_bytes вытесняются давно не
+использованные записи. С path кэш читается при создании и пишется save()
+в тот же файл.
+"""
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+from .dataclass import Result
+
+_MASK = (1 << 64) - 1
+
+
+def _digest(item) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(item).encode(), digest_size=8).digest(), "little")
+
+
+class _ByteCounter:
+    """Файлоподобный приёмник pickle.dump: считает байты и выбрасывает их"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+def result_size(result: Result) -> int:
+    """
+    Длина pickle результата; заметное время на тысячах снимков — не для
+    потока Tk. Шаги сериализуются по одному со сбросом memo, чтобы память
+    на подсчёт не росла с числом шагов; общий снимок нескольких шагов при
+    этом учитывается каждый раз, то есть оценка не занижена.
+    """
+    counter = _ByteCounter()
+    pickler = pickle.Pickler(counter, protocol=pickle.HIGHEST_PROTOCOL)
+    for step in result.steps:
+        pickler.dump(step)
+        pickler.clear_memo()
+    pickler.dump(result.metrics)
+    return counter.size
+
+
+class GraphFingerprint:
+
+    def __init__(self):
+        self.nodes = 0
+        self.edges = 0
+        self._sum = 0
+
+    @classmethod
+    def from_networkx(cls, graph, weight_attr: str = 'weight', default_weight=1) -> "GraphFingerprint":
+        fingerprint = cls()
+        for node in graph.nodes():
+            fingerprint.add_node(node)
+        for u, v, data in graph.edges(data=True):
+            fingerprint.add_edge(u, v, data.get(weight_attr, default_weight))
+        return fingerprint
+
+    def add_node(self, node):
+        """Вершина получает следующий номер, как в list(graph.nodes())"""
+        self._sum = (self._sum + _digest(("node", self.nodes, node))) & _MASK
+        self.nodes += 1
+
+    def add_edge(self, u, v, weight):
+        self._sum = (self._sum + _digest(("edge", u, v, weight))) & _MASK
+        self.edges += 1
+
+    def remove_edge(self, u, v, weight):
+        self._sum = (self._sum - _digest(("edge", u, v, weight))) & _MASK
+        self.edges -= 1
+
+    @property
+    def key(self) -> tuple:
+        return self.nodes, self.edges, self._sum
+
+
+class ResultCache:
+
+    # Меняется, когда меняется формат ключа или Result: старый файл кэша тогда не читается
+    FORMAT = 1
+
+    def __init__(self, max_bytes: int = 256 * 2 ** 20, path: str = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: OrderedDict = OrderedDict()  # ключ -> (Result, размер pickle)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def get(self, key) -> Result | None:
+        """Сохранённый Result или None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, result: Result, size: int = None) -> bool:
+        """
+        size — result_size(result), посчитанный заранее вне потока Tk; без
+        него размер считается здесь. False — запись больше всего кэша и не
+        сохранена.
+        """
+        if size is None:
+            size = result_size(result)
+        if size > self.max_bytes:
+            return False
+        self._discard(key)
+        self._entries[key] = (result, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+        return True
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((self.FORMAT, list(self._entries.items())), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def load(self):
+        """Повреждённый или старый файл не ошибка: кэш просто остаётся пустым"""
+        try:
+            with open(self.path, "rb") as f:
+                version, entries = pickle.load(f)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            return
+        if version != self.FORMAT:
+            return
+        self.clear()
+        for key, entry in entries:
+            self._entries[key] = entry
+            self.nbytes += entry[1]
+        while self.nbytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
@@ -0,0 +1,116 @@
+"""
+Компактное индексное представление графа для решателей.
+
+CompactGraph хранит рёбра в формате CSR: вершины пронумерованы 0..n-1,
+исходящие рёбра вершины u — indices[indptr[u]:indptr[u + 1]] с весами
+weights в тех же позициях. Для обходов на чистом Python массивы
+дополнительно доступны как списки (adjacency_lists), чтобы не платить за
+обращение к скалярам NumPy в горячем цикле.
+"""
+import networkx as nx
+import numpy as np
+
+
+class CompactGraph:
+
+    def __init__(self, labels: list, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray):
+        self.labels = labels
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._index = None
+        self._lists = None
+
+    @classmethod
+    def from_networkx(cls, graph, weight_attr: str = "weight", default=1.0) -> "CompactGraph":
+        """Вершины нумеруются в порядке graph.nodes(), рёбра — в порядке смежности networkx"""
+        labels = list(graph.nodes())
+        index = {label: i for i, label in enumerate(labels)}
+        adjacency = [nbrs for _, nbrs in graph.adjacency()]
+        degrees = np.fromiter(map(len, adjacency), dtype=np.int64, count=len(labels))
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        m = int(indptr[-1])
+        indices = np.fromiter((index[v] for nbrs in adjacency for v in nbrs), dtype=np.int64, count=m)
+        weights = np.fromiter((data.get(weight_attr, default) for nbrs in adjacency
+                               for data in nbrs.values()), dtype=float, count=m)
+        compact = cls(labels, indptr, indices, weights)
+        compact._index = index
+        return compact
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "CompactGraph":
+        """Из EdgeArrays (graph_io); порядок рёбер одной вершины сохраняется"""
+        return cls.from_edges(arrays.labels, arrays.src, arrays.dst, arrays.weight)
+
+    @classmethod
+    def from_edges(cls, labels: list, src: np.ndarray, dst: np.ndarray, weights: np.ndarray) -> "CompactGraph":
+        """Из массивов концов рёбер; порядок рёбер одной вершины сохраняется"""
+        n = len(labels)
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(list(labels), indptr, np.asarray(dst)[order].astype(np.int64),
+                   np.asarray(weights)[order].astype(float))
+
+    @property
+    def n(self) -> int:
+        return len(self.labels)
+
+    @property
+    def m(self) -> int:
+        return len(self.indices)
+
+    @property
+    def index(self) -> dict:
+        """Метка -> номер вершины"""
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.labels)}
+        return self._index
+
+    def adjacency_lists(self) -> tuple:
+        """(indptr, indices, weights) как списки Python; строятся один раз"""
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._lists
+
+    def to_networkx(self, weight_attr: str = "weight"):
+        """nx.DiGraph с теми же метками и весами (для снимков шагов Result)"""
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.labels)
+        labels = np.array(self.labels, dtype=object)
+        graph.add_weighted_edges_from(zip(labels[self.sources()].tolist(), labels[self.indices].tolist(),
+                                          self.weights.tolist()), weight=weight_attr)
+        return graph
+
+    def successors(self, u: int) -> np.ndarray:
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def sources(self) -> np.ndarray:
+        """Начало каждого ребра (массив длины m)"""
+        return np.repeat(np.arange(self.n), np.diff(self.indptr))
+
+    def reverse(self) -> "CompactGraph":
+        """Граф с обращёнными рёбрами (те же номера вершин)"""
+        return CompactGraph.from_edges(self.labels, self.indices, self.sources(), self.weights)
+
+    def undirected(self) -> "CompactGraph":
+        """
+        Симметричный граф без петель: пара {u, v} остаётся одним ребром с
+        минимальным весом из u -> v и v -> u и хранится в обоих направлениях.
+        """
+        src, dst = self.sources(), self.indices
+        keep = src != dst
+        a = np.minimum(src, dst)[keep]
+        b = np.maximum(src, dst)[keep]
+        w = self.weights[keep]
+        # Для каждой пары первым после сортировки идёт минимальный вес
+        order = np.lexsort((w, b, a))
+        a, b, w = a[order], b[order], w[order]
+        first = np.ones(len(a), dtype=bool)
+        first[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+        a, b, w = a[first], b[first], w[first]
+        src, dst, w = np.concatenate((a, b)), np.concatenate((b, a)), np.concatenate((w, w))
+        # Соседи каждой вершины — по возрастанию номера
+        order = np.lexsort((dst, src))
+        return CompactGraph.from_edges(self.labels, src[order], dst[order], w[order])
@@ -2,6 +2,8 @@ from dataclasses import dataclass, Field
 
 import networkx as nx
 
+from .metrics import Metrics
+
 
 @dataclass
 class Step:
@@ -15,6 +17,7 @@ class Result:
     def __init__(self):
         self.steps: list[Step] = []
         self._current_step_id = 0
+        self.metrics = Metrics()
 
     def getNextStep(self):
         if self._current_step_id < len(self.steps):
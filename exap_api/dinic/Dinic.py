@@ -4,7 +4,9 @@ import networkx as nx
 
 from exap_api.dataclass import Result
 from exap_api.dinic.dataclass import Edge
-from exap_api.utils import convert_to_networkx, networkx_to_dinic_format
+# модуль целиком: utils сам импортирует exap_api.dinic.dataclass, и при
+# импорте utils первым имена из него ещё не определены
+from exap_api import utils
 
 
 class DinicSolver:
@@ -17,12 +19,20 @@ class DinicSolver:
             self.graph: List[List[Edge]] = [[] for _ in range(n)]
 
         self.result = Result()
+        self.metrics = self.result.metrics
         self.node_labels = list(range(n))
         self.step_count = 0
+        self._dfs_edges = 0
+        # Задача exap_api.executor.Job при фоновом запуске: точки отмены и прогресс
+        self.job = None
 
     def _log(self, title: str, data: str = ""):
+        if self.job is not None:
+            self.job.tick(self.step_count, None, "шагов")
         self.step_count += 1
-        nx_graph = convert_to_networkx(self.graph, self.node_labels)
+        self.metrics.count("snapshots")
+        with self.metrics.phase("snapshot"):
+            nx_graph = utils.convert_to_networkx(self.graph, self.node_labels)
         self.result.add_step(f"{self.step_count}. {title}", nx_graph, data)
 
     def add_edge(self, from_: int, to: int, capacity: int) -> None:
@@ -41,30 +51,41 @@ class DinicSolver:
         phase = 1
 
         while self._bfs(s, t):
+            self.metrics.count("phases")
             self._log(f"Фаза {phase}", f"Строим слоистую сеть")
             self.it = [0] * self.n
             dfs_count = 0
             while True:
-                pushed = self._dfs(s, t, INF)
+                with self.metrics.phase("dfs"):
+                    pushed = self._dfs(s, t, INF)
                 dfs_count += 1
                 if pushed == 0:
                     break
+                self.metrics.count("augmentations")
                 self._log(f"Поток {dfs_count}", f"Найден поток: {pushed}")
                 flow += pushed
             self._log(f"Конец фазы {phase}", f"Суммарный поток: {flow}")
         self._log("Конец алгоритма", f"Максимальный поток: {flow}")
+        self.metrics.count("dfs_edges", self._dfs_edges)
+        self._dfs_edges = 0
         return flow
 
     def _bfs(self, s: int, t: int) -> bool:
         """слоистая сеть"""
+        with self.metrics.phase("bfs"):
+            return self._build_levels(s, t)
+
+    def _build_levels(self, s: int, t: int) -> bool:
         self.level = [-1] * self.n
         queue = deque([s])
         self.level[s] = 0
         s = "Начало BFS" + "\n   " + f"Исток: {s}"
         # self._log("Начало BFS", f"Исток: {s}")
+        scanned = 0
 
         while queue:
             v = queue.popleft()
+            scanned += len(self.graph[v])
             for edge in self.graph[v]:
                 if edge.capacity > 0 and self.level[edge.to] < 0:
                     self.level[edge.to] = self.level[v] + 1
@@ -72,6 +93,7 @@ class DinicSolver:
                     s += "\n" + f"BFS: {v} → {edge.to}" + "\n   " + f"Уровень {self.level[edge.to]}, capacity: {edge.capacity}"
                     # self._log(f"BFS: {v} → {edge.to}",
                     #           f"У/ровень {self.level[edge.to]}, capacity: {edge.capacity}")
+        self.metrics.count("bfs_edges", scanned)
         reachable = self.level[t] >= 0
         s += "\n" + "Конец BFS" + "\n    " + f"Сток достижим: {reachable}"
         self._log("BFS", s)
@@ -87,6 +109,7 @@ class DinicSolver:
         for i in range(self.it[v], len(self.graph[v])):
             self.it[v] = i
             edge = self.graph[v][i]
+            self._dfs_edges += 1
 
             if edge.capacity > 0 and self.level[v] + 1 == self.level[edge.to]:
                 s = "\n" + f"DFS проверяет {v} → {edge.to}" + "\n    " + \
@@ -122,7 +145,7 @@ if __name__ == '__main__':
     g.add_edge(1, 3, capacity=1)
     g.add_edge(2, 3, capacity=1)
 
-    new_g, labels = networkx_to_dinic_format(g)
+    new_g, labels = utils.networkx_to_dinic_format(g)
 
     s = DinicSolver(len(new_g), new_g)
     s.max_flow(0, 3)
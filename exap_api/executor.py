@@ -0,0 +1,150 @@
+"""
+Фоновое выполнение алгоритмов.
+
+Решатель работает в потоке пула, окно Tk продолжает обрабатывать события:
+чистый Python отдаёт GIL каждые несколько миллисекунд, NumPy — на больших
+операциях. Результат, прогресс и уже записанные шаги Result забираются
+опросом через root.after в потоке Tk, как у LayoutJob.
+
+Отмена кооперативная: решатели с атрибутом job вызывают job.tick(...) в
+своих циклах, и после cancel() очередной tick бросает Cancelled. Шаги,
+записанные до отмены, остаются в Result решателя.
+
+Пул потоков, а не процессов: шаги Result и флаг отмены читаются прямо из
+памяти решателя, без пересылки снимков графа между процессами.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Cancelled(Exception):
+    """Задача остановлена по cancel()"""
+
+
+class Job:
+
+    def __init__(self, func, title: str = ""):
+        self.func = func        # func(job) -> результат; выполняется в потоке пула
+        self.title = title
+        self._cancelled = threading.Event()
+        self.progress = None    # последнее (сделано, всего или None, текст) из tick
+        self.result = None
+        self.error = None
+        self.stopped = False    # решатель прерван отменой (а не успел закончить до неё)
+        self._done = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def tick(self, done: int = 0, total: int = None, text: str = ""):
+        """Точка отмены в цикле решателя; заодно сообщает прогресс"""
+        if self._cancelled.is_set():
+            raise Cancelled
+        self.progress = (done, total, text)
+
+    def describe(self) -> str:
+        if self.progress is None:
+            return self.title
+        done, total, text = self.progress
+        share = f"{done}/{total}" if total else str(done)
+        return f"{self.title}: {text} {share}".rstrip()
+
+    def run(self):
+        try:
+            self.result = self.func(self)
+        except Cancelled:
+            self.stopped = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+
+class Executor:
+    """
+    Пул фоновых потоков. submit() возвращает Job; колбэки вызываются в
+    потоке Tk: on_progress — при каждом опросе, пока задача идёт, затем
+    ровно один из on_done / on_cancel / on_error. Ошибка задачи без
+    on_error пробрасывается: при inline=True — из submit(), в фоне — из
+    опроса в потоке Tk, где её покажет обработчик ошибок Tk.
+
+    watch(executor) вызывается в потоке Tk при запуске фоновой задачи,
+    при каждом опросе и после завершения — по нему окно показывает
+    состояние и кнопку отмены для всех задач, кто бы их ни запустил.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, root, workers: int = 2, watch=None):
+        self.root = root
+        self.watch = watch
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exap-job")
+        self.jobs: list[Job] = []
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.jobs)
+
+    def submit(self, func, title: str = "", on_done=None, on_progress=None, on_cancel=None,
+               on_error=None, inline: bool = False) -> Job:
+        """inline=True — выполнить сразу в текущем потоке (небольшие графы, без задержки опроса)"""
+        job = Job(func, title)
+        callbacks = (on_done, on_progress, on_cancel, on_error)
+        if inline:
+            job.run()
+            self._finish(job, *callbacks)
+            return job
+        self.jobs.append(job)
+        self._pool.submit(job.run)
+        self.root.after(self.POLL_MS, self._poll, job, callbacks)
+        self._notify()
+        return job
+
+    def describe(self) -> str:
+        return "; ".join(job.describe() for job in self.jobs)
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False)
+
+    def _poll(self, job: Job, callbacks):
+        on_done, on_progress, on_cancel, on_error = callbacks
+        if not job.done:
+            if on_progress is not None:
+                on_progress(job)
+            self.root.after(self.POLL_MS, self._poll, job, callbacks)
+            self._notify()
+            return
+        self.jobs.remove(job)
+        try:
+            self._finish(job, *callbacks)
+        finally:
+            self._notify()
+
+    def _notify(self):
+        if self.watch is not None:
+            self.watch(self)
+
+    @staticmethod
+    def _finish(job: Job, on_done, on_progress, on_cancel, on_error):
+        if job.error is not None:
+            if on_error is None:
+                raise job.error
+            on_error(job)
+        elif job.stopped:
+            if on_cancel is not None:
+                on_cancel(job)
+        elif on_done is not None:
+            on_done(job)
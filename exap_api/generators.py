@@ -0,0 +1,230 @@
+"""
+Детерминированные генераторы больших графов.
+
+Все семейства строятся векторно в NumPy и возвращают пару (EdgeArrays, xy):
+рёбра в виде массивов индексов и весов и координаты вершин (n, 2) в
+квадрате [-10, 10] x [-10, 10] — в тех же масштабах, что и редактор,
+поэтому евклидова эвристика A* на них осмысленна. Граф на 10^5 рёбер
+строится за десятки миллисекунд; дольше всего занимает перевод в
+nx.DiGraph (to_editor_graph).
+
+Одинаковый seed даёт одинаковый граф. Кратных рёбер и петель нет.
+"""
+import numpy as np
+
+from exap_api.graph_io import EdgeArrays, to_networkx
+
+BOX = 10.0
+
+
+def _labels(n: int) -> list:
+    return [str(i) for i in range(n)]
+
+
+def _random_xy(n: int, rng) -> np.ndarray:
+    return rng.uniform(-BOX, BOX, size=(n, 2))
+
+
+def _ceil2(values: np.ndarray) -> np.ndarray:
+    """Округление вверх до сотых: вес не становится меньше длины ребра"""
+    return np.ceil(values * 100 - 1e-9) / 100
+
+
+def _unique_pairs(n: int, src: np.ndarray, dst: np.ndarray, *columns):
+    """Убирает петли и повторы (u, v), сохраняя порядок первого появления"""
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    columns = [c[keep] for c in columns]
+    _, first = np.unique(src.astype(np.int64) * n + dst, return_index=True)
+    first.sort()
+    return (src[first], dst[first], *[c[first] for c in columns])
+
+
+def _spanning_tree(n: int, rng) -> tuple:
+    """Случайное дерево: i-я вершина перестановки цепляется к одной из предыдущих"""
+    order = rng.permutation(n)
+    child = np.arange(1, n)
+    parent = (rng.random(n - 1) * child).astype(np.int64)
+    return order[parent], order[child]
+
+
+def erdos_renyi(n: int, p: float = None, avg_degree: float = 3.0, seed: int = 0,
+                weights=(1, 20), connected: bool = True):
+    """
+    Случайный ориентированный граф G(n, m).
+
+    Число рёбер m = p * n * (n - 1), если задано p, иначе n * avg_degree;
+    рёбра выбираются без повторов из всех n * (n - 1) упорядоченных пар.
+    При connected=True сначала кладётся случайное остовное дерево, так что
+    граф слабо связен (нужно алгоритму Прима).
+    """
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1)
+    m = int(round(p * pairs)) if p is not None else int(n * avg_degree)
+    m = min(m, pairs)
+
+    ids = rng.choice(pairs, size=m, replace=False) if m else np.empty(0, dtype=np.int64)
+    src = ids // max(n - 1, 1)
+    rest = ids % max(n - 1, 1)
+    dst = rest + (rest >= src)
+    if connected and n > 1:
+        tree_src, tree_dst = _spanning_tree(n, rng)
+        src, dst = np.concatenate((tree_src, src)), np.concatenate((tree_dst, dst))
+        src, dst = _unique_pairs(n, src, dst)
+        src, dst = src[:max(m, n - 1)], dst[:max(m, n - 1)]
+
+    weight = rng.integers(weights[0], weights[1] + 1, size=len(src))
+    return EdgeArrays(_labels(n), src, dst, weight), _random_xy(n, rng)
+
+
+def grid(rows: int, cols: int, seed: int = 0, stretch=(1.0, 1.5)):
+    """
+    Решётка rows x cols с рёбрами в обе стороны, вершины "r_c".
+    Вес ребра — его длина, умноженная на случайный коэффициент из stretch
+    (одинаковый в обе стороны), поэтому евклидова эвристика допустима.
+    """
+    rng = np.random.default_rng(seed)
+    step = 2 * BOX / max(rows, cols)
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    xy = np.column_stack((-BOX + c * step, -BOX + r * step))
+    labels = [f"{i}_{j}" for i, j in zip(r.tolist(), c.tolist())]
+
+    index = np.arange(rows * cols).reshape(rows, cols)
+    right = (index[:, :-1].ravel(), index[:, 1:].ravel())
+    down = (index[:-1, :].ravel(), index[1:, :].ravel())
+    a = np.concatenate((right[0], down[0]))
+    b = np.concatenate((right[1], down[1]))
+    w = _ceil2(step * rng.uniform(*stretch, size=len(a)))
+    # Пары (a -> b, b -> a) идут подряд, как при поочерёдном add_edge
+    src = np.column_stack((a, b)).ravel()
+    dst = np.column_stack((b, a)).ravel()
+    return EdgeArrays(labels, src, dst, np.repeat(w, 2)), xy
+
+
+def layered_flow(layers: int, width: int, fanout: int = 3, seed: int = 0,
+                 capacities=(1, 20), terminal_capacities=(5, 30)):
+    """
+    Слоистая сеть для максимального потока: 's' -> слой 0 -> ... -> слой
+    layers-1 -> 't'. Каждая вершина слоя соединена с до fanout случайными
+    вершинами следующего слоя (совпавшие выборы склеиваются).
+
+    Исток 's' имеет индекс 0, сток 't' — n - 1, как их и ждут
+    networkx_to_dinic_format и DinicSolver.max_flow(0, n - 1);
+    meta содержит source и sink.
+    """
+    rng = np.random.default_rng(seed)
+    n = layers * width + 2
+    source, sink = 0, n - 1
+    layer, i = np.divmod(np.arange(layers * width), width)
+    labels = ['s'] + [f"{a}_{b}" for a, b in zip(layer.tolist(), i.tolist())] + ['t']
+
+    first = 1 + np.arange(width)
+    last = 1 + (layers - 1) * width + np.arange(width)
+    upper = np.repeat(1 + np.arange((layers - 1) * width), fanout)
+    lower_layer = (upper - 1) // width + 1
+    lower = 1 + lower_layer * width + rng.integers(0, width, size=len(upper))
+    mid_src, mid_dst = _unique_pairs(n, upper, lower)
+
+    src = np.concatenate((np.full(width, source), mid_src, last))
+    dst = np.concatenate((first, mid_dst, np.full(width, sink)))
+    weight = np.concatenate((rng.integers(terminal_capacities[0], terminal_capacities[1] + 1, size=width),
+                             rng.integers(capacities[0], capacities[1] + 1, size=len(mid_src)),
+                             rng.integers(terminal_capacities[0], terminal_capacities[1] + 1, size=width)))
+
+    xy = np.empty((n, 2))
+    xy[source], xy[sink] = (-BOX, 0.0), (BOX, 0.0)
+    xy[1:-1, 0] = -0.9 * BOX + 1.8 * BOX * layer / max(1, layers - 1)
+    xy[1:-1, 1] = -0.9 * BOX + 1.8 * BOX * i / max(1, width - 1)
+    return EdgeArrays(labels, src, dst, weight, {"source": 's', "sink": 't'}), xy
+
+
+def negative_dag(n: int, p: float = None, avg_degree: float = 3.0, seed: int = 0, weights=(-10, 20)):
+    """
+    Ациклический граф (рёбра только i -> j при i < j) с весами из weights,
+    включая отрицательные. Число рёбер p * n * (n - 1) / 2 или n * avg_degree.
+    """
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) // 2
+    m = int(round(p * pairs)) if p is not None else int(n * avg_degree)
+    m = min(m, pairs)
+    ids = rng.choice(pairs, size=m, replace=False) if m else np.empty(0, dtype=np.int64)
+    # Номер пары -> (i, j) в строках верхнего треугольника: строка j содержит j пар (0..j-1, j)
+    dst = ((1 + np.sqrt(1 + 8 * ids.astype(float))) // 2).astype(np.int64)
+    dst -= (dst * (dst - 1) // 2 > ids)
+    dst += ((dst + 1) * dst // 2 <= ids)
+    src = ids - dst * (dst - 1) // 2
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+    weight = rng.integers(weights[0], weights[1] + 1, size=m)
+    return EdgeArrays(_labels(n), src, dst, weight), _random_xy(n, rng)
+
+
+def geometric(n: int, avg_degree: float = 6.0, radius: float = None, seed: int = 0, stretch=(1.0, 1.3)):
+    """
+    Случайный геометрический граф для A*: точки в квадрате, рёбра в обе
+    стороны между точками ближе radius (по умолчанию подобран под
+    avg_degree). Вес — длина ребра, умноженная на коэффициент из stretch,
+    так что евклидово расстояние остаётся нижней оценкой пути.
+
+    Пары ищутся по сетке с ячейкой radius: каждая точка сравнивается
+    только с точками своей и четырёх «следующих» ячеек.
+    """
+    rng = np.random.default_rng(seed)
+    xy = _random_xy(n, rng)
+    if radius is None:
+        radius = np.sqrt(avg_degree * (2 * BOX) ** 2 / (np.pi * max(n, 1)))
+    cells = max(1, int(2 * BOX / radius))
+    cell_xy = np.minimum(((xy + BOX) / (2 * BOX) * cells).astype(np.int64), cells - 1)
+    cell = cell_xy[:, 0] * cells + cell_xy[:, 1]
+    order = np.argsort(cell, kind="stable")
+    bounds = np.searchsorted(cell[order], np.arange(cells * cells + 1))
+
+    a_parts, b_parts = [], []
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        cx, cy = cell_xy[:, 0] + dx, cell_xy[:, 1] + dy
+        inside = (cx < cells) & (cy >= 0) & (cy < cells)
+        points = np.flatnonzero(inside)
+        other = cx[inside] * cells + cy[inside]
+        start, count = bounds[other], bounds[other + 1] - bounds[other]
+        # Все пары (точка, кандидат из соседней ячейки) без цикла по точкам
+        a = np.repeat(points, count)
+        offsets = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        b = order[np.repeat(start, count) + offsets]
+        if dx == 0 and dy == 0:
+            keep = a < b
+            a, b = a[keep], b[keep]
+        a_parts.append(a)
+        b_parts.append(b)
+    a, b = np.concatenate(a_parts), np.concatenate(b_parts)
+    length = np.sqrt(((xy[a] - xy[b]) ** 2).sum(axis=1))
+    near = length < radius
+    a, b, length = a[near], b[near], length[near]
+    w = _ceil2(length * rng.uniform(*stretch, size=len(a)))
+
+    src = np.column_stack((a, b)).ravel()
+    dst = np.column_stack((b, a)).ravel()
+    return EdgeArrays(_labels(n), src, dst, np.repeat(w, 2)), xy
+
+
+# Семейства для меню редактора: название -> функция от (примерного числа вершин, seed)
+FAMILIES = {
+    "Эрдёш–Реньи (разреженный)": lambda n, seed: erdos_renyi(n, avg_degree=3.0, seed=seed),
+    "Решётка": lambda n, seed: grid(max(2, int(np.sqrt(n))), max(2, int(np.sqrt(n))), seed=seed),
+    "Слоистая сеть (поток)": lambda n, seed: layered_flow(max(2, int(np.sqrt(n / 2))),
+                                                          max(2, int(np.sqrt(n * 2))), seed=seed),
+    "DAG с отрицательными весами": lambda n, seed: negative_dag(n, avg_degree=3.0, seed=seed),
+    "Геометрический (A*)": lambda n, seed: geometric(n, seed=seed),
+}
+
+
+def generate(family: str, n: int, seed: int = 0):
+    """Граф семейства family примерно на n вершин: (EdgeArrays, xy)"""
+    if family not in FAMILIES:
+        raise ValueError(f"неизвестное семейство графов: {family}")
+    return FAMILIES[family](n, seed)
+
+
+def to_editor_graph(arrays: EdgeArrays, xy: np.ndarray) -> tuple:
+    """(nx.DiGraph, позиции {метка: (x, y)}) в формате GraphApp"""
+    pos = dict(zip(arrays.labels, map(tuple, xy.tolist())))
+    return to_networkx(arrays), pos
@@ -0,0 +1,419 @@
+"""
+Потоковое чтение и запись графов: список рёбер, CSV и DIMACS.
+
+Файл читается блоками по chunk_lines строк; каждый блок разбирается одним
+split() и превращается в массивы NumPy, а метки вершин кодируются через
+np.unique блока, так что словарь меток трогается один раз на уникальную
+метку, а не на каждое ребро. Результат чтения — EdgeArrays, из которого
+строятся nx.DiGraph или компактные списки смежности решателей.
+"""
+import csv
+import gc
+import io
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+
+import networkx as nx
+import numpy as np
+
+from exap_api.dinic.dataclass import Edge
+
+CHUNK_LINES = 200_000
+
+_SOURCE_NAMES = ("source", "from", "src", "u", "tail")
+_TARGET_NAMES = ("target", "to", "dst", "v", "head")
+_WEIGHT_NAMES = ("weight", "capacity", "cost", "w", "cap")
+
+_DIMACS_EXTENSIONS = (".max", ".dimacs", ".gr", ".sp")
+# Расширения DIMACS для кратчайших путей: при записи в них — «p sp»
+_DIMACS_SP_EXTENSIONS = (".gr", ".sp")
+
+
+@dataclass
+class EdgeArrays:
+    labels: list
+    src: np.ndarray
+    dst: np.ndarray
+    weight: np.ndarray
+    meta: dict = field(default_factory=dict)  # DIMACS: тип задачи, исток и сток
+
+    @property
+    def n(self) -> int:
+        return len(self.labels)
+
+    @property
+    def m(self) -> int:
+        return len(self.src)
+
+
+class _LabelEncoder:
+    """Метка -> индекс вершины в порядке первого появления в файле"""
+
+    def __init__(self):
+        self.index = {}
+        self.labels = []
+
+    def encode(self, tokens: np.ndarray) -> np.ndarray:
+        uniq, first, inverse = np.unique(tokens, return_index=True, return_inverse=True)
+        codes = np.empty(len(uniq), dtype=np.int64)
+        # Новые метки нумеруются в порядке появления внутри блока
+        for i in np.argsort(first, kind="stable").tolist():
+            label = str(uniq[i])
+            code = self.index.get(label)
+            if code is None:
+                code = self.index[label] = len(self.labels)
+                self.labels.append(label)
+            codes[i] = code
+        return codes[inverse.reshape(-1)]
+
+
+def _chunks(f, chunk_lines):
+    while True:
+        lines = list(islice(f, chunk_lines))
+        if not lines:
+            return
+        yield lines
+
+
+def _weights(column) -> np.ndarray:
+    return np.asarray(column).astype(np.float64)
+
+
+# === чтение ===
+
+def _is_comment(line) -> bool:
+    return line.lstrip().startswith(("#", "%"))
+
+
+def _read_table(f, delimiter, columns, ncols, encoder, chunk_lines, line_offset=0):
+    """
+    Разбирает строки «u v [w]» блоками; возвращает списки массивов src, dst,
+    weight. ncols — наибольшее число читаемых столбцов: строка может быть
+    короче (нет веса — вес 1), лишние столбцы отбрасываются. Строка без
+    обоих концов ребра — ValueError с её номером (line_offset — строк
+    файла до f, например заголовок CSV).
+    """
+    source_col, target_col, weight_col = columns
+    parts = ([], [], [])
+    line_no = line_offset
+    for lines in _chunks(f, chunk_lines):
+        start = line_no
+        line_no += len(lines)
+        data = lines
+        text = "".join(lines)
+        if "#" in text or "%" in text:
+            data = [line for line in lines if not _is_comment(line)]
+            text = "".join(data)
+        table = _fast_table(text, data, delimiter, ncols, max(source_col, target_col) + 1)
+        if table is None:
+            # Пустые, неровные или битые строки, кавычки: построчный разбор только этого блока
+            table = _slow_table(lines, delimiter, ncols, (source_col, target_col), start)
+        if len(table) == 0:
+            continue
+        ends = encoder.encode(table[:, [source_col, target_col]].ravel()).reshape(-1, 2)
+        parts[0].append(ends[:, 0])
+        parts[1].append(ends[:, 1])
+        if weight_col is not None and weight_col < table.shape[1]:
+            column = table[:, weight_col]
+            parts[2].append(_weights(np.where(column == "", "1", column)))
+        else:
+            parts[2].append(np.ones(len(table)))
+    return parts
+
+
+def _fast_table(text, lines, delimiter, ncols, min_cols):
+    """
+    Таблица блока одним split() или None, если блок нужно разбирать
+    построчно. Все строки блока должны иметь одинаковое число полей k,
+    min_cols <= k <= ncols (min_cols — столбцов до конца ребра): иначе неровные строки, совпав по общему числу полей,
+    сдвинули бы столбцы. В CSV, кроме того, не должно быть кавычек; поля
+    режутся по разделителю, так что пустые поля и пробелы внутри меток
+    сохраняются.
+    """
+    if not lines:
+        return None
+    if delimiter is None:
+        k = len(lines[0].split())
+        if not min_cols <= k <= ncols or any(len(line.split()) != k for line in lines):
+            return None
+        return np.array(text.split()).reshape(-1, k)
+    k = lines[0].count(delimiter) + 1
+    if '"' in text or not min_cols <= k <= ncols or any(line.count(delimiter) != k - 1 for line in lines):
+        return None
+    body = text.replace("\r\n", "\n")
+    body = body[:-1] if body.endswith("\n") else body
+    table = np.array(body.replace("\n", delimiter).split(delimiter)).reshape(-1, k)
+    if " " in text or "\t" in text:
+        table = np.char.strip(table)
+    return table
+
+
+def _slow_table(lines, delimiter, ncols, ends, start):
+    """Построчный разбор блока; start — номер строки файла перед блоком"""
+    numbered = [(start + i + 1, line) for i, line in enumerate(lines) if not _is_comment(line)]
+    if delimiter is None:
+        rows = ((number, line.split()) for number, line in numbered)
+    else:
+        reader = csv.reader((line for _, line in numbered), delimiter=delimiter)
+        # line_num — сколько строк reader уже прочитал: номер последней строки записи
+        rows = ((numbered[reader.line_num - 1][0], [cell.strip() for cell in row]) for row in reader)
+    table = []
+    for number, row in rows:
+        if not any(row):
+            continue
+        row = row[:ncols] + [""] * (ncols - len(row))
+        if not all(row[col] for col in ends):
+            raise ValueError(f"Строка {number}: у ребра должны быть начало и конец («u v [w]»)")
+        table.append(row)
+    return np.array(table, dtype=str).reshape(-1, ncols)
+
+
+def _finish(encoder_labels, parts, meta=None) -> EdgeArrays:
+    src, dst, weight = (np.concatenate(p) if p else np.empty(0) for p in parts)
+    return EdgeArrays(encoder_labels, src.astype(np.int64), dst.astype(np.int64),
+                      weight.astype(np.float64), meta or {})
+
+
+def read_edge_list(path, chunk_lines: int = CHUNK_LINES) -> EdgeArrays:
+    """Список рёбер «u v [w]» через пробелы; строки с # и % — комментарии"""
+    encoder = _LabelEncoder()
+    with open(path, encoding="utf-8") as f:
+        # Вес — третий столбец там, где он есть: строки «u v» и «u v w» можно смешивать
+        parts = _read_table(f, None, (0, 1, 2), 3, encoder, chunk_lines)
+    return _finish(encoder.labels, parts)
+
+
+def read_csv(path, chunk_lines: int = CHUNK_LINES) -> EdgeArrays:
+    """
+    CSV с рёбрами. Если первая строка — заголовок, столбцы ищутся по именам
+    (source/target/weight и синонимы), иначе берутся первые три.
+    """
+    encoder = _LabelEncoder()
+    with open(path, encoding="utf-8", newline="") as f:
+        first = f.readline()
+        header = next(csv.reader([first]))
+        names = [name.strip().lower() for name in header]
+        ncols = len(names)
+        if any(name in _SOURCE_NAMES + _TARGET_NAMES + _WEIGHT_NAMES for name in names):
+            def find(candidates, default):
+                return next((i for i, name in enumerate(names) if name in candidates), default)
+            columns = (find(_SOURCE_NAMES, 0), find(_TARGET_NAMES, 1), find(_WEIGHT_NAMES, None))
+            parts = _read_table(f, ",", columns, ncols, encoder, chunk_lines, line_offset=1)
+        else:
+            # Без заголовка вес — третий столбец там, где он есть, как в списке рёбер
+            parts = _read_table(_prepend(first, f), ",", (0, 1, 2), max(ncols, 3), encoder, chunk_lines)
+    return _finish(encoder.labels, parts)
+
+
+def read_dimacs(path, chunk_lines: int = CHUNK_LINES) -> EdgeArrays:
+    """
+    DIMACS: «p max n m» (максимальный поток, «n id s|t» задают исток и сток)
+    или «p sp n m» (кратчайшие пути); рёбра — строки «a u v w». Вершины
+    нумеруются с 1, метки — их номера строкой. Другие задачи (например,
+    «p min» с дугами «a u v low cap cost») не поддерживаются: ValueError.
+    """
+    n = 0
+    meta = {}
+    parts = ([], [], [])
+    with open(path, encoding="utf-8") as f:
+        for lines in _chunks(f, chunk_lines):
+            arcs = [line for line in lines if line.startswith("a")]
+            if len(arcs) != len(lines):
+                for line in lines:
+                    fields = line.split()
+                    if not fields or fields[0] in ("a", "c"):
+                        continue
+                    if fields[0] == "p":
+                        if len(fields) < 3:
+                            raise ValueError(f"DIMACS: строка задачи должна быть «p max|sp n m»: {line.strip()!r}")
+                        if fields[1] not in ("max", "sp"):
+                            raise ValueError(f"DIMACS: задача «p {fields[1]}» не поддерживается (нужна max или sp)")
+                        meta["problem"] = fields[1]
+                        n = int(fields[2])
+                    elif fields[0] == "n" and len(fields) >= 3 and fields[2] in ("s", "t"):
+                        meta["source" if fields[2] == "s" else "sink"] = fields[1]
+            if not arcs:
+                continue
+            tokens = " ".join(arcs).split()
+            if len(tokens) != 4 * len(arcs):
+                raise ValueError("DIMACS: каждая дуга должна быть строкой «a u v w»")
+            table = np.array(tokens).reshape(-1, 4)
+            parts[0].append(table[:, 1].astype(np.int64) - 1)
+            parts[1].append(table[:, 2].astype(np.int64) - 1)
+            parts[2].append(_weights(table[:, 3]))
+    arrays = _finish([], parts, meta)
+    n = max(n, int(max(arrays.src.max(initial=-1), arrays.dst.max(initial=-1))) + 1)
+    arrays.labels = [str(i) for i in range(1, n + 1)]
+    return arrays
+
+
+def _prepend(line, f):
+    yield line
+    yield from f
+
+
+def read_graph(path, fmt: str = None, chunk_lines: int = CHUNK_LINES) -> EdgeArrays:
+    """Читает файл, выбирая формат по fmt ('edgelist', 'csv', 'dimacs') или расширению"""
+    fmt = fmt or _format_from_path(path)
+    reader = {"edgelist": read_edge_list, "csv": read_csv, "dimacs": read_dimacs}[fmt]
+    return reader(path, chunk_lines)
+
+
+def _format_from_path(path) -> str:
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in _DIMACS_EXTENSIONS:
+        return "dimacs"
+    return "edgelist"
+
+
+# === построение графов ===
+
+@contextmanager
+def _gc_paused():
+    """
+    Миллионы мелких объектов подряд (Edge, кортежи, словари networkx) без
+    циклов: сборщик мусора на каждом пороге обходит их впустую.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _weight_values(weight: np.ndarray) -> list:
+    """Целые веса остаются int, как в примерах и решателях"""
+    if len(weight) and np.all(weight == np.round(weight)):
+        return weight.astype(np.int64).tolist()
+    return weight.tolist()
+
+
+def to_networkx(arrays: EdgeArrays, weight_attr: str = "weight") -> nx.DiGraph:
+    graph = nx.DiGraph()
+    labels = np.array(arrays.labels, dtype=object)
+    with _gc_paused():
+        graph.add_nodes_from(arrays.labels)
+        graph.add_weighted_edges_from(zip(labels[arrays.src].tolist(), labels[arrays.dst].tolist(),
+                                          _weight_values(arrays.weight)), weight=weight_attr)
+    return graph
+
+
+def to_adjacency_list(arrays: EdgeArrays) -> tuple:
+    """Список смежности [(to, weight), ...] для JohnsonSolver и метки вершин"""
+    order = np.argsort(arrays.src, kind="stable")
+    bounds = np.searchsorted(arrays.src[order], np.arange(arrays.n + 1)).tolist()
+    with _gc_paused():
+        pairs = list(zip(arrays.dst[order].tolist(), _weight_values(arrays.weight[order])))
+        adjacency = [pairs[bounds[i]:bounds[i + 1]] for i in range(arrays.n)]
+    return adjacency, list(arrays.labels)
+
+
+def to_dinic_adjacency(arrays: EdgeArrays) -> tuple:
+    """
+    Остаточная сеть для DinicSolver: прямые рёбра с пропускной способностью
+    и обратные с нулевой, индексы rev вычисляются NumPy для всех рёбер сразу.
+    Порядок рёбер у вершины совпадает с последовательными add_edge.
+    """
+    m = arrays.m
+    owner = np.empty(2 * m, dtype=np.int64)
+    owner[0::2] = arrays.src  # прямое ребро 2k
+    owner[1::2] = arrays.dst  # обратное ребро 2k + 1
+    target = np.empty(2 * m, dtype=np.int64)
+    target[0::2] = arrays.dst
+    target[1::2] = arrays.src
+    capacity = np.zeros(2 * m, dtype=np.float64)
+    capacity[0::2] = arrays.weight
+
+    order = np.argsort(owner, kind="stable")
+    starts = np.searchsorted(owner[order], np.arange(arrays.n + 1))
+    position = np.empty(2 * m, dtype=np.int64)
+    position[order] = np.arange(2 * m) - starts[owner[order]]
+    rev = np.empty_like(position)
+    rev[0::2] = position[1::2]
+    rev[1::2] = position[0::2]
+
+    starts = starts.tolist()
+    with _gc_paused():
+        edges = list(map(Edge, target[order].tolist(), rev[order].tolist(), _weight_values(capacity[order])))
+        adjacency = [edges[starts[i]:starts[i + 1]] for i in range(arrays.n)]
+    return adjacency, list(arrays.labels)
+
+
+def from_networkx(graph: nx.DiGraph, weight_attr: str = "weight") -> EdgeArrays:
+    labels = list(graph.nodes())
+    index = {node: i for i, node in enumerate(labels)}
+    m = graph.number_of_edges()
+    src = np.fromiter((index[u] for u, _ in graph.edges()), dtype=np.int64, count=m)
+    dst = np.fromiter((index[v] for _, v in graph.edges()), dtype=np.int64, count=m)
+    weight = np.fromiter((w for _, _, w in graph.edges(data=weight_attr, default=1.0)), dtype=np.float64, count=m)
+    return EdgeArrays([str(label) for label in labels], src, dst, weight)
+
+
+# === запись ===
+
+def _edge_lines(arrays: EdgeArrays, template: str, chunk_edges: int, offset: int = None):
+    """Строки рёбер блоками; offset — сдвиг номеров вместо меток (DIMACS)"""
+    labels = None if offset is not None else np.array(arrays.labels, dtype=object)
+    for start in range(0, arrays.m, chunk_edges):
+        stop = start + chunk_edges
+        if labels is None:
+            us = (arrays.src[start:stop] + offset).tolist()
+            vs = (arrays.dst[start:stop] + offset).tolist()
+        else:
+            us = labels[arrays.src[start:stop]].tolist()
+            vs = labels[arrays.dst[start:stop]].tolist()
+        weights = _weight_values(arrays.weight[start:stop])
+        yield "".join(template.format(u, v, w) for u, v, w in zip(us, vs, weights))
+
+
+def _as_arrays(graph) -> EdgeArrays:
+    return graph if isinstance(graph, EdgeArrays) else from_networkx(graph)
+
+
+def write_edge_list(path, graph, chunk_edges: int = 100_000):
+    arrays = _as_arrays(graph)
+    with open(path, "w", encoding="utf-8") as f:
+        for block in _edge_lines(arrays, "{} {} {}\n", chunk_edges):
+            f.write(block)
+
+
+def write_csv(path, graph, chunk_edges: int = 100_000):
+    arrays = _as_arrays(graph)
+    if any("," in label or '"' in label for label in arrays.labels):
+        raise ValueError("Метки вершин с запятыми или кавычками не поддерживаются в CSV")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("source,target,weight\n")
+        for block in _edge_lines(arrays, "{},{},{}\n", chunk_edges):
+            f.write(block)
+
+
+def write_dimacs(path, graph, problem: str = None, source=None, sink=None, chunk_edges: int = 100_000):
+    """
+    DIMACS с номерами вершин 1..n в порядке меток. problem по умолчанию —
+    'sp' для .gr/.sp и 'max' для остальных. Для problem='max' исток и сток
+    задаются метками (по умолчанию первая и последняя вершины).
+    """
+    if problem is None:
+        problem = "sp" if os.path.splitext(str(path))[1].lower() in _DIMACS_SP_EXTENSIONS else "max"
+    arrays = _as_arrays(graph)
+    index = {label: i for i, label in enumerate(arrays.labels)}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"p {problem} {arrays.n} {arrays.m}\n")
+        if problem == "max" and arrays.n:
+            s = index[str(source)] if source is not None else 0
+            t = index[str(sink)] if sink is not None else arrays.n - 1
+            f.write(f"n {s + 1} s\nn {t + 1} t\n")
+        for block in _edge_lines(arrays, "a {} {} {}\n", chunk_edges, offset=1):
+            f.write(block)
+
+
+def write_graph(path, graph, fmt: str = None, **options):
+    fmt = fmt or _format_from_path(path)
+    writer = {"edgelist": write_edge_list, "csv": write_csv, "dimacs": write_dimacs}[fmt]
+    writer(path, graph, **options)
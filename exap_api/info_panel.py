@@ -0,0 +1,155 @@
+from itertools import islice
+import tkinter as tk
+from tkinter import ttk
+
+
+class GraphInfoPanel:
+    """
+    Панель «Информация о графе» на ttk.Treeview с ленивым заполнением.
+
+    Количество вершин и рёбер показывается сразу, а строки разделов
+    вставляются страницами по page_size только при раскрытии раздела или
+    по двойному клику на строку «… ещё N». Правка одной вершины или ребра
+    меняет одну строку вместо полной перерисовки списка.
+
+    Загруженные строки всегда образуют префикс собственного упорядоченного
+    словаря раздела: новые элементы добавляются в конец, поэтому следующая
+    страница — это просто срез после уже загруженных строк.
+    """
+
+    SECTIONS = {"nodes": "Вершины", "edges": "Рёбра"}
+
+    def __init__(self, parent, page_size: int = 200):
+        self.page_size = page_size
+        self._items = {section: {} for section in self.SECTIONS}  # ключ -> значение столбца
+        self._rows = {section: {} for section in self.SECTIONS}   # ключ -> iid загруженной строки
+        self._more = {section: None for section in self.SECTIONS}  # iid строки «… ещё N»
+
+        self.frame = ttk.Frame(parent)
+        self.counts_var = tk.StringVar(value="Граф пуст")
+        ttk.Label(self.frame, textvariable=self.counts_var).pack(anchor=tk.W, pady=(0, 5))
+
+        tree_frame = ttk.Frame(self.frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=("value",), height=10, selectmode=tk.BROWSE)
+        self.tree.heading("#0", text="Элемент")
+        self.tree.heading("value", text="Вес")
+        self.tree.column("#0", width=140, stretch=True)
+        self.tree.column("value", width=60, stretch=False, anchor=tk.E)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        for section, title in self.SECTIONS.items():
+            self.tree.insert("", tk.END, iid=section, text=title, open=False)
+
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.tree.bind("<Return>", self._on_double_click)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # === полное и точечное обновление ===
+
+    def set_graph(self, graph):
+        """Сбрасывает панель под граф целиком; строки будут загружены при раскрытии"""
+        nodes = dict.fromkeys(graph.nodes(), "")
+        edges = {(u, v): w for u, v, w in graph.edges(data='weight', default=1.0)}
+        for section, items in (("nodes", nodes), ("edges", edges)):
+            self.tree.delete(*self.tree.get_children(section))
+            self._items[section] = items
+            self._rows[section] = {}
+            self._more[section] = None
+            self.tree.item(section, open=False)
+            self._update_section(section)
+        self._update_counts()
+
+    def node_added(self, node):
+        self._add("nodes", node, "")
+
+    def node_removed(self, node):
+        for edge in [edge for edge in self._items["edges"] if node in edge]:
+            self._remove("edges", edge)
+        self._remove("nodes", node)
+
+    def edge_added(self, u, v, weight):
+        self._add("edges", (u, v), weight)
+
+    def edge_removed(self, u, v):
+        self._remove("edges", (u, v))
+
+    # === внутреннее ===
+
+    @staticmethod
+    def _row_text(section, key):
+        return key if section == "nodes" else f"{key[0]} → {key[1]}"
+
+    def _add(self, section, key, value):
+        items = self._items[section]
+        rows = self._rows[section]
+        if key in items:
+            items[key] = value
+            if key in rows:
+                self.tree.item(rows[key], values=(value,))
+            return
+        # Строку вставляем, только если все предыдущие уже загружены — префикс сохраняется
+        fully_loaded = len(rows) == len(items)
+        items[key] = value
+        if fully_loaded and self.tree.item(section, "open"):
+            rows[key] = self.tree.insert(section, tk.END, text=self._row_text(section, key), values=(value,))
+        self._update_section(section)
+        self._update_counts()
+
+    def _remove(self, section, key):
+        if key not in self._items[section]:
+            return
+        del self._items[section][key]
+        iid = self._rows[section].pop(key, None)
+        if iid is not None:
+            self.tree.delete(iid)
+        self._update_section(section)
+        self._update_counts()
+
+    def _load_page(self, section):
+        rows = self._rows[section]
+        items = self._items[section]
+        for key in islice(items, len(rows), len(rows) + self.page_size):
+            rows[key] = self.tree.insert(section, tk.END, text=self._row_text(section, key),
+                                         values=(items[key],))
+        self._update_section(section)
+
+    def _update_section(self, section):
+        """Заголовок раздела и строка «… ещё N» в его конце"""
+        total = len(self._items[section])
+        self.tree.item(section, text=f"{self.SECTIONS[section]} ({total})")
+        remaining = total - len(self._rows[section])
+        more = self._more[section]
+        if remaining <= 0:
+            if more is not None:
+                self.tree.delete(more)
+                self._more[section] = None
+            return
+        text = f"… ещё {remaining} (двойной клик)"
+        if more is None:
+            self._more[section] = self.tree.insert(section, tk.END, text=text)
+        else:
+            self.tree.item(more, text=text)
+            self.tree.move(more, section, tk.END)
+
+    def _update_counts(self):
+        nodes, edges = len(self._items["nodes"]), len(self._items["edges"])
+        self.counts_var.set(f"Вершин: {nodes}   Рёбер: {edges}" if nodes else "Граф пуст")
+
+    def _on_open(self, event):
+        section = self.tree.focus()
+        if section in self.SECTIONS and not self._rows[section]:
+            self._load_page(section)
+
+    def _on_double_click(self, event):
+        iid = self.tree.focus()
+        for section, more in self._more.items():
+            if iid == more:
+                self._load_page(section)
+                return "break"
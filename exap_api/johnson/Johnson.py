@@ -10,12 +10,17 @@ class JohnsonSolver:
         self.graph = graph
         self.n = n
         self.result = Result()
+        self.metrics = self.result.metrics
         self.step_count = 0
         self.node_labels = list(range(n))
+        # Задача exap_api.executor.Job при фоновом запуске: точки отмены и прогресс
+        self.job = None
 
     def _log(self, title: str, data: str = "", graph=None):
         self.step_count += 1
-        nx_graph = adjacency_list_to_networkx(self.graph if not graph else graph, self.node_labels)
+        self.metrics.count("snapshots")
+        with self.metrics.phase("snapshot"):
+            nx_graph = adjacency_list_to_networkx(self.graph if not graph else graph, self.node_labels)
         self.result.add_step(f"{self.step_count}. {title}", nx_graph, data)
 
     def bellman_ford(self, graph, n, src):
@@ -30,11 +35,15 @@ class JohnsonSolver:
         row0 = ["0"] + [f"{d:.1f}" if d != float('inf') else "∞" for d in dist]
         table_rows.append(row0)
 
+        relaxations = 0
         for iteration in range(1, n):
+            if self.job is not None:
+                self.job.tick(iteration, n - 1, "Беллман — Форд, итерация")
             prev_dist = dist.copy()
 
             for _ in range(n - 1):
                 for u in range(n):
+                    relaxations += len(graph[u])
                     for v, weight in graph[u]:
                         if dist[u] != float("inf") and dist[u] + weight < dist[v]:
                             dist[v] = dist[u] + weight
@@ -50,6 +59,8 @@ class JohnsonSolver:
             if dist == prev_dist:
                 break
 
+        self.metrics.count("bf_iterations", iteration if n > 1 else 0)
+        self.metrics.count("bf_relaxations", relaxations)
         table_str = self._format_table(table_rows)
         return dist, table_str
 
@@ -82,12 +93,20 @@ class JohnsonSolver:
         dist = [float("inf")] * n
         dist[src] = 0
         min_heap = [(0, src)]
+        pushes = pops = relaxations = 0
         while min_heap:
             u_distance, u = heapq.heappop(min_heap)
+            pops += 1
+            relaxations += len(graph[u])
             for v, weight in graph[u]:
                 if u_distance + weight < dist[v]:
                     dist[v] = u_distance + weight
                     heapq.heappush(min_heap, (dist[v], v))
+                    pushes += 1
+        self.metrics.count("dijkstra_runs")
+        self.metrics.count("heap_pushes", pushes + 1)
+        self.metrics.count("heap_pops", pops)
+        self.metrics.count("dijkstra_relaxations", relaxations)
         return dist
 
     def update_graph(self, graph):
@@ -106,7 +125,8 @@ class JohnsonSolver:
         self._log("2. Добавление фиктивной вершины S",
                   f"Добавлена вершина S (индекс {self.n}")
 
-        h, bf_table = self.bellman_ford(new_graph, self.n + 1, self.n)
+        with self.metrics.phase("bellman_ford"):
+            h, bf_table = self.bellman_ford(new_graph, self.n + 1, self.n)
         self._log("3. Беллман-Форд из вершины S",
                   f"Таблица итераций:\n\n{bf_table}\n\n" +
                   f"Потенциалы h(v):\n" +
@@ -117,11 +137,12 @@ class JohnsonSolver:
         h_formula += "Пересчёт рёбер:\n"
 
         reweighted_graph = [[] for _ in range(self.n)]
-        for u in range(self.n):
-            for v, weight in self.graph[u]:
-                new_weight = weight + h[u] - h[v]
-                reweighted_graph[u].append((v, new_weight))
-                h_formula += f"V{u}→V{v}: {weight:.1f} + {h[u]:.1f} - {h[v]:.1f} = {new_weight:.1f}\n"
+        with self.metrics.phase("reweight"):
+            for u in range(self.n):
+                for v, weight in self.graph[u]:
+                    new_weight = weight + h[u] - h[v]
+                    reweighted_graph[u].append((v, new_weight))
+                    h_formula += f"V{u}→V{v}: {weight:.1f} + {h[u]:.1f} - {h[v]:.1f} = {new_weight:.1f}\n"
 
         self.update_graph(reweighted_graph)
         self._log("4. Перевзвешивание рёбер", h_formula)
@@ -131,7 +152,10 @@ class JohnsonSolver:
 
         distances = []
         for u in range(self.n):
-            dist = self.dijkstra(reweighted_graph, u, self.n)
+            if self.job is not None:
+                self.job.tick(u, self.n, "Дейкстра, источников")
+            with self.metrics.phase("dijkstra"):
+                dist = self.dijkstra(reweighted_graph, u, self.n)
             true_dist = [d + h[v] - h[u] for v, d in enumerate(dist)]
             distances.append(true_dist)
 
@@ -0,0 +1,180 @@
+import threading
+
+import numpy as np
+
+
+def place_new_nodes(xy: np.ndarray, known: np.ndarray, src: np.ndarray, dst: np.ndarray,
+                    k: float = 3.0, seed=None) -> np.ndarray:
+    """
+    Начальные координаты для вершин без позиции (known[i] == False).
+
+    Вершина с уже размещёнными соседями ставится в их центр масс с небольшим
+    сдвигом, остальные — случайно в квадрате площади n * k^2 вокруг центра
+    размещённой части графа.
+    """
+    rng = np.random.default_rng(seed)
+    xy = np.array(xy, dtype=float).reshape(-1, 2)
+    n = len(xy)
+    new = ~known
+    if not new.any():
+        return xy
+
+    center = xy[known].mean(axis=0) if known.any() else np.zeros(2)
+    side = k * np.sqrt(max(n, 1))
+    xy[new] = center + rng.uniform(-side / 2, side / 2, size=(int(new.sum()), 2))
+    if not known.any():
+        return xy
+
+    # Центр масс размещённых соседей: по обоим направлениям рёбер
+    sums = np.zeros((n, 2))
+    counts = np.zeros(n)
+    for a, b in ((src, dst), (dst, src)):
+        mask = new[a] & known[b]
+        np.add.at(sums, a[mask], xy[b[mask]])
+        np.add.at(counts, a[mask], 1)
+    anchored = new & (counts > 0)
+    xy[anchored] = sums[anchored] / counts[anchored, None] + rng.normal(0, k / 2, size=(int(anchored.sum()), 2))
+    return xy
+
+
+def force_layout(xy: np.ndarray, src: np.ndarray, dst: np.ndarray, movable: np.ndarray = None,
+                 k: float = 3.0, iterations: int = 50, grid: int = 24, temperature: float = None,
+                 gravity: float = 0.5, should_stop=None) -> np.ndarray:
+    """
+    Силовая укладка Фрюхтермана–Рейнгольда с приближённым отталкиванием.
+
+    Вершины раскладываются по сетке grid x grid над текущим bounding box;
+    вершина отталкивается от центров масс ячеек с весом их населённости,
+    а в своей ячейке — от центра масс остальных её вершин. Стоимость
+    итерации O(|movable| * grid^2 + m) вместо O(n^2). Слабая гравитация к
+    центру масс не даёт несвязным частям разлетаться: граф занимает круг
+    радиуса порядка k * sqrt(n / gravity).
+
+    Args:
+        xy: стартовые координаты (n, 2), тёплый старт
+        src, dst: индексы концов рёбер
+        movable: маска двигаемых вершин (None — все); остальные только отталкивают
+        k: желаемая длина ребра
+        temperature: начальный предел сдвига за итерацию (по умолчанию 1/10 размера графа)
+        should_stop: функция без аргументов; True прерывает укладку
+
+    Returns:
+        Новый массив координат (n, 2).
+    """
+    xy = np.array(xy, dtype=float).reshape(-1, 2)
+    n = len(xy)
+    if n < 2:
+        return xy
+    moving = np.flatnonzero(movable) if movable is not None else np.arange(n)
+    if len(moving) == 0:
+        return xy
+
+    k2 = k * k
+    if temperature is None:
+        temperature = max(np.ptp(xy, axis=0).max(), k) / 10
+    chunk = max(1, 2_000_000 // (grid * grid))
+
+    for iteration in range(iterations):
+        if should_stop is not None and should_stop():
+            break
+
+        low = xy.min(axis=0)
+        span = np.maximum(xy.max(axis=0) - low, 1e-9)
+        cell_xy = np.minimum((xy - low) / span * grid, grid - 1).astype(np.int64)
+        cell = cell_xy[:, 0] * grid + cell_xy[:, 1]
+        counts = np.bincount(cell, minlength=grid * grid).astype(float)
+        sums = np.stack((np.bincount(cell, xy[:, 0], grid * grid),
+                         np.bincount(cell, xy[:, 1], grid * grid)), axis=1)
+        occupied = np.flatnonzero(counts)
+        centers = sums[occupied] / counts[occupied, None]
+        weights = counts[occupied]
+        slot = np.full(grid * grid, -1)
+        slot[occupied] = np.arange(len(occupied))
+
+        disp = np.zeros((len(moving), 2))
+        for start in range(0, len(moving), chunk):
+            rows = moving[start:start + chunk]
+            delta = xy[rows, None, :] - centers[None, :, :]
+            dist2 = np.einsum('ijk,ijk->ij', delta, delta) + 1e-9
+            force = weights[None, :] * k2 / dist2
+            # Своя ячейка: вместо центра со своим вкладом — центр остальных вершин ячейки
+            own = slot[cell[rows]]
+            local = np.arange(len(rows))
+            force[local, own] = 0.0
+            disp[start:start + len(rows)] = np.einsum('ij,ijk->ik', force, delta)
+
+            others = counts[cell[rows]] - 1
+            has_others = others > 0
+            rest = (sums[cell[rows]] - xy[rows]) / np.maximum(others, 1)[:, None]
+            delta_own = xy[rows] - rest
+            dist2_own = (delta_own ** 2).sum(axis=1) + 1e-9
+            disp[start:start + len(rows)] += (has_others * others * k2 / dist2_own)[:, None] * delta_own
+
+        # Притяжение по рёбрам: d^2 / k вдоль ребра, на обе вершины
+        if len(src):
+            delta = xy[dst] - xy[src]
+            dist = np.sqrt((delta ** 2).sum(axis=1)) + 1e-9
+            pull = delta * (dist / k)[:, None]
+            attraction = np.zeros((n, 2))
+            np.add.at(attraction, src, pull)
+            np.add.at(attraction, dst, -pull)
+            disp += attraction[moving]
+
+        disp += gravity * (xy.mean(axis=0) - xy[moving])
+
+        # Сдвиг не больше текущей температуры; температура линейно остывает
+        limit = temperature * (1 - iteration / iterations)
+        length = np.sqrt((disp ** 2).sum(axis=1)) + 1e-9
+        xy[moving] += disp * (np.minimum(length, limit) / length)[:, None]
+
+    return xy
+
+
+def neighbourhood(n: int, src: np.ndarray, dst: np.ndarray, seeds: np.ndarray, hops: int = 1) -> np.ndarray:
+    """Маска вершин seeds и их соседей на расстоянии до hops рёбер (без учёта направления)"""
+    mask = np.zeros(n, dtype=bool)
+    mask[seeds] = True
+    for _ in range(hops):
+        touched = mask[src] | mask[dst]
+        grown = mask.copy()
+        grown[src[touched]] = True
+        grown[dst[touched]] = True
+        mask = grown
+    return mask
+
+
+class LayoutJob:
+    """
+    Укладка в фоновом потоке. NumPy отпускает GIL на больших операциях,
+    поэтому окно остаётся отзывчивым; результат забирается опросом
+    (root.after) через done/result, cancel() прерывает расчёт.
+    """
+
+    def __init__(self, xy, src, dst, movable=None, **options):
+        self._args = (xy, src, dst, movable)
+        self._options = options
+        self._cancelled = threading.Event()
+        self.result = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def _run(self):
+        try:
+            self.result = force_layout(*self._args, should_stop=self._cancelled.is_set, **self._options)
+        except Exception as e:
+            self.error = e
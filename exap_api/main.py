@@ -1,31 +1,129 @@
+import traceback
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import networkx as nx
-import json
-import numpy as np
 
+from .cache import result_size
 from .dataclass import Result, Step
+from .step_log import StepLogView
 from .dinic import DinicSolver
 from .johnson import JohnsonSolver
 from .utils import networkx_to_dinic_format, networkx_to_adjacency_list_with_labels
 
 
 class ExapApi:
-    def __init__(self, root, graph):
+    # Графы до SYNC_LIMIT вершин считаются сразу, большие — в фоне через executor
+    SYNC_LIMIT = 50
+
+    def __init__(self, root, graph, executor=None, cache=None, model=None):
         self.root = root
         self.graph = graph
+        # exap_api.executor.Executor окна редактора; без него всё считается в потоке Tk
+        self.executor = executor
+        # exap_api.cache.ResultCache: готовые Result по отпечатку графа модели
+        self.cache = cache
+        # exap_api.model.GraphModel редактора: готовые входы решателей; без неё граф переводится заново
+        self.model = model
+        self.job = None
         self.dinic_input_window = None
         self.input_window = None
+        self.result_window = None
+        # Пороги уровня детализации; создаются при первой отрисовке вместе с matplotlib
+        self.lod = None
 
     def johnson(self):
+        key = self.cache_key("johnson")
+        if self.show_cached(key):
+            return
 
-        new_g, labels = networkx_to_adjacency_list_with_labels(self.graph)
+        if self.model is not None:
+            new_g, labels = self.model.adjacency()
+        else:
+            new_g, labels = networkx_to_adjacency_list_with_labels(self.graph)
 
         solver = JohnsonSolver(len(new_g), new_g)
-        solver.johnsons_algorithm()
-        self.show_result(solver.result)
+        self.run(solver, "Алгоритм Джонсона", solver.johnsons_algorithm, key=key)
+
+    def cache_key(self, algorithm, *params):
+        """Ключ кэша для текущего графа; None — кэш не подключён"""
+        if self.cache is None or self.model is None:
+            return None
+        return self.model.fingerprint.key, algorithm, params
+
+    def show_cached(self, key) -> bool:
+        result = self.cache.get(key) if key is not None else None
+        if result is None:
+            return False
+        self.show_result(result)
+        self.set_status("Из кэша: граф с прошлого запуска не менялся", running=False)
+        return True
+
+    def run(self, solver, title, method, *args, key=None):
+        """
+        Запускает method(*args) решателя. В фоне шаги solver.result
+        показываются по мере записи: окно результата открывается с первым
+        шагом, кнопки «Назад»/«Вперед» видят уже готовые шаги.
+        Законченный (не отменённый) результат сохраняется в кэш под key.
+        """
+        sizes = {}
+
+        def compute(job):
+            solver.job = job
+            value = method(*args)
+            if key is not None:
+                # Размер для кэша считается здесь, в фоне: на тысячах шагов это секунды
+                sizes["result"] = result_size(solver.result)
+            return value
+
+        def progress(job):
+            if self.result_window is None and solver.result.steps:
+                self.show_result(solver.result)
+            if self.result_window_open():
+                self.set_status(job.describe())
+
+        def store(job):
+            if key is not None:
+                self.cache.put(key, solver.result, sizes.get("result"))
+
+        def finish(status, before=None):
+            def callback(job):
+                if before is not None:
+                    before(job)
+                if self.result_window is None and solver.result.steps:
+                    self.show_result(solver.result)
+                if self.result_window_open():
+                    self.set_status(status(job), running=False)
+                    self.metrics_label.config(text=solver.result.metrics.summary())
+                self.job = None
+            return callback
+
+        inline = self.executor is None or solver.n <= self.SYNC_LIMIT
+        if inline:
+            method(*args)
+            store(None)
+            self.show_result(solver.result)
+            return
+        self.job = self.executor.submit(
+            compute, title, on_progress=progress,
+            on_done=finish(lambda job: f"Готово: шагов {len(solver.result.steps)}", store),
+            on_cancel=finish(lambda job: f"Отменено, записано шагов: {len(solver.result.steps)}"),
+            on_error=finish(lambda job: f"Ошибка: {job.error}", lambda job: traceback.print_exception(job.error)))
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def result_window_open(self) -> bool:
+        return self.result_window is not None and bool(self.result_window.winfo_exists())
+
+    def close_result(self):
+        # Закрытое окно больше не нужно обновлять: фоновый расчёт останавливается
+        self.cancel()
+        self.result_window.destroy()
+
+    def set_status(self, text, running=True):
+        self.status_label.config(text=text)
+        self.cancel_button.config(state=tk.NORMAL if running and self.job is not None else tk.DISABLED)
 
     def dinic(self):
         self.input_window = tk.Toplevel(self.root)
@@ -58,11 +156,18 @@ class ExapApi:
         self.input_window.geometry(f"+{x}+{y}")
 
     def calculate_dinic(self):
-        new_g, labels = networkx_to_dinic_format(self.graph)
+        source, sink = int(self.source_entry.get()), int(self.sink_entry.get())
+        key = self.cache_key("dinic", source, sink)
+        if self.show_cached(key):
+            return
+
+        if self.model is not None:
+            new_g, labels = self.model.residual()
+        else:
+            new_g, labels = networkx_to_dinic_format(self.graph)
 
         solver = DinicSolver(len(new_g), new_g)
-        solver.max_flow(int(self.source_entry.get()), int(self.sink_entry.get()))
-        self.show_result(solver.result)
+        self.run(solver, "Алгоритм Диница", solver.max_flow, source, sink, key=key)
 
     def show_result(self, result: Result):
 
@@ -74,6 +179,7 @@ class ExapApi:
         result_window.geometry("1200x700")
 
         self.result_window = result_window
+        result_window.protocol("WM_DELETE_WINDOW", self.close_result)
 
         left_frame = tk.Frame(result_window, width=500, bg='lightgray')
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5)
@@ -88,8 +194,8 @@ class ExapApi:
         output_frame = ttk.Frame(left_frame)
         output_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        # Создаем прокручиваемое текстовое поле на весь экран
-        self.output_text = scrolledtext.ScrolledText(output_frame, font=('Courier', 9))
+        # Журнал шагов: только текст текущего шага, видимые строки
+        self.output_text = StepLogView(output_frame, font=('Courier', 9))
         self.output_text.pack(fill=tk.BOTH, expand=True)
 
         steps_frame = tk.LabelFrame(left_frame, text="Шаги детерминации", bg='lightgray')
@@ -99,6 +205,19 @@ class ExapApi:
                   bg='lightyellow').grid(row=0, column=0, padx=5, pady=10)
         tk.Button(steps_frame, text="Вперед", command=self.next_result_step,
                   bg='lightyellow').grid(row=0, column=1, padx=5, pady=10)
+        tk.Button(steps_frame, text="Метрики", command=self.toggle_metrics,
+                  bg='lightyellow').grid(row=0, column=2, padx=5, pady=10)
+        # Пока решатель работает в фоне, шаги дописываются, а его можно остановить
+        self.cancel_button = tk.Button(steps_frame, text="Отмена", command=self.cancel, bg='mistyrose',
+                                       state=tk.NORMAL if self.job is not None else tk.DISABLED)
+        self.cancel_button.grid(row=0, column=3, padx=5, pady=10)
+        self.status_label = tk.Label(steps_frame, text="", font=('Courier', 9), bg='lightgray', anchor=tk.W)
+        self.status_label.grid(row=1, column=0, columnspan=4, sticky=tk.W, padx=5)
+
+        # Метрики фаз скрыты до нажатия кнопки
+        self.metrics_label = tk.Label(left_frame, text=result.metrics.summary(), font=('Courier', 9),
+                                      justify=tk.LEFT, anchor=tk.W, bg='lightgray')
+        self.steps_frame = steps_frame
 
         self.table_container = tk.Frame(self.result_left_frame, bg='lightgray')
         self.table_container.pack(fill=tk.BOTH, expand=True, pady=10, padx=5)
@@ -122,12 +241,22 @@ class ExapApi:
 
             for widget in self.graph_container.winfo_children():
                 widget.destroy()
-            self.output_text.insert(tk.END, "\n" + step.title + "\n     " + step.data)
+            self.output_text.show_step(self.current_step_index, step.title, step.data)
             # 6. Создаем новый граф
             self.create_result_graph(self.graph_container, step.graph, step.title)
 
+    def toggle_metrics(self):
+        if self.metrics_label.winfo_ismapped():
+            self.metrics_label.pack_forget()
+        else:
+            self.metrics_label.pack(fill=tk.X, padx=5, after=self.steps_frame)
+
     def create_result_graph(self, parent, data, title):
         """Создает граф для шага в указанном parent"""
+        # matplotlib грузится при первом показе графа, а не при импорте пакета
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         # if self.fig:
         #     plt.close(self.fig)
         self.fig, ax = plt.subplots(figsize=(10, 10))
@@ -174,42 +303,53 @@ class ExapApi:
     def draw_graph(self, ax, G: nx.DiGraph, title="Визуализация графа"):
 
         if len(G.nodes()) > 0:
+            from .rendering import EdgeLayer, LevelOfDetail, draw_clusters
+            import numpy as np
+
+            if self.lod is None:
+                self.lod = LevelOfDetail()
+            # Окно шага не масштабируется, поэтому решают только размеры графа
+            detail = self.lod.decide(G.number_of_nodes(), G.number_of_edges())
+
             # Располагаем по кругу
             pos = nx.circular_layout(G)
 
+            if detail["cluster"]:
+                index = {node: i for i, node in enumerate(pos)}
+                xy = np.array(list(pos.values()), dtype=float)
+                pairs = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+                draw_clusters(ax, xy, pairs[:, 0], pairs[:, 1], self.lod)
+                ax.set_title(title, fontsize=14, fontweight='bold')
+                ax.axis('off')
+                ax.set_aspect('equal')
+                return
+
             # Рисуем узлы
             nx.draw_networkx_nodes(G, pos, node_size=2000,
                                    ax=ax, edgecolors='black', linewidths=2)
-            nx.draw_networkx_labels(G, pos, ax=ax, font_weight='bold', font_size=12)
-
-            # Рисуем ребра
-            edge_labels = nx.get_edge_attributes(G, 'label')
-            # nx.draw_networkx_edges(G, pos, ax=ax, arrows=True,
-            #                        arrowstyle='-|>', arrowsize=20,
-            #                        edge_color='gray', connectionstyle='arc3,rad=0.1')
+            if detail["node_labels"]:
+                nx.draw_networkx_labels(G, pos, ax=ax, font_weight='bold', font_size=12)
 
-            nx.draw_networkx_edges(G, pos, ax=ax, arrows=True,
-                                   arrowstyle='-|>', arrowsize=30,
-                                   edge_color='gray',
-                                   connectionstyle='arc3,rad=0.1',
-                                   node_size=1500)
+            # Рисуем ребра одной коллекцией; встречные рёбра остаточной сети
+            # разводятся боковым сдвигом вместо дуг connectionstyle
 
-            edge_labels = {}
+            edges = []
+            edge_labels = []
             for u, v, data in G.edges(data=True):
+                if u == v:
+                    continue
                 # Получаем вес или capacity
                 weight = data.get('weight')
                 capacity = data.get('capacity')
-
-                if weight is not None:
-                    edge_labels[(u, v)] = weight
-                elif capacity is not None:
-                    edge_labels[(u, v)] = capacity
-
-            # Рисуем метки рёбер
-            if edge_labels:
-                nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=edge_labels,
-                                             font_size=10, bbox=dict(boxstyle="round,pad=0.3",
-                                                                     facecolor="white", alpha=0.8))
+                edges.append((u, v))
+                edge_labels.append(weight if weight is not None else capacity)
+
+            layer = EdgeLayer(ax, shrink=0.13, head_length=0.06, head_width=0.05,
+                              offset=0.03, label_offset=0.07)
+            layer.set_edges(edges, pos, weights=edge_labels, label_fmt="{}",
+                            label_bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8)
+                            if detail["label_bbox"] else None,
+                            show_labels=detail["edge_labels"], show_heads=detail["arrows"])
 
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.axis('off')
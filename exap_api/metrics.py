@@ -0,0 +1,59 @@
+import time
+from contextlib import contextmanager
+
+
+class Metrics:
+    """
+    Счётчики и таймеры фаз алгоритма.
+
+    Время фаз считается «собственным»: если фаза вложена в другую (например,
+    снимок графа внутри DFS), её время вычитается из внешней фазы, поэтому
+    сумма по фазам равна общему времени без двойного учёта.
+    """
+
+    def __init__(self):
+        self.counters: dict[str, int] = {}
+        self.timings: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self._stack = []
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def phase(self, name: str):
+        frame = [time.perf_counter(), 0.0]  # [начало, время вложенных фаз]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed - frame[1]
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.timings.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timings": dict(self.timings),
+            "calls": dict(self.calls),
+        }
+
+    def summary(self) -> str:
+        lines = ["Фазы (собственное время):"]
+        total = self.total_time or 1.0
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<12} {seconds * 1000:9.2f} ms  {seconds / total:6.1%}  "
+                         f"x{self.calls[name]}")
+        lines.append(f"  {'всего':<12} {self.total_time * 1000:9.2f} ms")
+        if self.counters:
+            lines.append("Счётчики:")
+            for name, value in self.counters.items():
+                lines.append(f"  {name:<22} {value}")
+        return "\n".join(lines)
@@ -0,0 +1,131 @@
+"""
+Граф редактора вместе с готовыми представлениями для решателей.
+
+Раньше каждый запуск заново переводил nx.DiGraph во вход решателя:
+CSR для Тарьяна, Прима и A*, остаточную сеть для Диница, список
+смежности для Джонсона. GraphModel строит каждое представление при
+первом запросе и держит до правки графа. Правки идут через методы модели
+(add_node, add_edge, remove_edge), замена графа целиком — через reset().
+
+После правки:
+    compact   — CSR не патчится (вставка в середину массивов стоит O(m)),
+                вид сбрасывается и строится заново при следующем запросе;
+    residual  — номера обратных дуг после удаления ребра съезжают, вид
+                тоже сбрасывается;
+    adjacency — список смежности Джонсона дописывается по журналу правок
+                при следующем запросе: порядок тот же, что у построения
+                с нуля, потому что networkx добавляет новое ребро в конец
+                соседей, а смена веса оставляет его на месте.
+
+Решатели могут работать в фоне, пока граф правят. CSR после построения не
+меняется, остаточная сеть выдаётся копией (Диниц меняет ёмкости дуг), а
+список смежности, уже отданный решателю, перед патчем копируется.
+"""
+import networkx as nx
+
+from .cache import GraphFingerprint
+from .compact import CompactGraph
+from .dinic.dataclass import Edge
+from .utils import networkx_to_dinic_format, networkx_to_adjacency_list_with_labels
+
+
+class GraphModel:
+
+    def __init__(self, graph: nx.DiGraph = None):
+        self.graph = graph if graph is not None else nx.DiGraph()
+        self.version = 0
+        self.fingerprint = GraphFingerprint.from_networkx(self.graph)
+        self._views = {}    # имя -> (версия графа, представление)
+        self._edits = []    # правки после построения adjacency: (операция, аргументы)
+        self._shared = False  # adjacency уже отдан решателю: патчить копию
+
+    def reset(self, graph: nx.DiGraph = None):
+        """Граф заменён или перестроен целиком: все представления сбрасываются"""
+        if graph is not None:
+            self.graph = graph
+        self.version += 1
+        self.fingerprint = GraphFingerprint.from_networkx(self.graph)
+        self._views.clear()
+        self._edits.clear()
+
+    # === Правки ===
+
+    def add_node(self, node):
+        self.graph.add_node(node)
+        self.fingerprint.add_node(node)
+        self._changed("node", node)
+
+    def add_edge(self, u, v, weight):
+        """Ребро между существующими вершинами; повторное ребро меняет вес"""
+        if self.graph.has_edge(u, v):
+            self.fingerprint.remove_edge(u, v, self.weight(u, v))
+        self.graph.add_edge(u, v, weight=weight)
+        self.fingerprint.add_edge(u, v, weight)
+        self._changed("edge", u, v, weight)
+
+    def remove_edge(self, u, v):
+        self.fingerprint.remove_edge(u, v, self.weight(u, v))
+        self.graph.remove_edge(u, v)
+        self._changed("remove", u, v)
+
+    def weight(self, u, v):
+        return self.graph.edges[u, v].get('weight', 1)
+
+    def _changed(self, *edit):
+        self.version += 1
+        self._views.pop("compact", None)
+        self._views.pop("residual", None)
+        if "adjacency" in self._views:
+            self._edits.append(edit)
+
+    # === Представления ===
+
+    def compact(self) -> CompactGraph:
+        """CSR-граф (SCCSolver, MSTSolver, AStarSolver, IncrementalSCC)"""
+        view = self._views.get("compact")
+        if view is None:
+            view = self._views["compact"] = (self.version, CompactGraph.from_networkx(self.graph))
+        return view[1]
+
+    def residual(self) -> tuple:
+        """(остаточная сеть, метки) для DinicSolver; каждый вызов — новые объекты Edge"""
+        view = self._views.get("residual")
+        if view is None:
+            view = self._views["residual"] = (self.version, networkx_to_dinic_format(self.graph))
+        arcs, labels = view[1]
+        return [[Edge(e.to, e.rev, e.capacity) for e in out] for out in arcs], labels
+
+    def adjacency(self) -> tuple:
+        """(список смежности [(v, вес)], метки) для JohnsonSolver; только для чтения"""
+        view = self._views.get("adjacency")
+        if view is None:
+            view = (self.version, networkx_to_adjacency_list_with_labels(self.graph))
+            self._edits.clear()
+        elif view[0] != self.version:
+            view = (self.version, self._patch_adjacency(*view[1]))
+        self._views["adjacency"] = view
+        self._shared = True
+        return view[1]
+
+    def _patch_adjacency(self, adjacency: list, labels: list) -> tuple:
+        if self._shared:
+            adjacency, labels = [list(out) for out in adjacency], list(labels)
+            self._shared = False
+        index = {label: i for i, label in enumerate(labels)}
+        for op, *args in self._edits:
+            if op == "node":
+                index[args[0]] = len(labels)
+                labels.append(args[0])
+                adjacency.append([])
+                continue
+            u, v = index[args[0]], index[args[1]]
+            out = adjacency[u]
+            at = next((i for i, (w, _) in enumerate(out) if w == v), None)
+            if op == "remove":
+                del out[at]
+            elif at is None:
+                out.append((v, args[2]))
+            else:
+                out[at] = (v, args[2])
+        self._edits.clear()
+        return adjacency, labels
@@ -0,0 +1,270 @@
+import heapq
+
+import numpy as np
+
+from exap_api.compact import CompactGraph
+from exap_api.dataclass import Result
+
+INF = float('inf')
+
+
+class MSTSolver:
+    """
+    Минимальное остовное дерево неориентированной версии графа.
+
+    Направление рёбер игнорируется, из u -> v и v -> u остаётся ребро с
+    меньшим весом (как в симметричной матрице прежней реализации).
+    Доступны два алгоритма:
+        prim    — по спискам смежности с двоичной кучей и ленивым удалением,
+                  O(m log n); протокол шагов совпадает с матричной версией;
+        kruskal — сортировка рёбер NumPy и система непересекающихся
+                  множеств со сжатием путей и объединением по размеру.
+    method="auto" выбирает Прима для плотных графов (и всегда при trace),
+    Краскала — для разреженных.
+
+    Результат: edges — рёбра дерева (u, v, вес) в порядке добавления,
+    order — номер шага, на котором вершина попала в дерево.
+    При trace=True в self.trace пишется протокол, а в self.result — шаг
+    на каждую вершину, добавленную в дерево. Веса в протоколе и в
+    labelled_edges выводятся через weight_of(u, v, вес) — вес в том виде, в
+    каком он хранится у исходного графа; по умолчанию это вес CompactGraph.
+    """
+
+    # Доля заполнения m / (n (n - 1) / 2), начиная с которой auto берёт Прима
+    PRIM_DENSITY = 0.25
+
+    def __init__(self, graph: CompactGraph, trace: bool = False, weight_of=None):
+        self.source = graph
+        self.graph = graph.undirected()
+        self.labels = graph.labels
+        self.n = graph.n
+        self.trace_enabled = trace
+        self.weight_of = weight_of if weight_of is not None else (lambda u, v, weight: weight)
+        self.trace: list[str] = []
+        self.result = Result()
+        self.metrics = self.result.metrics
+        self.method = None
+        self.edges: list[tuple] = []
+        self.order: dict[int, int] = {}
+        self.total_weight = 0
+        self.step_count = 0
+        self._snapshot = None
+        # Задача exap_api.executor.Job при фоновом запуске: точки отмены и прогресс
+        self.job = None
+
+    @classmethod
+    def from_networkx(cls, graph, trace: bool = False) -> "MSTSolver":
+        return cls(CompactGraph.from_networkx(graph), trace)
+
+    def _log(self, title: str, data: str = ""):
+        # Исходный граф не меняется: все шаги делят один снимок
+        self.step_count += 1
+        self.metrics.count("snapshots")
+        with self.metrics.phase("snapshot"):
+            if self._snapshot is None:
+                self._snapshot = self.source.to_networkx()
+        self.result.add_step(f"{self.step_count}. {title}", self._snapshot, data)
+
+    def _trace(self, text: str):
+        self.trace.append(text)
+
+    def is_connected(self) -> bool:
+        if self.n == 0:
+            return True
+        indptr, indices, _ = self.graph.adjacency_lists()
+        seen = bytearray(self.n)
+        seen[0] = 1
+        stack = [0]
+        reached = 1
+        while stack:
+            u = stack.pop()
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                if not seen[v]:
+                    seen[v] = 1
+                    reached += 1
+                    stack.append(v)
+        return reached == self.n
+
+    def choose_method(self) -> str:
+        if self.trace_enabled or self.n < 2:
+            return "prim"
+        density = (self.graph.m / 2) / (self.n * (self.n - 1) / 2)
+        return "prim" if density >= self.PRIM_DENSITY else "kruskal"
+
+    def solve(self, method: str = "auto") -> list:
+        """Строит дерево (лес для несвязного графа); возвращает рёбра (u, v, вес) номерами вершин"""
+        self.method = self.choose_method() if method == "auto" else method
+        self.edges, self.order, self.total_weight = [], {}, 0
+        with self.metrics.phase(self.method):
+            if self.method == "prim":
+                self._prim()
+            elif self.method == "kruskal":
+                self._kruskal()
+            else:
+                raise ValueError(f"неизвестный метод: {self.method}")
+        self.metrics.count("mst_edges", len(self.edges))
+        if self.trace_enabled:
+            self._log("Конец алгоритма", f"Рёбер в дереве: {len(self.edges)}, "
+                                         f"стоимость: {self.total_weight:.2f}")
+        return self.edges
+
+    def labelled_edges(self) -> list:
+        labels = self.labels
+        return [(labels[u], labels[v], self.weight_of(u, v, w)) for u, v, w in self.edges]
+
+    def labelled_order(self) -> dict:
+        return {self.labels[v]: step for v, step in self.order.items()}
+
+    def method_name(self) -> str:
+        return "Прим (двоичная куча)" if self.method == "prim" else "Краскал (система непересекающихся множеств)"
+
+    def report(self, limit: int = None) -> list:
+        """Строки итога: рёбра дерева (первые limit) и его стоимость"""
+        edges = self.labelled_edges()
+        lines = [f"Минимальное остовное дерево содержит {len(edges)} рёбер:"]
+        for i, (u, v, w) in enumerate(edges[:limit], 1):
+            lines.append(f"  {i}. {u} — {v} (вес = {w})")
+        if limit is not None and len(edges) > limit:
+            lines.append(f"  … ещё {len(edges) - limit} рёбер")
+        lines.append(f"\nОбщая стоимость MST: {self.total_weight:.2f}")
+        return lines
+
+    # === Прим ===
+
+    def _format_keys(self, key):
+        return [f'{x:.1f}' if x != INF else '∞' for x in key]
+
+    def _prim(self, start: int = 0):
+        indptr, indices, weights = self.graph.adjacency_lists()
+        labels = self.labels
+        n = self.n
+        trace = self.trace_enabled
+        key = [INF] * n
+        frt = [-1] * n
+        in_mst = [False] * n
+        key[start] = 0
+        heap = [(0, start)]
+        pops = 0
+        job = self.job
+
+        if trace:
+            self._trace(f"\n→ Инициализация:")
+            self._trace(f"  Начальная вершина: {labels[start]}")
+            self._trace(f"  key = {self._format_keys(key)}")
+            self._trace(f"  ftr = {['—'] * n}")
+            self._trace(f"  in_mst = {in_mst}")
+
+        for step in range(n):
+            if job is not None and not step & 1023:
+                job.tick(step, n, "вершин в дереве")
+            if trace:
+                logged = len(self.trace)
+                self._trace(f"\n→ Шаг {step + 1}/{n}:")
+
+            # Минимальный key среди вершин вне дерева; устаревшие записи кучи пропускаются
+            u = -1
+            while heap:
+                k, v = heapq.heappop(heap)
+                pops += 1
+                if not in_mst[v] and k == key[v]:
+                    u = v
+                    break
+            if u == -1:
+                if trace:
+                    self._trace("Нет доступных вершин — остановка.")
+                break
+
+            in_mst[u] = True
+            self.total_weight += key[u]
+            self.order[u] = step + 1
+            if frt[u] != -1:
+                self.edges.append((frt[u], u, key[u]))
+                if trace:
+                    self._trace(f"  Выбрана вершина: {labels[u]}")
+                    self._trace(f"  Добавлено ребро: {labels[frt[u]]} — {labels[u]} "
+                                f"(вес = {self.weight_of(frt[u], u, key[u])})")
+            elif trace:
+                self._trace(f"  Выбрана начальная вершина: {labels[u]}")
+
+            updated = []
+            for p in range(indptr[u], indptr[u + 1]):
+                v = indices[p]
+                if not in_mst[v] and weights[p] < key[v]:
+                    if trace:
+                        updated.append((labels[v], key[v], weights[p]))
+                    key[v] = weights[p]
+                    frt[v] = u
+                    heapq.heappush(heap, (key[v], v))
+
+            if trace:
+                self._trace(f"  Текущее дерево включает: {[labels[i] for i in range(n) if in_mst[i]]}")
+                self._trace(f"  key = {self._format_keys(key)}")
+                self._trace(f"  frt = {[(labels[frt[i]] if frt[i] != -1 else '—') if in_mst[i] or key[i] != INF else '—' for i in range(n)]}")
+                if updated:
+                    self._trace("  Обновлены ключи:")
+                    for v_name, old_k, new_k in updated:
+                        old_str = f"{old_k:.1f}" if old_k != INF else "∞"
+                        self._trace(f"    {v_name}: {old_str} → {new_k:.1f}")
+                else:
+                    self._trace("  Нет обновлений ключей.")
+                self._log(f"Вершина {labels[u]} в дереве", "\n".join(self.trace[logged:]).lstrip("\n"))
+
+        self.metrics.count("heap_pops", pops)
+
+    # === Краскал ===
+
+    def _kruskal(self):
+        graph = self.graph
+        src = graph.sources()
+        forward = src < graph.indices
+        order = np.argsort(graph.weights[forward], kind="stable")
+        src, dst, weights = src[forward][order], graph.indices[forward][order], graph.weights[forward][order]
+        labels = self.labels
+        trace = self.trace_enabled
+
+        parent = list(range(self.n))
+        size = [1] * self.n
+        needed = self.n - 1
+        scanned = 0
+        # Рёбра переводятся в списки блоками: дерево обычно набирается задолго до конца
+        chunk = max(1024, 4 * self.n)
+        for start in range(0, len(src), chunk):
+            if self.job is not None:
+                self.job.tick(start, len(src), "рёбер просмотрено")
+            a = src[start:start + chunk].tolist()
+            b = dst[start:start + chunk].tolist()
+            w = weights[start:start + chunk].tolist()
+            for i in range(len(a)):
+                scanned += 1
+                x = a[i]
+                while parent[x] != x:
+                    parent[x] = parent[parent[x]]
+                    x = parent[x]
+                y = b[i]
+                while parent[y] != y:
+                    parent[y] = parent[parent[y]]
+                    y = parent[y]
+                if x == y:
+                    if trace:
+                        self._trace(f"  Ребро {labels[a[i]]} — {labels[b[i]]} (вес = {self.weight_of(a[i], b[i], w[i])}) "
+                                    f"пропущено: образует цикл")
+                    continue
+                if size[x] < size[y]:
+                    x, y = y, x
+                parent[y] = x
+                size[x] += size[y]
+
+                self.edges.append((a[i], b[i], w[i]))
+                self.total_weight += w[i]
+                for v in (a[i], b[i]):
+                    if v not in self.order:
+                        self.order[v] = len(self.order) + 1
+                if trace:
+                    self._trace(f"  Ребро {labels[a[i]]} — {labels[b[i]]} "
+                                f"(вес = {self.weight_of(a[i], b[i], w[i])}) добавлено")
+                if len(self.edges) == needed:
+                    break
+            if len(self.edges) == needed:
+                break
+
+        self.metrics.count("edges_scanned", scanned)
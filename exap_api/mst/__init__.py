@@ -0,0 +1 @@
+from .MST import MSTSolver
\ No newline at end of file
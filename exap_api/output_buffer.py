@@ -0,0 +1,49 @@
+from collections import deque
+import tkinter as tk
+
+
+class BufferedOutput:
+    """
+    Буферизованный вывод в текстовый виджет.
+
+    Строки накапливаются в памяти и вставляются в Text одной операцией,
+    когда Tk простаивает (after_idle). Алгоритмы, печатающие трассировку
+    во внутренних циклах, больше не платят за insert/see на каждую строку.
+    В буфере и в виджете хранится не больше max_lines последних строк.
+    """
+
+    def __init__(self, root, text_widget, max_lines: int = 5000):
+        self.root = root
+        self.text = text_widget
+        self.max_lines = max_lines
+        self._pending = deque(maxlen=max_lines)
+        self._flush_id = None
+
+    def write(self, text: str):
+        self._pending.extend(text.split("\n"))
+        if self._flush_id is None:
+            self._flush_id = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """Переносит накопленные строки в виджет"""
+        self._flush_id = None
+        if not self._pending:
+            return
+
+        self.text.insert(tk.END, "\n".join(self._pending) + "\n")
+        self._pending.clear()
+
+        # Удаляем самые старые строки сверх лимита
+        line_count = int(self.text.index('end-1c').split('.')[0]) - 1
+        excess = line_count - self.max_lines
+        if excess > 0:
+            self.text.delete(1.0, f"{excess + 1}.0")
+
+        self.text.see(tk.END)
+
+    def clear(self):
+        if self._flush_id is not None:
+            self.root.after_cancel(self._flush_id)
+            self._flush_id = None
+        self._pending.clear()
+        self.text.delete(1.0, tk.END)
@@ -0,0 +1,334 @@
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+
+# С этого числа рёбер редактор рисует их коллекцией вместо annotate на ребро
+EDGE_COLLECTION_THRESHOLD = 300
+
+LABEL_BBOX = dict(boxstyle="round,pad=0.3", facecolor="white", edgecolor="gray", alpha=0.7)
+
+
+def edge_geometry(starts: np.ndarray, ends: np.ndarray, shrink: float = 1.1,
+                  offset: float = 0.0, label_offset: float = 0.4):
+    """
+    Векторизованная геометрия рёбер.
+
+    Args:
+        starts, ends: массивы (m, 2) центров начальных и конечных вершин
+        shrink: на сколько укоротить ребро у конечной вершины (радиус вершины)
+        offset: боковой сдвиг отрезка влево по направлению ребра, чтобы
+            встречные рёбра u→v и v→u не сливались
+        label_offset: боковой сдвиг подписи веса от середины ребра
+
+    Returns:
+        Кортеж (p0, p1, label_pos, unit): начала и укороченные концы отрезков,
+        позиции подписей и единичные направления, все формы (m, 2)
+    """
+    delta = ends - starts
+    length = np.hypot(delta[:, 0], delta[:, 1])
+    safe = np.where(length > 0, length, 1.0)
+    unit = delta / safe[:, None]
+    normal = np.column_stack((-unit[:, 1], unit[:, 0]))
+
+    p0 = starts + normal * offset
+    cut = np.where(length > shrink, shrink, 0.0)
+    p1 = ends - unit * cut[:, None] + normal * offset
+
+    mid = (starts + ends) / 2
+    label_pos = mid + normal * label_offset
+    return p0, p1, label_pos, unit
+
+
+def arrowhead_polygons(tips: np.ndarray, unit: np.ndarray, length: float, width: float) -> np.ndarray:
+    """Треугольники наконечников (m, 3, 2) с вершиной в tips"""
+    normal = np.column_stack((-unit[:, 1], unit[:, 0]))
+    base = tips - unit * length
+    return np.stack((tips, base + normal * (width / 2), base - normal * (width / 2)), axis=1)
+
+
+class EdgeLayer:
+    """
+    Все рёбра графа двумя артистами: LineCollection для отрезков и
+    PolyCollection для наконечников. Геометрия пересчитывается NumPy сразу
+    для всех рёбер, поэтому стоимость отрисовки почти не зависит от того,
+    сколько рёбер в графе.
+    """
+
+    def __init__(self, ax, directed: bool = True, color='gray', linewidth: float = 1.5,
+                 shrink: float = 1.1, head_length: float = 0.6, head_width: float = 0.45,
+                 offset: float = 0.0, label_offset: float = 0.4, zorder: float = 1.5):
+        self.ax = ax
+        self.directed = directed
+        self.color = color
+        self.linewidth = linewidth
+        self.shrink = shrink if directed else 0.0
+        self.head_length = head_length
+        self.head_width = head_width
+        self.offset = offset
+        self.label_offset = label_offset
+        self.show_heads = directed
+
+        self.edges = []
+        self.index = {}
+        self.weights = []
+        self.colors = None
+        self.linewidths = None
+        self.labels = {}
+        self.label_bbox = None
+        self._show_labels = False
+        self._label_fmt = "{:.1f}"
+        self._fontsize = 10
+        self._starts = np.empty((0, 2))
+        self._ends = np.empty((0, 2))
+
+        self.lines = LineCollection([], colors=color, linewidths=linewidth, zorder=zorder)
+        self.heads = PolyCollection([], facecolors=color, edgecolors=color, zorder=zorder)
+        ax.add_collection(self.lines, autolim=False)
+        if directed:
+            ax.add_collection(self.heads, autolim=False)
+
+    @property
+    def artists(self):
+        collections = [self.lines, self.heads] if self.directed else [self.lines]
+        return collections + list(self.labels.values())
+
+    def set_edges(self, edges, pos, weights=None, colors=None, linewidths=None,
+                  show_labels: bool = True, label_bbox=LABEL_BBOX, label_fmt="{:.1f}", fontsize=10,
+                  show_heads: bool = True):
+        """Задаёт набор рёбер целиком; colors/linewidths — по значению на ребро"""
+        self.show_heads = self.directed and show_heads
+        self.heads.set_visible(self.show_heads)
+        self.edges = list(edges)
+        self.index = {edge: i for i, edge in enumerate(self.edges)}
+        self.weights = list(weights) if weights is not None else [None] * len(self.edges)
+        self.colors = list(colors) if colors is not None else None
+        self.linewidths = list(linewidths) if linewidths is not None else None
+        self.label_bbox = label_bbox
+        self._label_fmt = label_fmt
+        self._fontsize = fontsize
+        self._show_labels = show_labels
+
+        self._starts = np.array([pos[u] for u, _ in self.edges], dtype=float).reshape(-1, 2)
+        self._ends = np.array([pos[v] for _, v in self.edges], dtype=float).reshape(-1, 2)
+
+        for label in self.labels.values():
+            label.remove()
+        self.labels = {}
+        self._refresh(create_labels=True)
+
+    def add_edge(self, u, v, weight, pos):
+        if (u, v) in self.index:
+            self.remove_edge(u, v)
+        self.index[(u, v)] = len(self.edges)
+        self.edges.append((u, v))
+        self.weights.append(weight)
+        if self.colors is not None:
+            self.colors.append(self.color)
+        if self.linewidths is not None:
+            self.linewidths.append(self.linewidth)
+        self._starts = np.vstack((self._starts, [pos[u]]))
+        self._ends = np.vstack((self._ends, [pos[v]]))
+        self._refresh(rows=[len(self.edges) - 1], create_labels=True)
+
+    def remove_edge(self, u, v):
+        i = self.index.pop((u, v), None)
+        if i is None:
+            return
+        del self.edges[i]
+        del self.weights[i]
+        if self.colors is not None:
+            del self.colors[i]
+        if self.linewidths is not None:
+            del self.linewidths[i]
+        self._starts = np.delete(self._starts, i, axis=0)
+        self._ends = np.delete(self._ends, i, axis=0)
+        self.index = {edge: j for j, edge in enumerate(self.edges)}
+        label = self.labels.pop((u, v), None)
+        if label is not None:
+            label.remove()
+        self._refresh(rows=[])
+
+    def add_edges(self, edges, weights, pos):
+        """Добавляет пачку рёбер одним пересчётом (рёбра, вошедшие в область видимости)"""
+        edges = [edge for edge in edges if edge not in self.index]
+        if not edges:
+            return
+        first = len(self.edges)
+        for i, edge in enumerate(edges, start=first):
+            self.index[edge] = i
+        self.edges.extend(edges)
+        self.weights.extend(weights[edge] for edge in edges)
+        if self.colors is not None:
+            self.colors.extend([self.color] * len(edges))
+        if self.linewidths is not None:
+            self.linewidths.extend([self.linewidth] * len(edges))
+        self._starts = np.vstack((self._starts, [pos[u] for u, _ in edges]))
+        self._ends = np.vstack((self._ends, [pos[v] for _, v in edges]))
+        self._refresh(rows=range(first, len(self.edges)), create_labels=True)
+
+    def remove_edges(self, edges):
+        """Удаляет пачку рёбер одной маской вместо np.delete на каждое"""
+        drop = [self.index[edge] for edge in edges if edge in self.index]
+        if not drop:
+            return
+        keep = np.ones(len(self.edges), dtype=bool)
+        keep[drop] = False
+        for i in drop:
+            label = self.labels.pop(self.edges[i], None)
+            if label is not None:
+                label.remove()
+        rows = np.flatnonzero(keep)
+        self.edges = [self.edges[i] for i in rows]
+        self.weights = [self.weights[i] for i in rows]
+        if self.colors is not None:
+            self.colors = [self.colors[i] for i in rows]
+        if self.linewidths is not None:
+            self.linewidths = [self.linewidths[i] for i in rows]
+        self._starts = self._starts[keep]
+        self._ends = self._ends[keep]
+        self.index = {edge: j for j, edge in enumerate(self.edges)}
+        self._refresh(rows=[])
+
+    def update_edges(self, edges, pos):
+        """Пересчитывает только строки указанных рёбер (после перемещения вершины)"""
+        rows = []
+        for u, v in edges:
+            i = self.index.get((u, v))
+            if i is not None:
+                self._starts[i] = pos[u]
+                self._ends[i] = pos[v]
+                rows.append(i)
+        self._refresh(rows=rows)
+
+    def remove(self):
+        for artist in self.artists:
+            artist.remove()
+        self.labels = {}
+
+    def _refresh(self, rows=None, create_labels=False):
+        """Пересчитывает геометрию; подписи трогает только в строках rows (None — все)"""
+        p0, p1, label_pos, unit = edge_geometry(self._starts, self._ends, self.shrink,
+                                                self.offset, self.label_offset)
+        self.lines.set_segments(np.stack((p0, p1), axis=1))
+        if self.colors is not None:
+            self.lines.set_color(self.colors)
+        if self.linewidths is not None:
+            self.lines.set_linewidths(self.linewidths)
+
+        if self.show_heads:
+            self.heads.set_verts(arrowhead_polygons(p1, unit, self.head_length, self.head_width))
+            if self.colors is not None:
+                self.heads.set_facecolor(self.colors)
+                self.heads.set_edgecolor(self.colors)
+
+        if not self._show_labels:
+            return
+        for i in (range(len(self.edges)) if rows is None else rows):
+            edge = self.edges[i]
+            weight = self.weights[i]
+            if weight is None:
+                continue
+            label = self.labels.get(edge)
+            if label is None:
+                if not create_labels:
+                    continue
+                self.labels[edge] = self.ax.text(label_pos[i, 0], label_pos[i, 1], self._label_fmt.format(weight),
+                                                 fontsize=self._fontsize, ha='center', va='center', clip_on=True,
+                                                 bbox=self.label_bbox)
+            else:
+                label.set_position(label_pos[i])
+
+
+class LevelOfDetail:
+    """
+    Правила уровня детализации.
+
+    Чем больше элементов и чем мельче масштаб (пикселей на единицу
+    координат), тем меньше рисуется: сначала пропадают рамки подписей,
+    затем подписи весов, имена вершин и наконечники. При очень большом
+    числе вершин граф рисуется агрегированно — кластерами по ячейкам сетки.
+    """
+
+    def __init__(self, label_bbox_max_edges: int = EDGE_COLLECTION_THRESHOLD,
+                 edge_label_max_edges: int = 1000, arrow_max_edges: int = 5000,
+                 node_label_max_nodes: int = 500, cluster_min_nodes: int = 1500,
+                 min_label_px_per_unit: float = 12.0, min_arrow_px_per_unit: float = 4.0,
+                 cluster_cells: int = 40, max_cluster_edges: int = 3000):
+        self.label_bbox_max_edges = label_bbox_max_edges
+        self.edge_label_max_edges = edge_label_max_edges
+        self.arrow_max_edges = arrow_max_edges
+        self.node_label_max_nodes = node_label_max_nodes
+        self.cluster_min_nodes = cluster_min_nodes
+        self.min_label_px_per_unit = min_label_px_per_unit
+        self.min_arrow_px_per_unit = min_arrow_px_per_unit
+        self.cluster_cells = cluster_cells
+        self.max_cluster_edges = max_cluster_edges
+
+    def decide(self, n_nodes: int, n_edges: int, px_per_unit: float = None) -> dict:
+        """Что рисовать для графа (или видимой его части) такого размера"""
+        readable = px_per_unit is None or px_per_unit >= self.min_label_px_per_unit
+        arrows_visible = px_per_unit is None or px_per_unit >= self.min_arrow_px_per_unit
+        return {
+            "cluster": n_nodes >= self.cluster_min_nodes,
+            "node_labels": readable and n_nodes <= self.node_label_max_nodes,
+            "edge_labels": readable and n_edges <= self.edge_label_max_edges,
+            "label_bbox": readable and n_edges <= self.label_bbox_max_edges,
+            "arrows": arrows_visible and n_edges <= self.arrow_max_edges,
+        }
+
+
+def px_per_unit(ax) -> float:
+    """Текущий масштаб оси: сколько пикселей занимает единица координат по x"""
+    x_min, x_max = ax.get_xlim()
+    return float(ax.bbox.width / max(x_max - x_min, 1e-9))
+
+
+def cluster_graph(xy: np.ndarray, src: np.ndarray, dst: np.ndarray, cells: int = 40,
+                  max_edges: int = 3000):
+    """
+    Агрегирует вершины по ячейкам сетки cells x cells над их bounding box.
+
+    Args:
+        xy: координаты вершин (n, 2)
+        src, dst: индексы концов рёбер (m,)
+
+    Returns:
+        Кортеж (centers, counts, segments, edge_counts): центры масс непустых
+        ячеек, число вершин в них, отрезки между ячейками (p, 2, 2) и число
+        рёбер в каждом агрегированном ребре. Оставляются max_edges самых
+        тяжёлых агрегированных рёбер.
+    """
+    low = xy.min(axis=0)
+    span = np.maximum(xy.max(axis=0) - low, 1e-9)
+    cell_xy = np.minimum((xy - low) / span * cells, cells - 1).astype(np.int64)
+    codes = cell_xy[:, 0] * cells + cell_xy[:, 1]
+
+    uniq, cluster_of, counts = np.unique(codes, return_inverse=True, return_counts=True)
+    centers = np.zeros((len(uniq), 2))
+    np.add.at(centers, cluster_of, xy)
+    centers /= counts[:, None]
+
+    if len(src) == 0:
+        return centers, counts, np.empty((0, 2, 2)), np.empty(0, dtype=np.int64)
+
+    a = cluster_of[src]
+    b = cluster_of[dst]
+    keep = a != b
+    pair = np.minimum(a[keep], b[keep]) * len(uniq) + np.maximum(a[keep], b[keep])
+    pairs, edge_counts = np.unique(pair, return_counts=True)
+    if len(pairs) > max_edges:
+        top = np.argpartition(edge_counts, -max_edges)[-max_edges:]
+        pairs, edge_counts = pairs[top], edge_counts[top]
+    segments = np.stack((centers[pairs // len(uniq)], centers[pairs % len(uniq)]), axis=1)
+    return centers, counts, segments, edge_counts
+
+
+def draw_clusters(ax, xy: np.ndarray, src: np.ndarray, dst: np.ndarray, lod: LevelOfDetail):
+    """Рисует агрегированный граф: кластеры — кружки, связи между ними — линии"""
+    centers, counts, segments, edge_counts = cluster_graph(xy, src, dst, lod.cluster_cells,
+                                                           lod.max_cluster_edges)
+    widths = 0.5 + np.log1p(edge_counts)
+    lines = LineCollection(segments, colors='gray', linewidths=widths, alpha=0.5, zorder=1)
+    ax.add_collection(lines, autolim=False)
+    points = ax.scatter(centers[:, 0], centers[:, 1], s=20 + 30 * np.log1p(counts),
+                        c='lightblue', edgecolors='black', linewidths=1, zorder=2)
+    return [lines, points]
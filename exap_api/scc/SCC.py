@@ -0,0 +1,172 @@
+from exap_api.compact import CompactGraph
+from exap_api.dataclass import Result
+
+
+class SCCSolver:
+    """
+    Компоненты сильной связности алгоритмом Тарьяна за один проход.
+
+    DFS итеративный (явный стек вызовов и указатель на следующее ребро
+    каждой вершины), поэтому длинные цепочки не упираются в лимит рекурсии.
+    Транспонированный граф не строится. Вершина, уже посещённая, но ещё
+    не отнесённая к компоненте, лежит на стеке Тарьяна — отдельный флаг
+    on_stack не нужен.
+
+    Результат:
+        component[v] — номер компоненты вершины v; компоненты нумеруются в
+        топологическом порядке конденсации (из компоненты i рёбра ведут
+        только в компоненты j >= i), как у второго прохода Косарайю;
+        finish_order — вершины в порядке завершения DFS.
+    При trace=True в self.trace пишется протокол обхода, а в self.result —
+    шаг на каждую найденную компоненту.
+    """
+
+    def __init__(self, graph: CompactGraph, trace: bool = False):
+        self.graph = graph
+        self.n = graph.n
+        self.trace_enabled = trace
+        self.trace: list[str] = []
+        self.result = Result()
+        self.metrics = self.result.metrics
+        self.step_count = 0
+        self._snapshot = None
+        # Задача exap_api.executor.Job при фоновом запуске: точки отмены и прогресс
+        self.job = None
+        self.component: list[int] = []
+        self.finish_order: list[int] = []
+        self.count = 0
+
+    @classmethod
+    def from_networkx(cls, graph, trace: bool = False) -> "SCCSolver":
+        return cls(CompactGraph.from_networkx(graph), trace)
+
+    def _log(self, title: str, data: str = ""):
+        # Граф при поиске не меняется: все шаги делят один снимок
+        self.step_count += 1
+        self.metrics.count("snapshots")
+        with self.metrics.phase("snapshot"):
+            if self._snapshot is None:
+                self._snapshot = self.graph.to_networkx()
+        self.result.add_step(f"{self.step_count}. {title}", self._snapshot, data)
+
+    def _trace(self, depth: int, text: str):
+        self.trace.append(f"  {'  ' * depth}{text}")
+
+    def find_components(self) -> list:
+        """Возвращает компоненты (списки номеров вершин) в топологическом порядке"""
+        with self.metrics.phase("tarjan"):
+            self._tarjan()
+        self.metrics.count("components", self.count)
+        self.metrics.count("edges_scanned", self.graph.m)
+        if self.trace_enabled:
+            self._log("Конец алгоритма", f"Найдено компонент: {self.count}")
+        return self.components()
+
+    def _tarjan(self):
+        indptr, indices, _ = self.graph.adjacency_lists()
+        labels = self.graph.labels
+        n = self.n
+        trace = self.trace_enabled
+        job = self.job
+        index = [-1] * n
+        low = [0] * n
+        component = [-1] * n
+        ptr = indptr[:-1]
+        stack = []
+        finish = []
+        counter = 0
+        found = 0
+        logged = 0  # строк протокола, уже попавших в шаги Result
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            call = [root]
+            if trace:
+                self._trace(0, f"Вход в {labels[root]}")
+
+            while call:
+                v = call[-1]
+                p, end = ptr[v], indptr[v + 1]
+                while p < end:
+                    w = indices[p]
+                    p += 1
+                    if index[w] == -1:
+                        ptr[v] = p
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        call.append(w)
+                        if trace:
+                            self._trace(len(call) - 1, f"Вход в {labels[w]}")
+                        break
+                    if component[w] == -1 and index[w] < low[v]:
+                        low[v] = index[w]
+                else:
+                    ptr[v] = p
+                    call.pop()
+                    finish.append(v)
+                    if job is not None and not len(finish) & 4095:
+                        job.tick(len(finish), n, "вершин обработано")
+                    if call and low[v] < low[call[-1]]:
+                        low[call[-1]] = low[v]
+                    if trace:
+                        self._trace(len(call), f"Выход из {labels[v]} → порядок {len(finish)}")
+                    if low[v] == index[v]:
+                        members = []
+                        while True:
+                            w = stack.pop()
+                            component[w] = found
+                            members.append(w)
+                            if w == v:
+                                break
+                        if trace:
+                            self._trace(len(call), f"Компонента с корнем {labels[v]}: "
+                                                   f"{sorted(labels[u] for u in members)}")
+                            self._log(f"Компонента с корнем {labels[v]}", "\n".join(self.trace[logged:]))
+                            logged = len(self.trace)
+                        found += 1
+
+        # Тарьян находит компоненты в обратном топологическом порядке
+        self.component = [found - 1 - c for c in component]
+        self.finish_order = finish
+        self.count = found
+
+    def components(self) -> list:
+        groups = [[] for _ in range(self.count)]
+        for v, c in enumerate(self.component):
+            groups[c].append(v)
+        return groups
+
+    def labelled_components(self) -> list:
+        labels = self.graph.labels
+        return [[labels[v] for v in group] for group in self.components()]
+
+    def same_component(self, u: int, v: int) -> bool:
+        return self.component[u] == self.component[v]
+
+    def order_map(self) -> dict:
+        """Метка -> номер в обратном порядке завершения DFS (1, 2, 3...)"""
+        labels = self.graph.labels
+        return {labels[v]: i + 1 for i, v in enumerate(reversed(self.finish_order))}
+
+    def protocol(self) -> list:
+        """Протокол обхода и порядок завершения (только при trace=True)"""
+        labels = self.graph.labels
+        return self.trace + [f"\nПорядок завершения: {[labels[v] for v in self.finish_order]}"]
+
+    def report(self, limit: int = None) -> list:
+        return component_report(self.labelled_components(), limit)
+
+
+def component_report(components: list, limit: int = None) -> list:
+    """Строки итога: число компонент и их состав (первые limit компонент)"""
+    lines = [f"\nНайдено компонент: {len(components)}"]
+    for i, comp in enumerate(components[:limit], 1):
+        lines.append(f"  Компонента {i}: {sorted(comp)}")
+    if limit is not None and len(components) > limit:
+        lines.append(f"  … ещё {len(components) - limit} компонент")
+    return lines
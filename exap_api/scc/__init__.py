@@ -0,0 +1,2 @@
+from .SCC import SCCSolver
+from .incremental import IncrementalSCC
\ No newline at end of file
@@ -0,0 +1,376 @@
+import networkx as nx
+import numpy as np
+
+from exap_api.compact import CompactGraph
+from .SCC import SCCSolver, component_report
+
+
+class IncrementalSCC:
+    """
+    Компоненты сильной связности и граф конденсации, поддерживаемые при
+    правках графа редактора (добавление вершин, добавление и удаление рёбер).
+
+    Хранение:
+        comp[v]      — номер компоненты вершины (same_component за O(1));
+        members[c]   — вершины компоненты c;
+        out[c], inc[c] — рёбра конденсации c -> d и d -> c с кратностью
+                       (числом рёбер графа между компонентами);
+        pos[c]       — место компоненты в топологическом порядке конденсации
+                       (целые числа, не обязательно подряд).
+
+    Добавление ребра u -> v между разными компонентами, нарушающего
+    порядок pos, обрабатывается как в алгоритме Пирса — Келли: поиск
+    вперёд от comp[v] и назад от comp[u] ограничен компонентами между ними
+    в порядке pos. Если comp[u] достижима из comp[v], компоненты на путях
+    сливаются в одну (в самую большую из них переносятся вершины
+    остальных); иначе затронутые компоненты только переставляются.
+    Удаление ребра u -> v внутри компоненты ничего не меняет, если v
+    по-прежнему достижима из u; иначе распадается только эта компонента
+    (см. _remove_inner), а порядок pos строится заново лениво, при
+    следующем запросе компонент.
+    """
+
+    # Сколько вершин границы проверять встречными поисками перед полным обходом компоненты
+    BOUNDARY_PROBES = 16
+
+    def __init__(self):
+        self.succ: dict = {}
+        self.pred: dict = {}
+        self.comp: dict = {}
+        self.members: dict[int, set] = {}
+        self.out: dict[int, dict[int, int]] = {}
+        self.inc: dict[int, dict[int, int]] = {}
+        self.pos: dict[int, int] = None
+        self._next_id = 0
+        self._next_pos = 0
+        self._order = None
+        self.merges = 0
+        self.splits = 0
+
+    @classmethod
+    def from_networkx(cls, graph) -> "IncrementalSCC":
+        return cls.from_compact(CompactGraph.from_networkx(graph))
+
+    @classmethod
+    def from_compact(cls, graph: CompactGraph, job=None) -> "IncrementalSCC":
+        """Начальное разбиение — один проход Тарьяна по всему графу; job — см. exap_api.executor"""
+        index = cls()
+        labels = graph.labels
+        indptr, indices, _ = graph.adjacency_lists()
+        index.succ = {labels[i]: {labels[j] for j in indices[indptr[i]:indptr[i + 1]]} for i in range(graph.n)}
+        index.pred = {v: set() for v in labels}
+        for u, nbrs in index.succ.items():
+            for v in nbrs:
+                index.pred[v].add(u)
+        solver = SCCSolver(graph)
+        solver.job = job
+        solver.find_components()
+        for group in solver.labelled_components():
+            index._new_component(group)
+        # Компоненты Тарьяна уже пронумерованы в топологическом порядке
+        index.pos = {c: c for c in index.members}
+        index._next_pos = len(index.members)
+        comp = index.comp
+        for u, nbrs in index.succ.items():
+            for v in nbrs:
+                if comp[u] != comp[v]:
+                    index._link(comp[u], comp[v], 1)
+        return index
+
+    @property
+    def count(self) -> int:
+        return len(self.members)
+
+    def same_component(self, u, v) -> bool:
+        return self.comp[u] == self.comp[v]
+
+    def component_of(self, v) -> int:
+        return self.comp[v]
+
+    # === Правки ===
+
+    def add_node(self, v):
+        if v in self.comp:
+            return
+        self.succ[v] = set()
+        self.pred[v] = set()
+        c = self._new_component([v])
+        if self.pos is not None:
+            self.pos[c] = self._next_pos
+            self._next_pos += 1
+
+    def add_edge(self, u, v):
+        """Ребро u -> v; повторное добавление (например, смена веса) ничего не меняет"""
+        self.add_node(u)
+        self.add_node(v)
+        if v in self.succ[u]:
+            return
+        self.succ[u].add(v)
+        self.pred[v].add(u)
+        cu, cv = self.comp[u], self.comp[v]
+        if cu == cv:
+            return
+        new = cv not in self.out[cu]
+        if new and self.pos is None:
+            # Порядок нужен для конденсации без нового ребра: с ним она может содержать цикл
+            self._topological_positions()
+        self._link(cu, cv, 1)
+        if new:
+            self._restore_order(cu, cv)
+
+    def remove_edge(self, u, v):
+        if u not in self.succ or v not in self.succ[u]:
+            return
+        self.succ[u].discard(v)
+        self.pred[v].discard(u)
+        cu, cv = self.comp[u], self.comp[v]
+        if cu != cv:
+            self._link(cu, cv, -1)
+        elif u != v:
+            # Петля на сильную связность не влияет
+            self._remove_inner(u, v, cu)
+
+    # === Ответы ===
+
+    def components(self) -> list:
+        """Списки вершин компонент в топологическом порядке конденсации"""
+        return [list(self.members[c]) for c in self._ordered()]
+
+    def component_index(self) -> dict:
+        """Вершина -> номер её компоненты в components()"""
+        rank = {c: i for i, c in enumerate(self._ordered())}
+        return {v: rank[c] for v, c in self.comp.items()}
+
+    def condensation(self) -> nx.DiGraph:
+        """Граф конденсации: вершины — номера компонент в components(), атрибут members"""
+        order = self._ordered()
+        rank = {c: i for i, c in enumerate(order)}
+        dag = nx.DiGraph()
+        dag.add_nodes_from((i, {"members": self.members[c]}) for i, c in enumerate(order))
+        dag.add_edges_from((rank[c], rank[d]) for c in order for d in self.out[c])
+        return dag
+
+    def report(self, limit: int = None) -> list:
+        return component_report(self.components(), limit)
+
+    # === Внутреннее ===
+
+    def _new_component(self, nodes) -> int:
+        c = self._next_id
+        self._next_id += 1
+        self.members[c] = set(nodes)
+        for v in nodes:
+            self.comp[v] = c
+        self.out[c] = {}
+        self.inc[c] = {}
+        self._order = None
+        return c
+
+    def _drop_component(self, c):
+        del self.members[c], self.out[c], self.inc[c]
+        if self.pos is not None:
+            self.pos.pop(c, None)
+        self._order = None
+
+    def _link(self, c, d, k):
+        """Изменяет кратность ребра конденсации c -> d на k"""
+        count = self.out[c].get(d, 0) + k
+        if count:
+            self.out[c][d] = count
+            self.inc[d][c] = count
+        else:
+            self.out[c].pop(d, None)
+            self.inc[d].pop(c, None)
+
+    def _ordered(self) -> list:
+        if self._order is None:
+            if self.pos is None:
+                self._topological_positions()
+            self._order = sorted(self.members, key=self.pos.__getitem__)
+        return self._order
+
+    def _topological_positions(self):
+        """Алгоритм Кана по конденсации"""
+        indegree = {c: len(self.inc[c]) for c in self.members}
+        queue = [c for c, k in indegree.items() if k == 0]
+        self.pos = {}
+        for c in queue:
+            self.pos[c] = len(self.pos)
+            for d in self.out[c]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    queue.append(d)
+        self._next_pos = len(self.pos)
+
+    def _restore_order(self, cu, cv):
+        """Новое ребро конденсации cu -> cv: перестановка по Пирсу — Келли или слияние цикла"""
+        pos = self.pos
+        lower, upper = pos[cv], pos[cu]
+        if upper < lower:
+            return
+
+        forward = self._reach(cv, self.out, lambda c: pos[c] <= upper)
+        backward = self._reach(cu, self.inc, lambda c: pos[c] >= lower)
+        # Задние компоненты занимают младшие из освободившихся мест, передние — старшие
+        slots = sorted(pos[c] for c in forward | backward)
+        if cu in forward:
+            cycle = forward & backward
+            middle = [self._merge(cycle)]
+            forward, backward = forward - cycle, backward - cycle
+        else:
+            middle = []
+        order = sorted(backward, key=pos.__getitem__) + middle
+        for c, slot in zip(order, slots):
+            pos[c] = slot
+        for c, slot in zip(sorted(forward, key=pos.__getitem__), slots[len(slots) - len(forward):]):
+            pos[c] = slot
+        self._order = None
+
+    @staticmethod
+    def _reach(root, edges, allowed) -> set:
+        seen = {root}
+        stack = [root]
+        while stack:
+            c = stack.pop()
+            for d in edges[c]:
+                if d not in seen and allowed(d):
+                    seen.add(d)
+                    stack.append(d)
+        return seen
+
+    def _merge(self, cycle: set) -> int:
+        """Сливает компоненты cycle в самую большую из них; возвращает её номер"""
+        target = max(cycle, key=lambda c: len(self.members[c]))
+        for c in cycle - {target}:
+            for v in self.members[c]:
+                self.comp[v] = target
+            self.members[target] |= self.members[c]
+            for d, k in list(self.out[c].items()):
+                self._link(c, d, -k)
+                if d not in cycle:
+                    self._link(target, d, k)
+            for d, k in list(self.inc[c].items()):
+                self._link(d, c, -k)
+                if d not in cycle:
+                    self._link(d, target, k)
+            self._drop_component(c)
+        self.merges += 1
+        return target
+
+    def _closure(self, edges, c, seen: set) -> set:
+        """Дополняет seen до множества вершин компоненты c, достижимых из seen по edges (BFS)"""
+        comp = self.comp
+        frontier = list(seen)
+        while frontier:
+            layer = []
+            for x in frontier:
+                for y in edges[x]:
+                    if y not in seen and comp[y] == c:
+                        seen.add(y)
+                        layer.append(y)
+            frontier = layer
+        return seen
+
+    def _meet(self, u, v, c):
+        """
+        Двунаправленный BFS внутри c: вперёд от u и назад от v, каждый раз
+        расширяется меньший фронт. Возвращает None, если поиски встретились
+        (путь u -> v есть), иначе (вперёд, назад, номер исчерпанной стороны).
+        """
+        comp = self.comp
+        sides = [({u}, [u], self.succ), ({v}, [v], self.pred)]
+        while sides[0][1] and sides[1][1]:
+            k = 0 if len(sides[0][1]) <= len(sides[1][1]) else 1
+            seen, frontier, edges = sides[k]
+            other = sides[1 - k][0]
+            layer = []
+            for x in frontier:
+                for y in edges[x]:
+                    if y in other:
+                        return None
+                    if y not in seen and comp[y] == c:
+                        seen.add(y)
+                        layer.append(y)
+            sides[k] = (seen, layer, edges)
+        return sides[0][0], sides[1][0], 0 if not sides[0][1] else 1
+
+    def _tarjan(self, nodes) -> list:
+        """Компоненты подграфа, порождённого вершинами nodes"""
+        nodes = list(nodes)
+        local = {v: i for i, v in enumerate(nodes)}
+        src, dst = [], []
+        for v in nodes:
+            for w in self.succ[v]:
+                if w in local:
+                    src.append(local[v])
+                    dst.append(local[w])
+        solver = SCCSolver(CompactGraph.from_edges(nodes, np.array(src, dtype=np.int64),
+                                                   np.array(dst, dtype=np.int64), np.ones(len(src))))
+        solver.find_components()
+        return solver.labelled_components()
+
+    def _remove_inner(self, u, v, c):
+        """
+        Удалено ребро u -> v внутри компоненты c. Все вершины c по-прежнему
+        достигают u, а v достигает всех, поэтому достижимые из u вершины
+        образуют компоненту u, а достигающие v — компоненту v.
+
+        Двунаправленный поиск исчерпывает меньшую из них (S). Любая вершина
+        вне S достижима из v (достигает u) через границу S — концы рёбер,
+        выходящих из S (начала рёбер, входящих в S). Если вся граница
+        достижима из u (достигает v), остаток c без S — одна компонента;
+        иначе вторая сторона доводится до конца, и Тарьян нужен только для
+        вершин вне обеих компонент.
+        """
+        found = self._meet(u, v, c)
+        if found is None:
+            return  # u достигает v в обход удалённого ребра: компонента цела
+        forward, backward, done = found
+        comp = self.comp
+        members = self.members[c]
+        if done == 1:
+            small, other, edges = backward, forward, self.succ
+            probes = [(u, y) for x in small for y in self.succ[x] if comp[y] == c and y not in small]
+        else:
+            small, other, edges = forward, backward, self.pred
+            probes = [(y, v) for x in small for y in self.pred[x] if comp[y] == c and y not in small]
+        # Граница обычно мала: несколько встречных поисков дешевле обхода всей компоненты
+        if len(probes) <= self.BOUNDARY_PROBES and all(self._meet(a, b, c) is None for a, b in probes):
+            self._split(c, [small, members - small])
+            return
+        self._closure(edges, c, other)
+        rest = members - forward - backward
+        self._split(c, [forward, backward] + (self._tarjan(rest) if rest else []))
+
+    def _split(self, c, groups: list):
+        """
+        Распад компоненты c на groups. Самая большая часть сохраняет номер c,
+        поэтому рёбра конденсации пересчитываются только для вершин остальных.
+        """
+        groups = sorted((group for group in groups if group), key=len, reverse=True)
+        self.members[c] = set(groups[0])
+        pieces = {c}
+        moved = []
+        for group in groups[1:]:
+            pieces.add(self._new_component(group))
+            moved.extend(group)
+        comp = self.comp
+        for x in moved:
+            cx = comp[x]
+            for w in self.succ[x]:
+                cw = comp[w]
+                if cw not in pieces:
+                    self._link(c, cw, -1)
+                    self._link(cx, cw, 1)
+                elif cw != cx:
+                    self._link(cx, cw, 1)
+            for w in self.pred[x]:
+                cw = comp[w]
+                if cw not in pieces:
+                    self._link(cw, c, -1)
+                    self._link(cw, cx, 1)
+                elif cw == c:
+                    # Рёбра между двумя отделившимися частями уже учтены со стороны succ
+                    self._link(c, cx, 1)
+        self.pos = None
+        self.splits += 1
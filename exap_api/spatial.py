@@ -0,0 +1,171 @@
+import math
+
+
+def point_to_segment_distance(px, py, x1, y1, x2, y2):
+    """Расстояние от точки до отрезка (скалярная арифметика, без NumPy-массивов)"""
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - x1, py - y1)
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+class SpatialIndex:
+    """
+    Равномерная сетка над вершинами и рёбрами редактора.
+
+    Вершина хранится в ячейке своего центра, ребро — во всех ячейках, через
+    которые проходит отрезок. Поиск вершины под курсором и ближайшего ребра
+    просматривает только ячейки вокруг точки клика, а перетаскивание вершины
+    переиндексирует лишь инцидентные ей рёбра.
+    """
+
+    def __init__(self, cell_size: float = 2.0):
+        self.cell_size = cell_size
+        self.pos = {}
+        self._node_cells = {}      # ячейка -> множество вершин
+        self._edge_cells = {}      # ячейка -> множество рёбер
+        self._cells_of_edge = {}   # ребро -> список ячеек
+        self._incident = {}        # вершина -> множество инцидентных рёбер
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def _cells_around(self, x, y, radius):
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield cx, cy
+
+    def _segment_cells(self, x1, y1, x2, y2):
+        """Ячейки вдоль отрезка: шаг выборки — половина ячейки"""
+        steps = int(math.hypot(x2 - x1, y2 - y1) / (self.cell_size * 0.5)) + 1
+        cells = {self._cell(x1 + (x2 - x1) * i / steps, y1 + (y2 - y1) * i / steps)
+                 for i in range(steps + 1)}
+        return list(cells)
+
+    # === построение ===
+
+    def rebuild(self, pos, edges=()):
+        self.pos = {}
+        self._node_cells = {}
+        self._edge_cells = {}
+        self._cells_of_edge = {}
+        self._incident = {}
+        for node, (x, y) in pos.items():
+            self.add_node(node, x, y)
+        for u, v in edges:
+            self.add_edge(u, v)
+
+    def add_node(self, node, x, y):
+        if node in self.pos:
+            self.move_node(node, x, y)
+            return
+        self.pos[node] = (x, y)
+        self._node_cells.setdefault(self._cell(x, y), set()).add(node)
+        self._incident.setdefault(node, set())
+
+    def remove_node(self, node):
+        if node not in self.pos:
+            return
+        for edge in list(self._incident.get(node, ())):
+            self.remove_edge(*edge)
+        cell = self._cell(*self.pos.pop(node))
+        self._node_cells[cell].discard(node)
+        if not self._node_cells[cell]:
+            del self._node_cells[cell]
+        self._incident.pop(node, None)
+
+    def add_edge(self, u, v):
+        edge = (u, v)
+        if edge in self._cells_of_edge or u not in self.pos or v not in self.pos:
+            return
+        cells = self._segment_cells(*self.pos[u], *self.pos[v])
+        self._cells_of_edge[edge] = cells
+        for cell in cells:
+            self._edge_cells.setdefault(cell, set()).add(edge)
+        self._incident[u].add(edge)
+        self._incident[v].add(edge)
+
+    def remove_edge(self, u, v):
+        edge = (u, v)
+        cells = self._cells_of_edge.pop(edge, None)
+        if cells is None:
+            return
+        for cell in cells:
+            bucket = self._edge_cells[cell]
+            bucket.discard(edge)
+            if not bucket:
+                del self._edge_cells[cell]
+        self._incident[u].discard(edge)
+        self._incident[v].discard(edge)
+
+    def move_node(self, node, x, y):
+        old_cell = self._cell(*self.pos[node])
+        new_cell = self._cell(x, y)
+        self.pos[node] = (x, y)
+        if old_cell != new_cell:
+            self._node_cells[old_cell].discard(node)
+            if not self._node_cells[old_cell]:
+                del self._node_cells[old_cell]
+            self._node_cells.setdefault(new_cell, set()).add(node)
+        for edge in list(self._incident[node]):
+            self.remove_edge(*edge)
+            self.add_edge(*edge)
+
+    # === запросы ===
+
+    def nearest_node(self, x, y, radius):
+        """Ближайшая вершина не дальше radius или None"""
+        best, best_dist = None, radius
+        for cell in self._cells_around(x, y, radius):
+            for node in self._node_cells.get(cell, ()):
+                nx_, ny_ = self.pos[node]
+                dist = math.hypot(x - nx_, y - ny_)
+                if dist <= best_dist:
+                    best, best_dist = node, dist
+        return best
+
+    def nearest_edge(self, x, y, threshold):
+        """Ближайшее ребро на расстоянии меньше threshold или None"""
+        best, best_dist = None, threshold
+        seen = set()
+        # +1 ячейка: отрезок мог лишь задеть угол ячейки между выборками
+        for cell in self._cells_around(x, y, threshold + self.cell_size):
+            for edge in self._edge_cells.get(cell, ()):
+                if edge in seen:
+                    continue
+                seen.add(edge)
+                u, v = edge
+                dist = point_to_segment_distance(x, y, *self.pos[u], *self.pos[v])
+                if dist < best_dist:
+                    best, best_dist = edge, dist
+        return best
+
+    def _cells_in_rect(self, buckets, x_min, x_max, y_min, y_max, pad=0):
+        cx0, cy0 = self._cell(x_min, y_min)
+        cx1, cy1 = self._cell(x_max, y_max)
+        cx0, cy0, cx1, cy1 = cx0 - pad, cy0 - pad, cx1 + pad, cy1 + pad
+        # При сильном отдалении дешевле перебрать занятые ячейки, чем все ячейки окна
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(buckets):
+            return [bucket for (cx, cy), bucket in buckets.items()
+                    if cx0 <= cx <= cx1 and cy0 <= cy <= cy1]
+        return [buckets[(cx, cy)] for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)
+                if (cx, cy) in buckets]
+
+    def nodes_in_rect(self, x_min, x_max, y_min, y_max):
+        result = []
+        for bucket in self._cells_in_rect(self._node_cells, x_min, x_max, y_min, y_max):
+            for node in bucket:
+                x, y = self.pos[node]
+                if x_min <= x <= x_max and y_min <= y <= y_max:
+                    result.append(node)
+        return result
+
+    def edges_in_rect(self, x_min, x_max, y_min, y_max):
+        result = set()
+        for bucket in self._cells_in_rect(self._edge_cells, x_min, x_max, y_min, y_max, pad=1):
+            result.update(bucket)
+        return result
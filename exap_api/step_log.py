@@ -0,0 +1,93 @@
+from collections import OrderedDict
+import tkinter as tk
+from tkinter import ttk, font as tkfont
+
+
+class StepLogView:
+    """
+    Виртуализированный журнал шагов для окна результата.
+
+    Хранит текст только текущего шага (или ограниченного кольца последних
+    шагов, без повторов) и вставляет в Text лишь видимые строки. Прокрутка
+    управляется собственным Scrollbar, поэтому даже шаг BFS на тысячи строк
+    не замедляет виджет.
+    """
+
+    def __init__(self, parent, max_steps: int = 1, font=('Courier', 9)):
+        self.max_steps = max(1, max_steps)
+        self._steps: OrderedDict = OrderedDict()  # индекс шага -> список строк
+        self._lines: list[str] = []
+        self._offset = 0
+
+        self.frame = ttk.Frame(parent)
+        self.text = tk.Text(self.frame, font=font, wrap=tk.NONE)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._linespace = max(1, tkfont.Font(font=self.text['font']).metrics('linespace'))
+
+        self.text.bind('<Configure>', lambda e: self._render())
+        self.text.bind('<MouseWheel>', self._on_wheel)
+        self.text.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.text.bind('<Button-5>', lambda e: self._scroll_by(3))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def show_step(self, index: int, title: str, data: str):
+        """Показывает шаг; повторный показ того же шага не дублирует текст"""
+        self._steps.pop(index, None)
+        self._steps[index] = [title] + ("     " + data).split("\n")
+        while len(self._steps) > self.max_steps:
+            self._steps.popitem(last=False)
+
+        self._lines = []
+        for lines in self._steps.values():
+            if self._lines:
+                self._lines.append("")
+            self._lines.extend(lines)
+        self._offset = 0
+        self._render()
+
+    def clear(self):
+        self._steps.clear()
+        self._lines = []
+        self._offset = 0
+        self._render()
+
+    def _visible_rows(self) -> int:
+        height = self.text.winfo_height()
+        if height <= 1:
+            return 50
+        return max(1, height // self._linespace)
+
+    def _render(self):
+        rows = self._visible_rows()
+        total = len(self._lines)
+        self._offset = max(0, min(self._offset, total - rows))
+
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(self._lines[self._offset:self._offset + rows]))
+
+        if total <= rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, (self._offset + rows) / total)
+
+    def _scroll_by(self, lines: int):
+        self._offset += lines
+        self._render()
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, *args):
+        rows = self._visible_rows()
+        if action == "moveto":
+            self._offset = int(float(args[0]) * len(self._lines))
+        elif action == "scroll":
+            amount, what = int(args[0]), args[1]
+            self._offset += amount * (rows if what == "pages" else 1)
+        self._render()
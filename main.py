@@ -1,13 +1,31 @@
+import os
+import time
+import traceback
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib
+from matplotlib.colors import to_rgba
 
-matplotlib.use('TkAgg')
+matplotlib.use('TkAgg', force=False)  # без дисплея остаётся текущий backend
 import numpy as np
 from exap_api import ExapApi
+from exap_api.output_buffer import BufferedOutput
+from exap_api.info_panel import GraphInfoPanel
+from exap_api.layout import LayoutJob, force_layout, place_new_nodes, neighbourhood
+from exap_api.graph_io import read_graph, write_graph, to_networkx
+from exap_api.generators import FAMILIES, generate, to_editor_graph
+from exap_api.scc import SCCSolver, IncrementalSCC
+from exap_api.mst import MSTSolver
+from exap_api.astar import AStarSolver, LandmarkCache
+from exap_api.executor import Executor
+from exap_api.cache import ResultCache
+from exap_api.model import GraphModel
+from exap_api.spatial import SpatialIndex, point_to_segment_distance
+from exap_api.rendering import (EdgeLayer, EDGE_COLLECTION_THRESHOLD, LABEL_BBOX, LevelOfDetail,
+                                px_per_unit, draw_clusters)
 
 
 class GraphApp:
@@ -20,13 +38,57 @@ class GraphApp:
         self.pos = None
         self.node_patches = {}
         self.node_labels = {}
+        # Цвета вершин текущего вида (раскраска компонент); вершина без цвета — 'lightblue'
+        self.node_colors = {}
         self.edge_lines = {}
         self.edge_labels = {}
+        # Для больших графов рёбра рисуются одним EdgeLayer вместо edge_lines/edge_labels
+        self.edge_layer = None
+        # Сетка для попадания курсором в вершины и рёбра
+        self.spatial = SpatialIndex(cell_size=2.0)
+        # Уровень детализации: пороги в self.lod, решения для текущего кадра в self.detail
+        self.lod = LevelOfDetail()
+        self.detail = self.lod.decide(0, 0)
+        self.clustered = False
 
         self.mode = "drag"
         self.edge_start = None
         self.drag_node = None
         self.drag_offset = (0, 0)
+        # Состояние blit-перетаскивания: сохранённый фон и подвижные артисты
+        self._drag_background = None
+        self._drag_artists = []
+        self._last_drag_frame = 0.0
+        # Видимая область редактора (x_min, x_max, y_min, y_max) и состояние панорамирования
+        self.view = [-12.0, 12.0, -12.0, 12.0]
+        self._pan_start = None
+        self._last_pan_frame = 0.0
+        # Графы больше sync_layout_limit вершин укладываются в фоновом потоке
+        self.sync_layout_limit = 300
+        # Пошаговый протокол алгоритмов выводится только для графов до trace_limit вершин
+        self.trace_limit = 200
+        # Счётчик правок графа: по нему кэши понимают, что граф изменился
+        self.graph_version = 0
+        # Ориентиры ALT для A* на графах от landmark_min_nodes вершин; живут до правки графа
+        self.landmark_cache = LandmarkCache(k=8)
+        self.landmark_min_nodes = 500
+        # После A* дополнительно запускать двунаправленные Дейкстру и A* и сравнивать число раскрытых вершин
+        self.compare_bidirectional = False
+        # Компоненты сильной связности больших графов: строятся при первом запросе,
+        # дальше обновляются одиночными правками; полная замена графа их сбрасывает
+        self.scc_index = None
+        # Алгоритмы на графах больше sync_run_limit вершин считаются в фоновом потоке
+        self.executor = Executor(root, watch=self._watch_jobs)
+        self.sync_run_limit = 2000
+        # Правки графа идут через модель: она ведёт отпечаток графа и готовые входы решателей
+        self.model = GraphModel(self.graph)
+        # Готовые результаты Джонсона и Диница по отпечатку графа (вершины, рёбра, веса).
+        # Переменная окружения EXAP_RESULT_CACHE — файл, в котором кэш хранится между запусками
+        self.result_cache = ResultCache(max_bytes=256 * 2 ** 20, path=os.environ.get("EXAP_RESULT_CACHE"))
+        self._layout_job = None
+        self._layout_nodes = []
+        self._layout_fit = False
+        self._layout_whole = False
 
         self.create_widgets()
         self.bind_mouse_events()
@@ -91,11 +153,26 @@ class GraphApp:
         ttk.Button(parent, text="Загрузить граф 5 пример",
                    command=self.load_sample_graph_negative_weights).grid(
             row=24, column=0, sticky="ew", pady=5)
+        ttk.Button(parent, text="Открыть файл графа...",
+                   command=self.open_graph_file).grid(
+            row=25, column=0, sticky="ew", pady=5)
+        ttk.Button(parent, text="Сохранить граф в файл...",
+                   command=self.save_graph_file).grid(
+            row=26, column=0, sticky="ew", pady=5)
+        ttk.Button(parent, text="Сгенерировать граф...",
+                   command=self.generate_graph).grid(
+            row=27, column=0, sticky="ew", pady=5)
 
         info_frame = ttk.LabelFrame(parent, text="Информация о графе", padding="10")
         info_frame.grid(row=4, column=0, sticky="nsew", pady=(20, 0))
-        self.info_text = scrolledtext.ScrolledText(info_frame, height=10, width=30)
-        self.info_text.pack(fill=tk.BOTH, expand=True)
+        # Строки вершин и рёбер подгружаются страницами при раскрытии разделов
+        self.info_panel = GraphInfoPanel(info_frame)
+        self.info_panel.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(info_frame, justify=tk.LEFT,
+                  text="Инструкция:\n"
+                       "1. Перетаскивание: режим 'Перетаскивание'\n"
+                       "2. Добавление рёбер: режим 'Добавление рёбер'\n"
+                       "3. Удаление рёбер: режим 'Удаление рёбер'").pack(anchor=tk.W, pady=(5, 0))
         self.update_graph_info()
 
     def load_sample_graph_negative_weights(self):
@@ -330,11 +407,18 @@ class GraphApp:
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill=tk.BOTH, expand=True)
 
+        view_frame = ttk.Frame(parent)
+        view_frame.grid(row=3, column=0, sticky="ew", pady=(5, 0))
+        ttk.Button(view_frame, text="Показать весь граф", command=self.reset_view).pack(side=tk.LEFT)
+        ttk.Button(view_frame, text="Уложить граф", command=self.layout_graph).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(view_frame, text="Колесо мыши — масштаб, правая кнопка или пустое место — сдвиг").pack(
+            side=tk.LEFT, padx=(10, 0))
+
         self.draw_graph()
 
     def create_algorithm_buttons(self, parent):
         algorithms = [
-            ("1. Компоненты сильной связности (Косарайю)", self.find_scc),
+            ("1. Компоненты сильной связности (Тарьян)", self.find_scc),
             ("2. Алгоритм Прима", self.prim_algorithm),
             ("3. Алгоритм A*", self.a_star_algorithm),
             ("4. Алгоритм Диница", self.dinic_algorithm),
@@ -345,12 +429,26 @@ class GraphApp:
             btn.grid(row=0, column=i, padx=2, sticky="ew")
             parent.grid_columnconfigure(i, weight=1)
 
+        # Фоновое вычисление: состояние и кооперативная отмена
+        self.cancel_button = ttk.Button(parent, text="Отменить вычисление", command=self.executor.cancel_all,
+                                        state=tk.DISABLED)
+        self.cancel_button.grid(row=1, column=0, sticky="ew", padx=2, pady=(3, 0))
+        self.job_status = tk.StringVar(value="")
+        ttk.Label(parent, textvariable=self.job_status).grid(row=1, column=1, sticky="w", padx=2, pady=(3, 0))
+
+        bidirectional_var = tk.BooleanVar(value=self.compare_bidirectional)
+        ttk.Checkbutton(parent, text="A*: сравнить с двунаправленным поиском", variable=bidirectional_var,
+                        command=lambda: setattr(self, "compare_bidirectional", bidirectional_var.get())).grid(
+            row=1, column=2, columnspan=3, sticky="w", padx=2, pady=(3, 0))
+
     def create_output_panel(self, parent):
         title_label = ttk.Label(parent, text="Результаты работы алгоритмов", font=("Arial", 14, "bold"))
         title_label.grid(row=0, column=0, pady=(0, 10), sticky="w")
 
         self.output_text = scrolledtext.ScrolledText(parent, height=12, width=100)
         self.output_text.grid(row=1, column=0, sticky="nsew")
+        # Трассировки алгоритмов пишутся пачками, когда Tk простаивает
+        self.output = BufferedOutput(self.root, self.output_text, max_lines=5000)
 
         button_frame = ttk.Frame(parent)
         button_frame.grid(row=2, column=0, sticky="e", pady=(5, 0))
@@ -381,90 +479,92 @@ class GraphApp:
         self.canvas.mpl_connect('button_press_event', self.on_press)
         self.canvas.mpl_connect('button_release_event', self.on_release)
         self.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        self.canvas.mpl_connect('scroll_event', self.on_scroll)
 
     def on_press(self, event):
         if event.inaxes is None:
             return
 
+        if event.button in (2, 3):
+            self._begin_pan(event)
+            return
+
         if self.mode == "drag":
-            for node, (x, y) in self.pos.items():
-                distance = np.sqrt((event.xdata - x) ** 2 + (event.ydata - y) ** 2)
-                if distance <= 1.5:
-                    self.drag_node = node
-                    self.drag_offset = (event.xdata - x, event.ydata - y)
-                    if node in self.node_patches:
-                        self.node_patches[node].set_color('orange')
-                        self.node_patches[node].set_alpha(0.9)
-                        self.canvas.draw_idle()
-                    return
+            # В режиме кластеров отдельные вершины не нарисованы и не перетаскиваются
+            node = None if self.clustered else self.spatial.nearest_node(event.xdata, event.ydata, 1.5)
+            if node is not None:
+                x, y = self.pos[node]
+                self.drag_node = node
+                self.drag_offset = (event.xdata - x, event.ydata - y)
+                if node in self.node_patches:
+                    self.node_patches[node].set_color('orange')
+                    self.node_patches[node].set_alpha(0.9)
+                self._begin_drag_blit(node)
+                return
+            # Клик по пустому месту сдвигает вид
+            self._begin_pan(event)
+            return
 
         elif self.mode == "edge":
-            for node, (x, y) in self.pos.items():
-                distance = np.sqrt((event.xdata - x) ** 2 + (event.ydata - y) ** 2)
-                if distance <= 1.5:
-                    if self.edge_start is None:
-                        self.edge_start = node
-                        self.highlight_node(node, 'lightgreen')
-                        self.ax.set_title(
-                            f"Режим добавления рёбер: начальная вершина '{node}', кликните на конечную вершину",
-                            fontsize=14, fontweight='bold')
-                    else:
-                        edge_end = node
-                        if self.edge_start == edge_end:
-                            messagebox.showwarning("Предупреждение", "Нельзя создать ребро из вершины в саму себя!")
-                            self.clear_edge_selection()
-                            return
-                        weight = self.ask_edge_weight(edge_end)
-                        if weight is None:
-                            self.clear_edge_selection()
-                            return
-                        self.graph.add_edge(self.edge_start, edge_end, weight=weight)
-                        self.update_graph_info()
-                        self.draw_graph()
+            node = self.spatial.nearest_node(event.xdata, event.ydata, 1.5)
+            if node is not None:
+                if self.edge_start is None:
+                    self.edge_start = node
+                    self.highlight_node(node, 'lightgreen')
+                    self.ax.set_title(
+                        f"Режим добавления рёбер: начальная вершина '{node}', кликните на конечную вершину",
+                        fontsize=14, fontweight='bold')
+                else:
+                    edge_end = node
+                    if self.edge_start == edge_end:
+                        messagebox.showwarning("Предупреждение", "Нельзя создать ребро из вершины в саму себя!")
                         self.clear_edge_selection()
-                    self.canvas.draw_idle()
-                    return
+                        return
+                    weight = self.ask_edge_weight(edge_end)
+                    if weight is None:
+                        self.clear_edge_selection()
+                        return
+                    self.add_edge_incremental(self.edge_start, edge_end, weight)
+                    self.clear_edge_selection()
+                self.canvas.draw_idle()
+                return
 
         elif self.mode == "delete_edge":
             clicked_edge = self.find_clicked_edge(event.xdata, event.ydata)
             if clicked_edge:
                 u, v = clicked_edge
-                self.graph.remove_edge(u, v)
+                self.remove_edge_incremental(u, v)
                 self.print_output(f"Ребро {u} → {v} удалено.")
-                self.update_graph_info()
-                self.draw_graph()
                 return
 
-            for node, (x, y) in self.pos.items():
-                distance = np.sqrt((event.xdata - x) ** 2 + (event.ydata - y) ** 2)
-                if distance <= 1.5:
-                    if self.edge_start is None:
-                        self.edge_start = node
-                        self.highlight_node(node, 'salmon')
-                        self.ax.set_title(
-                            f"Выбрана вершина '{node}'. Кликните на вторую вершину для удаления ребра.",
-                            fontsize=14, fontweight='bold')
-                    else:
-                        if self.edge_start == node:
-                            self.clear_edge_selection()
-                            return
-                        removed = False
-                        if self.graph.has_edge(self.edge_start, node):
-                            self.graph.remove_edge(self.edge_start, node)
-                            self.print_output(f"Ребро {self.edge_start} → {node} удалено.")
-                            removed = True
-                        elif self.graph.has_edge(node, self.edge_start):
-                            self.graph.remove_edge(node, self.edge_start)
-                            self.print_output(f"Ребло {node} → {self.edge_start} удалено.")
-                            removed = True
-                        else:
-                            messagebox.showinfo("Информация", f"Ребро между {self.edge_start} и {node} не найдено.")
-                        self.update_graph_info()
-                        self.draw_graph()
+            node = self.spatial.nearest_node(event.xdata, event.ydata, 1.5)
+            if node is not None:
+                if self.edge_start is None:
+                    self.edge_start = node
+                    self.highlight_node(node, 'salmon')
+                    self.ax.set_title(
+                        f"Выбрана вершина '{node}'. Кликните на вторую вершину для удаления ребра.",
+                        fontsize=14, fontweight='bold')
+                else:
+                    if self.edge_start == node:
                         self.clear_edge_selection()
                         return
+                    removed = False
+                    if self.graph.has_edge(self.edge_start, node):
+                        self.remove_edge_incremental(self.edge_start, node)
+                        self.print_output(f"Ребро {self.edge_start} → {node} удалено.")
+                        removed = True
+                    elif self.graph.has_edge(node, self.edge_start):
+                        self.remove_edge_incremental(node, self.edge_start)
+                        self.print_output(f"Ребло {node} → {self.edge_start} удалено.")
+                        removed = True
+                    else:
+                        messagebox.showinfo("Информация", f"Ребро между {self.edge_start} и {node} не найдено.")
+                    self.clear_edge_selection()
                     self.canvas.draw_idle()
                     return
+                self.canvas.draw_idle()
+                return
 
     def ask_edge_weight(self, edge_end):
         """
@@ -540,7 +640,7 @@ class GraphApp:
 
     def clear_edge_selection(self):
         if self.edge_start and self.edge_start in self.node_patches:
-            self.node_patches[self.edge_start].set_color('lightblue')
+            self.node_patches[self.edge_start].set_color(self.node_colors.get(self.edge_start, 'lightblue'))
             self.node_patches[self.edge_start].set_alpha(0.8)
         self.edge_start = None
         if self.mode == "edge":
@@ -552,17 +652,30 @@ class GraphApp:
         self.ax.set_title(title, fontsize=14, fontweight='bold')
 
     def on_release(self, event):
+        if self._pan_start is not None:
+            self._pan_start = None
+            self._apply_view()
+            return
+
         if self.mode == "drag" and self.drag_node:
             if self.drag_node in self.node_patches:
-                self.node_patches[self.drag_node].set_color('lightblue')
+                self.node_patches[self.drag_node].set_color(self.node_colors.get(self.drag_node, 'lightblue'))
                 self.node_patches[self.drag_node].set_alpha(0.8)
-            # Обновляем граф, чтобы рёбра "догнали" вершину
-            self.draw_graph()
+            # Финальная позиция: кадр мог быть пропущен ограничителем частоты
+            self._move_node_artists(self.drag_node)
+            self._end_drag_blit()
+            self.drag_node = None
+            # Вершина могла притянуть в окно рёбра, которые до этого были отсечены
+            self._sync_viewport()
 
         self.drag_node = None
         self.drag_offset = (0, 0)
 
     def on_motion(self, event):
+        if self._pan_start is not None:
+            self._pan_to(event)
+            return
+
         if self.mode == "drag" and self.drag_node and event.inaxes:
             new_x = event.xdata - self.drag_offset[0]
             new_y = event.ydata - self.drag_offset[1]
@@ -572,37 +685,181 @@ class GraphApp:
             new_x = max(x_min + margin, min(x_max - margin, new_x))
             new_y = max(y_min + margin, min(y_max - margin, new_y))
             self.pos[self.drag_node] = (new_x, new_y)
+            self.spatial.move_node(self.drag_node, new_x, new_y)
 
-            if self.drag_node in self.node_patches:
-                self.node_patches[self.drag_node].center = (new_x, new_y)
-            if self.drag_node in self.node_labels:
-                self.node_labels[self.drag_node].set_position((new_x, new_y))
+            # Не чаще 60 кадров в секунду; промежуточные события только двигают позицию
+            now = time.perf_counter()
+            if now - self._last_drag_frame < 1 / 60:
+                return
+            self._last_drag_frame = now
+
+            self._move_node_artists(self.drag_node)
+            self._blit_drag_frame()
+
+    def _begin_drag_blit(self, node):
+        """
+        Готовит blit-перетаскивание: вершина и инцидентные рёбра помечаются
+        animated, остальная сцена рисуется один раз и сохраняется как фон.
+        """
+        incident = list(self.graph.in_edges(node)) + list(self.graph.out_edges(node))
+        # Отсечённые рёбра вершины дорисовываются: их видно, пока вершину тащат по окну
+        drawn = self._drawn_edges()
+        missing = [edge for edge in incident if edge not in drawn]
+        if self.edge_layer is not None:
+            self.edge_layer.add_edges(missing, {edge: self.graph.edges[edge].get('weight', 1.0)
+                                                for edge in missing}, self.pos)
+        else:
+            for u, v in missing:
+                self._add_edge_artists(u, v, self.graph.edges[u, v].get('weight', 1.0))
+
+        artists = [self.node_patches.get(node), self.node_labels.get(node)]
+        for edge in incident:
+            artists.append(self.edge_lines.get(edge))
+            artists.append(self.edge_labels.get(edge))
+            if self.edge_layer is not None:
+                artists.append(self.edge_layer.labels.get(edge))
+        if self.edge_layer is not None:
+            artists.extend(self.edge_layer.artists[:2 if self.edge_layer.directed else 1])
+        self._drag_artists = [artist for artist in artists if artist is not None]
+
+        if not getattr(self.canvas, 'supports_blit', False):
+            self._drag_background = None
+            self.canvas.draw_idle()
+            return
+
+        for artist in self._drag_artists:
+            artist.set_animated(True)
+        self.canvas.draw()
+        self._drag_background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._last_drag_frame = 0.0
+        self._blit_drag_frame()
 
+    def _blit_drag_frame(self):
+        if self._drag_background is None:
             self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._drag_background)
+        for artist in self._drag_artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def _end_drag_blit(self):
+        for artist in self._drag_artists:
+            artist.set_animated(False)
+        self._drag_artists = []
+        self._drag_background = None
+        self.canvas.draw_idle()
+
+    # === Область видимости: масштаб, сдвиг и отсечение ===
+    # Рисуются только вершины и рёбра внутри self.view (с запасом); при сдвиге
+    # вида добавляются вошедшие в окно артисты и снимаются ушедшие далеко за край.
+
+    def on_scroll(self, event):
+        if event.inaxes is None:
+            return
+        factor = 1 / 1.2 if event.button == 'up' else 1.2
+        x_min, x_max, y_min, y_max = self.view
+        span = x_max - x_min
+        if not 2.0 <= span * factor <= 5000.0:
+            return
+        # Точка под курсором остаётся на месте
+        cx, cy = event.xdata, event.ydata
+        self.view = [cx - (cx - x_min) * factor, cx + (x_max - cx) * factor,
+                     cy - (cy - y_min) * factor, cy + (y_max - cy) * factor]
+        self._apply_view()
+
+    def _begin_pan(self, event):
+        self._pan_start = (event.x, event.y, list(self.view), px_per_unit(self.ax))
+
+    def _pan_to(self, event):
+        if event.x is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_pan_frame < 1 / 60:
+            return
+        self._last_pan_frame = now
+        x0, y0, view, scale = self._pan_start
+        dx = (event.x - x0) / scale
+        dy = (event.y - y0) / scale
+        self.view = [view[0] - dx, view[1] - dx, view[2] - dy, view[3] - dy]
+        self._apply_view()
+
+    def reset_view(self):
+        """Вписывает все вершины в окно"""
+        self._fit_view()
+        self.draw_graph()
+
+    def _fit_view(self):
+        if not self.pos:
+            self.view = [-12.0, 12.0, -12.0, 12.0]
+        else:
+            xy = np.array(list(self.pos.values()), dtype=float)
+            (x_min, y_min), (x_max, y_max) = xy.min(axis=0), xy.max(axis=0)
+            half = float(max(x_max - x_min, y_max - y_min, 20.0)) / 2 + 2.0
+            cx, cy = float(x_min + x_max) / 2, float(y_min + y_max) / 2
+            self.view = [cx - half, cx + half, cy - half, cy + half]
+
+    def _set_view_limits(self):
+        self.ax.set_xlim(self.view[0], self.view[1])
+        self.ax.set_ylim(self.view[2], self.view[3])
+
+    def _visible_items(self, slack=0.0):
+        """Вершины и рёбра в окне; slack — дополнительный запас в долях ширины окна"""
+        x_min, x_max, y_min, y_max = self.view
+        pad = 1.5 + slack * (x_max - x_min)
+        rect = (x_min - pad, x_max + pad, y_min - pad, y_max + pad)
+        return set(self.spatial.nodes_in_rect(*rect)), self.spatial.edges_in_rect(*rect)
+
+    def _drawn_edges(self):
+        return set(self.edge_layer.index) if self.edge_layer is not None else set(self.edge_lines)
+
+    def _apply_view(self):
+        """Применяет self.view: полная перерисовка, только если сменился уровень детализации"""
+        self._set_view_limits()
+        if not self.graph.nodes():
+            self.canvas.draw_idle()
+            return
+        nodes, edges = self._visible_items()
+        detail = self.lod.decide(len(nodes), len(edges), px_per_unit(self.ax))
+        if detail != self.detail or (self.edge_layer is None and len(edges) > EDGE_COLLECTION_THRESHOLD):
+            self.draw_graph()
+            return
+        self._sync_viewport()
+        self.canvas.draw_idle()
+
+    def _sync_viewport(self):
+        """Дорисовывает вошедшие в окно вершины и рёбра, снимает ушедшие за запас"""
+        if self.clustered or not self.graph.nodes():
+            return
+        nodes, edges = self._visible_items()
+        keep_nodes, keep_edges = self._visible_items(slack=0.5)
+        pinned = (self.drag_node, self.edge_start)
+        for node in [node for node in self.node_patches if node not in keep_nodes and node not in pinned]:
+            self._remove_node_artists(node)
+        for node in nodes:
+            if node not in self.node_patches:
+                self._add_node_artists(node)
+
+        drawn = self._drawn_edges()
+        gone = [edge for edge in drawn if edge not in keep_edges]
+        new = [edge for edge in edges if edge not in drawn]
+        if self.edge_layer is not None:
+            self.edge_layer.remove_edges(gone)
+            self.edge_layer.add_edges(new, {edge: self.graph.edges[edge].get('weight', 1.0) for edge in new},
+                                      self.pos)
+            return
+        for u, v in gone:
+            self._remove_edge_artists(u, v)
+        for u, v in new:
+            self._add_edge_artists(u, v, self.graph.edges[u, v].get('weight', 1.0))
 
     def find_clicked_edge(self, x_click, y_click, threshold=1.0):
-        if not hasattr(self, 'edge_lines') or not self.graph.edges():
+        if not self.graph.edges():
             return None
-        min_dist = float('inf')
-        closest_edge = None
-        for (u, v) in self.graph.edges():
-            x1, y1 = self.pos[u]
-            x2, y2 = self.pos[v]
-            dist = self.point_to_segment_distance(x_click, y_click, x1, y1, x2, y2)
-            if dist < min_dist and dist < threshold:
-                min_dist = dist
-                closest_edge = (u, v)
-        return closest_edge
+        return self.spatial.nearest_edge(x_click, y_click, threshold)
 
     def point_to_segment_distance(self, px, py, x1, y1, x2, y2):
-        line_vec = np.array([x2 - x1, y2 - y1])
-        point_vec = np.array([px - x1, py - y1])
-        line_len = np.dot(line_vec, line_vec)
-        if line_len == 0:
-            return np.linalg.norm(point_vec)
-        t = max(0, min(1, np.dot(point_vec, line_vec) / line_len))
-        projection = np.array([x1, y1]) + t * line_vec
-        return np.linalg.norm(np.array([px, py]) - projection)
+        return point_to_segment_distance(px, py, x1, y1, x2, y2)
 
     def add_vertex(self):
         vertex = self.vertex_entry.get().strip()
@@ -612,47 +869,164 @@ class GraphApp:
         if vertex in self.graph.nodes():
             messagebox.showwarning("Предупреждение", "Вершина уже существует!")
             return
-        self.graph.add_node(vertex)
+        self.model.add_node(vertex)
+        self._graph_changed()
+        if self.scc_index is not None:
+            self.scc_index.add_node(vertex)
         self.vertex_entry.delete(0, tk.END)
-        self.update_graph_info()
-        self.draw_graph()
+        self.info_panel.node_added(vertex)
+        if self.pos is None or self.graph.number_of_nodes() == 1 or self.clustered:
+            # Первая вершина: нужна полная перерисовка вместо надписи "Граф пуст"
+            self.draw_graph()
+            return
+        self._relax_around([vertex])
+        self._add_node_artists(vertex)
+        self.spatial.add_node(vertex, *self.pos[vertex])
+        self.canvas.draw_idle()
 
     def clear_graph(self):
         if messagebox.askyesno("Подтверждение", "Вы уверены, что хотите очистить граф?"):
             self.graph.clear()
-            self.pos = None
-            self.node_patches = {}
-            self.node_labels = {}
-            self.edge_start = None
-            self.drag_node = None
+            self._reset_scene()
             self.update_graph_info()
             self.draw_graph()
 
-    def update_graph_info(self):
-        self.info_text.delete(1.0, tk.END)
+    def _reset_scene(self):
+        """Сбрасывает позиции, выделение, вид и фоновую укладку перед новым графом"""
+        self.pos = None
+        self.node_patches = {}
+        self.node_labels = {}
+        self.node_colors = {}
+        self.edge_start = None
+        self.drag_node = None
+        self.view = [-12.0, 12.0, -12.0, 12.0]
+        if self._layout_job is not None:
+            self._layout_job.cancel()
+            self._layout_job = None
+
+    GRAPH_FILE_TYPES = [
+        ("Список рёбер", "*.txt *.edges *.el"),
+        ("CSV", "*.csv"),
+        ("DIMACS", "*.max *.gr *.sp *.dimacs"),
+        ("Все файлы", "*.*"),
+    ]
+
+    def open_graph_file(self):
+        path = filedialog.askopenfilename(title="Открыть граф", filetypes=self.GRAPH_FILE_TYPES)
+        if not path:
+            return
+        try:
+            arrays = read_graph(path)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось прочитать файл:\n{e}")
+            return
+        self.graph = to_networkx(arrays)
+        self._reset_scene()
+        self.update_graph_info()
+        self.draw_graph()
+        self.print_output(f"Загружен граф из {os.path.basename(path)}: {arrays.n} вершин, {arrays.m} рёбер")
+        if "source" in arrays.meta or "sink" in arrays.meta:
+            self.print_output(f"Исток: {arrays.meta.get('source')}, сток: {arrays.meta.get('sink')}")
+
+    def generate_graph(self):
+        """Заменяет граф сгенерированным графом выбранного семейства"""
+        params = self.generator_dialog()
+        if params is None:
+            return
+        family, n, seed = params
+        start = time.perf_counter()
+        arrays, xy = generate(family, n, seed)
+        self.graph, pos = to_editor_graph(arrays, xy)
+        self._reset_scene()
+        self.pos = pos
+        self._fit_view()
+        self.update_graph_info()
+        self.draw_graph()
+        self.print_output(f"✅ {family}: {arrays.n} вершин, {arrays.m} рёбер (seed={seed}, "
+                          f"{time.perf_counter() - start:.2f} с)")
+        if arrays.meta:
+            self.print_output(f"Исток: {arrays.meta['source']}, сток: {arrays.meta['sink']}")
+
+    def generator_dialog(self):
+        """Диалог выбора семейства, примерного числа вершин и seed"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Генератор графов")
+        dialog.geometry("340x260")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        ttk.Label(dialog, text="Семейство:", font=("Arial", 11)).pack(pady=(10, 0))
+        combo = ttk.Combobox(dialog, values=list(FAMILIES), state="readonly", width=30)
+        combo.pack(pady=5)
+        combo.current(0)
+
+        fields = ttk.Frame(dialog)
+        fields.pack(pady=5)
+        n_var = tk.StringVar(value="1000")
+        seed_var = tk.StringVar(value="0")
+        ttk.Label(fields, text="Вершин (примерно):").grid(row=0, column=0, sticky="w", pady=2)
+        ttk.Entry(fields, textvariable=n_var, width=10).grid(row=0, column=1, padx=5)
+        ttk.Label(fields, text="Seed:").grid(row=1, column=0, sticky="w", pady=2)
+        ttk.Entry(fields, textvariable=seed_var, width=10).grid(row=1, column=1, padx=5)
+
+        result = {"params": None}
+
+        def on_ok():
+            try:
+                n, seed = int(n_var.get()), int(seed_var.get())
+                if n < 2:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Ошибка", "Число вершин — целое не меньше 2, seed — целое!", parent=dialog)
+                return
+            result["params"] = (combo.get(), n, seed)
+            dialog.destroy()
+
+        def on_cancel():
+            dialog.destroy()
+
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(pady=15)
+        ttk.Button(button_frame, text="OK", command=on_ok, width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Отмена", command=on_cancel, width=10).pack(side=tk.LEFT, padx=5)
+
+        dialog.update_idletasks()
+        x = self.root.winfo_x() + (self.root.winfo_width() - dialog.winfo_width()) // 2
+        y = self.root.winfo_y() + (self.root.winfo_height() - dialog.winfo_height()) // 2
+        dialog.geometry(f"+{x}+{y}")
+        dialog.bind('<Return>', lambda e: on_ok())
+        dialog.bind('<Escape>', lambda e: on_cancel())
+
+        self.root.wait_window(dialog)
+        return result["params"]
+
+    def save_graph_file(self):
         if not self.graph.nodes():
-            self.info_text.insert(tk.END, "Граф пуст")
+            messagebox.showwarning("Предупреждение", "Граф пуст!")
             return
-        self.info_text.insert(tk.END, "Вершины:\n")
-        vertices = list(self.graph.nodes())
-        for i, v in enumerate(vertices):
-            self.info_text.insert(tk.END, f"  {v}")
-            if (i + 1) % 5 == 0:
-                self.info_text.insert(tk.END, "\n")
-            elif i != len(vertices) - 1:
-                self.info_text.insert(tk.END, ", ")
-        self.info_text.insert(tk.END, "\n\nРёбра:\n")
-        for u, v, data in self.graph.edges(data=True):
-            weight = data.get('weight', 1.0)
-            self.info_text.insert(tk.END, f"  {u} → {v} (вес: {weight})\n")
-        self.info_text.insert(tk.END, f"\nВсего вершин: {self.graph.number_of_nodes()}\n")
-        self.info_text.insert(tk.END, f"Всего рёбер: {self.graph.number_of_edges()}\n")
-        self.info_text.insert(tk.END, "\nИнструкция:\n")
-        self.info_text.insert(tk.END, "1. Перетаскивание: режим 'Перетаскивание'\n")
-        self.info_text.insert(tk.END, "2. Добавление рёбер: режим 'Добавление рёбер'\n")
-        self.info_text.insert(tk.END, "3. Удаление рёбер: режим 'Удаление рёбер'\n")
-
-    def _draw_graph_on_ax(self, ax, graph, pos, title="", show_order=None):
+        path = filedialog.asksaveasfilename(title="Сохранить граф", defaultextension=".txt",
+                                            filetypes=self.GRAPH_FILE_TYPES)
+        if not path:
+            return
+        try:
+            write_graph(path, self.graph)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл:\n{e}")
+            return
+        self.print_output(f"Граф сохранён в {os.path.basename(path)}")
+
+    def update_graph_info(self):
+        """Полная пересборка панели; одиночные правки идут через info_panel.*_added/_removed"""
+        self._graph_changed()
+        self.scc_index = None
+        self.model.reset(self.graph)
+        self.info_panel.set_graph(self.graph)
+
+    def _graph_changed(self):
+        """Любая правка графа: кэши, зависящие от рёбер и весов, становятся недействительными"""
+        self.graph_version += 1
+
+    def _draw_graph_on_ax(self, ax, graph, pos, title="", show_order=None, edge_colors=None, edge_widths=None):
         ax.clear()
         if not graph.nodes():
             ax.text(0.5, 0.5, "Граф пуст", ha='center', va='center')
@@ -660,44 +1034,45 @@ class GraphApp:
             return
 
         is_directed = graph.is_directed()
+        ax.set_xlim(-12, 12)
+        ax.set_ylim(-12, 12)
+        detail = self.lod.decide(graph.number_of_nodes(), graph.number_of_edges(), px_per_unit(ax))
+        if detail["cluster"]:
+            index = {node: i for i, node in enumerate(pos)}
+            xy = np.array(list(pos.values()), dtype=float)
+            pairs = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+            draw_clusters(ax, xy, pairs[:, 0], pairs[:, 1], self.lod)
+            ax.set_title(title, fontsize=12, fontweight='bold')
+            ax.set_axis_off()
+            ax.set_aspect('equal')
+            return
 
-        #ребра
+        #ребра: все отрезки одной коллекцией, петли — отдельными окружностями
+        edges = []
+        weights = []
         for u, v, data in graph.edges(data=True):
-            x1, y1 = pos[u]
-            x2, y2 = pos[v]
-            dx, dy = x2 - x1, y2 - y1
-            length = np.hypot(dx, dy)
-            shrink = 1.1 if length > 0 else 0
-
-            if length > 0:
-                if is_directed:
-                    x2_adj = x1 + dx * (length - shrink) / length
-                    y2_adj = y1 + dy * (length - shrink) / length
-                    ax.annotate("", xy=(x2_adj, y2_adj), xytext=(x1, y1),
-                                arrowprops=dict(arrowstyle="->", color='gray', linewidth=1.5),
-                                annotation_clip=False)
-                else:
-                    ax.plot([x1, x2], [y1, y2], color='gray', linewidth=1.5, alpha=0.8)
-            else:
+            if u == v:
                 #петля для прикола
+                x1, y1 = pos[u]
                 circle = plt.Circle((x1, y1), radius=1.5, color='gray', fill=False, linewidth=1.5)
                 ax.add_patch(circle)
+                continue
+            edges.append((u, v))
+            weights.append(data.get('weight', 1.0))
 
-            # Подпись веса
-            weight = data.get('weight', 1.0)
-            mid_x = (x1 + x2) / 2
-            mid_y = (y1 + y2) / 2
-            offset_x = -0.4 * dy / (length + 1e-6)
-            offset_y = 0.4 * dx / (length + 1e-6)
-            ax.text(mid_x + offset_x, mid_y + offset_y, f"{weight:.1f}",
-                    fontsize=10, ha='center', va='center',
-                    bbox=dict(boxstyle="round,pad=0.3", facecolor="white", edgecolor="gray", alpha=0.7))
+        layer = EdgeLayer(ax, directed=is_directed)
+        layer.set_edges(edges, pos, weights=weights,
+                        colors=[edge_colors.get(e, 'gray') for e in edges] if edge_colors else None,
+                        linewidths=[edge_widths.get(e, 1.5) for e in edges] if edge_widths else None,
+                        label_bbox=LABEL_BBOX if detail["label_bbox"] else None,
+                        show_labels=detail["edge_labels"], show_heads=detail["arrows"])
 
         #вершины
         for node, (x, y) in pos.items():
             circle = plt.Circle((x, y), radius=1.1, color='lightblue', alpha=0.8, ec='black', linewidth=2)
             ax.add_patch(circle)
-            ax.text(x, y, node, fontsize=9, fontweight='bold', ha='center', va='center')
+            if detail["node_labels"]:
+                ax.text(x, y, node, fontsize=9, fontweight='bold', ha='center', va='center')
             if show_order and node in show_order:
                 order_num = show_order[node]
                 ax.text(x, y + 1.3, f"{order_num}", fontsize=11, color='red', weight='bold')
@@ -713,10 +1088,14 @@ class GraphApp:
         self.ax.clear()
         self.node_patches = {}
         self.node_labels = {}
+        self.node_colors = {}
         self.edge_lines = {}
         self.edge_labels = {}
+        self.edge_layer = None
+        self.clustered = False
 
         if not self.graph.nodes():
+            self.spatial.rebuild({})
             self.ax.text(0.5, 0.5, "Граф пуст", ha='center', va='center', fontsize=12)
             self.ax.set_xlim(-10, 10)
             self.ax.set_ylim(-10, 10)
@@ -725,55 +1104,24 @@ class GraphApp:
             return
 
         if self.pos is None:
-            self.pos = nx.spring_layout(self.graph, seed=42, k=5.0, iterations=50)
-            for node in self.pos:
-                x, y = self.pos[node]
-                self.pos[node] = (x * 8, y * 8)
+            self.relayout()
+            self._fit_view()
         else:
-            for node in self.graph.nodes():
-                if node not in self.pos:
-                    self.pos[node] = (np.random.uniform(-9, 9), np.random.uniform(-9, 9))
-
-        # Рисуем рёбра
-        for u, v, data in self.graph.edges(data=True):
-            x1, y1 = self.pos[u]
-            x2, y2 = self.pos[v]
-            dx = x2 - x1
-            dy = y2 - y1
-            length = np.sqrt(dx * dx + dy * dy)
-            if length > 0:
-                shrink = 1.1
-                x2_adj = x1 + dx * (length - shrink) / length
-                y2_adj = y1 + dy * (length - shrink) / length
-            else:
-                x2_adj, y2_adj = x2, y2
-
-            arrow = self.ax.annotate("",
-                                     xy=(x2_adj, y2_adj),
-                                     xytext=(x1, y1),
-                                     arrowprops=dict(arrowstyle="->", color='gray', linewidth=1.5),
-                                     annotation_clip=False
-                                     )
-            self.edge_lines[(u, v)] = arrow
-
-            weight = data.get('weight', 1.0)
-            mid_x = (x1 + x2) / 2
-            mid_y = (y1 + y2) / 2
-            offset_x = -0.4 * dy / (length + 1e-6)
-            offset_y = 0.4 * dx / (length + 1e-6)
-            label = self.ax.text(mid_x + offset_x, mid_y + offset_y, f"{weight:.1f}",
-                                 fontsize=10, ha='center', va='center',
-                                 bbox=dict(boxstyle="round,pad=0.3", facecolor="white", edgecolor="gray", alpha=0.7)
-                                 )
-            self.edge_labels[(u, v)] = label
-
-        # Рисуем вершины
-        for node, (x, y) in self.pos.items():
-            circle = plt.Circle((x, y), radius=1.1, color='lightblue', alpha=0.8, ec='black', linewidth=2)
-            self.node_patches[node] = circle
-            self.ax.add_patch(circle)
-            label = self.ax.text(x, y, node, fontsize=9, fontweight='bold', ha='center', va='center')
-            self.node_labels[node] = label
+            missing = [node for node in self.graph.nodes() if node not in self.pos]
+            if missing:
+                self.relayout(missing)
+        self.spatial.rebuild(self.pos, self.graph.edges())
+
+        self._set_view_limits()
+        nodes, edges = self._visible_items()
+        self.detail = self.lod.decide(len(nodes), len(edges), px_per_unit(self.ax))
+        if self.detail["cluster"]:
+            self._draw_clustered()
+        else:
+            # Рисуем только попавшее в окно
+            self._draw_editor_edges(edges)
+            for node in nodes:
+                self._add_node_artists(node)
 
         # Заголовок
         if self.mode == "edge":
@@ -789,19 +1137,261 @@ class GraphApp:
         self.ax.set_title(title, fontsize=14, fontweight='bold')
 
         self.ax.set_axis_off()
-        self.ax.set_xlim(-12, 12)
-        self.ax.set_ylim(-12, 12)
         self.ax.set_aspect('equal')
         self.ax.grid(True, linestyle='--', alpha=0.3)
-        self.ax.set_xticks(np.arange(-12, 13, 2))
-        self.ax.set_yticks(np.arange(-12, 13, 2))
         self.figure.tight_layout()
         self.canvas.draw()
 
+    def _draw_clustered(self):
+        """Слишком много вершин: рисуем агрегированные кластеры вместо отдельных артистов"""
+        self.clustered = True
+        index = {node: i for i, node in enumerate(self.graph.nodes())}
+        xy = np.array([self.pos[node] for node in index], dtype=float)
+        edges = np.array([(index[u], index[v]) for u, v in self.graph.edges()], dtype=np.int64).reshape(-1, 2)
+        draw_clusters(self.ax, xy, edges[:, 0], edges[:, 1], self.lod)
+
+    # === Укладка ===
+    # Тёплый старт из self.pos: новые вершины ставятся в центр масс соседей,
+    # затем релаксируется либо весь граф, либо только окрестность новых вершин.
+
+    def layout_graph(self):
+        if not self.graph.nodes():
+            return
+        self.relayout()
+        self.draw_graph()
+
+    def relayout(self, new_nodes=None):
+        """
+        Укладывает граф: new_nodes=None — весь граф, иначе двигаются только
+        new_nodes и их соседи. Небольшие графы укладываются сразу, большие —
+        в фоновом потоке, а до его завершения вершины стоят на стартовых
+        позициях. Идущую в фоне укладку всего графа правка не прерывает:
+        новые вершины только ставятся на стартовые места. Возвращает True,
+        если итоговые позиции уже в self.pos.
+        """
+        if self._layout_job is not None and (new_nodes is None or not self._layout_whole):
+            self._layout_job.cancel()
+            self._layout_job = None
+        nodes = list(self.graph.nodes())
+        if not nodes:
+            return True
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = np.array([(index[u], index[v]) for u, v in self.graph.edges()], dtype=np.int64).reshape(-1, 2)
+        src, dst = edges[:, 0], edges[:, 1]
+
+        pos = self.pos or {}
+        known = np.array([node in pos for node in nodes])
+        xy = np.array([pos.get(node, (0.0, 0.0)) for node in nodes], dtype=float)
+        xy = place_new_nodes(xy, known, src, dst, seed=42)
+        if new_nodes is None:
+            movable = None
+            options = dict(iterations=100)
+        else:
+            movable = neighbourhood(len(nodes), src, dst, np.array([index[node] for node in new_nodes]))
+            options = dict(iterations=30, temperature=3.0)
+        self.pos = dict(zip(nodes, map(tuple, xy.tolist())))
+        if self._layout_job is not None:
+            return False
+
+        if len(nodes) <= self.sync_layout_limit:
+            self._apply_layout(nodes, force_layout(xy, src, dst, movable, **options))
+            return True
+
+        self._layout_job = LayoutJob(xy, src, dst, movable, **options).start()
+        self._layout_nodes = nodes
+        self._layout_fit = not known.any()
+        self._layout_whole = new_nodes is None
+        self.print_output(f"Укладка {len(nodes)} вершин выполняется в фоне...")
+        self.root.after(100, self._poll_layout)
+        return False
+
+    def _apply_layout(self, nodes, xy):
+        for node, point in zip(nodes, xy.tolist()):
+            # Граф могли изменить, пока считалась укладка; перетаскиваемую вершину не трогаем
+            if node in self.graph and node != self.drag_node:
+                self.pos[node] = tuple(point)
+
+    def _poll_layout(self):
+        job = self._layout_job
+        if job is None:
+            return
+        if not job.done:
+            self.root.after(100, self._poll_layout)
+            return
+        self._layout_job = None
+        if job.error is not None:
+            self.print_output(f"Ошибка укладки: {job.error}")
+            return
+        self._apply_layout(self._layout_nodes, job.result)
+        if self._layout_fit:
+            self._fit_view()
+        self.draw_graph()
+        self.print_output("Укладка завершена.")
+
+    # === Инкрементальное обновление артистов ===
+    # node_patches/node_labels/edge_lines/edge_labels — сохранённая сцена:
+    # правки добавляют, удаляют или двигают только затронутые артисты.
+
+    def _edge_geometry(self, u, v):
+        """Начало и укороченный конец стрелки, позиция подписи веса"""
+        x1, y1 = self.pos[u]
+        x2, y2 = self.pos[v]
+        dx = x2 - x1
+        dy = y2 - y1
+        length = np.sqrt(dx * dx + dy * dy)
+        if length > 0:
+            shrink = 1.1
+            x2_adj = x1 + dx * (length - shrink) / length
+            y2_adj = y1 + dy * (length - shrink) / length
+        else:
+            x2_adj, y2_adj = x2, y2
+        mid_x = (x1 + x2) / 2
+        mid_y = (y1 + y2) / 2
+        offset_x = -0.4 * dy / (length + 1e-6)
+        offset_y = 0.4 * dx / (length + 1e-6)
+        return (x1, y1), (x2_adj, y2_adj), (mid_x + offset_x, mid_y + offset_y)
+
+    def _draw_editor_edges(self, edges):
+        """Рёбра редактора: annotate на ребро или один EdgeLayer для больших графов"""
+        edges = list(edges)
+        weights = [self.graph.edges[edge].get('weight', 1.0) for edge in edges]
+        if len(edges) > EDGE_COLLECTION_THRESHOLD:
+            self.edge_layer = EdgeLayer(self.ax)
+            # bbox у тысяч подписей matplotlib не умеет рисовать пачкой
+            self.edge_layer.set_edges(edges, self.pos, weights=weights, label_bbox=None,
+                                      show_labels=self.detail["edge_labels"],
+                                      show_heads=self.detail["arrows"])
+            return
+        for (u, v), weight in zip(edges, weights):
+            self._add_edge_artists(u, v, weight)
+
+    def _add_edge_artists(self, u, v, weight):
+        if self.edge_layer is not None:
+            self.edge_layer.add_edge(u, v, weight, self.pos)
+            return
+        self._remove_edge_artists(u, v)
+        start, end, label_pos = self._edge_geometry(u, v)
+        arrow = self.ax.annotate("",
+                                 xy=end,
+                                 xytext=start,
+                                 arrowprops=dict(arrowstyle="->" if self.detail["arrows"] else "-",
+                                                 color='gray', linewidth=1.5),
+                                 annotation_clip=False
+                                 )
+        # Стрелка annotate не наследует обрезку текста: режем по окну осей явно
+        arrow.arrow_patch.set_clip_box(self.ax.bbox)
+        self.edge_lines[(u, v)] = arrow
+        if not self.detail["edge_labels"]:
+            return
+        label = self.ax.text(*label_pos, f"{weight:.1f}",
+                             fontsize=10, ha='center', va='center', clip_on=True,
+                             bbox=LABEL_BBOX if self.detail["label_bbox"] else None
+                             )
+        self.edge_labels[(u, v)] = label
+
+    def _remove_edge_artists(self, u, v):
+        if self.edge_layer is not None:
+            self.edge_layer.remove_edge(u, v)
+            return
+        arrow = self.edge_lines.pop((u, v), None)
+        if arrow is not None:
+            arrow.remove()
+        label = self.edge_labels.pop((u, v), None)
+        if label is not None:
+            label.remove()
+
+    def _update_edge_artists(self, u, v):
+        if (u, v) not in self.edge_lines:
+            return
+        start, end, label_pos = self._edge_geometry(u, v)
+        arrow = self.edge_lines[(u, v)]
+        arrow.xy = end
+        arrow.set_position(start)
+        if (u, v) in self.edge_labels:
+            self.edge_labels[(u, v)].set_position(label_pos)
+
+    def _add_node_artists(self, node):
+        x, y = self.pos[node]
+        circle = plt.Circle((x, y), radius=1.1, color=self.node_colors.get(node, 'lightblue'), alpha=0.8,
+                            ec='black', linewidth=2)
+        self.node_patches[node] = circle
+        # add_artist вместо add_patch: границы осей заданы явно, пересчёт data limits не нужен
+        self.ax.add_artist(circle)
+        if self.detail["node_labels"]:
+            label = self.ax.text(x, y, node, fontsize=9, fontweight='bold', ha='center', va='center',
+                                 clip_on=True)
+            self.node_labels[node] = label
+
+    def _remove_node_artists(self, node):
+        patch = self.node_patches.pop(node, None)
+        if patch is not None:
+            patch.remove()
+        label = self.node_labels.pop(node, None)
+        if label is not None:
+            label.remove()
+
+    def _relax_around(self, nodes):
+        """
+        Тёплая укладка окрестности nodes после правки вместо случайных
+        координат: новые вершины встают к соседям, окрестность
+        релаксируется. У сдвинутых вершин переносятся артисты; новые
+        вершины (без позиции до вызова) рисует вызывающий код. В фоне
+        граф перерисуется целиком по готовности укладки.
+        """
+        before = self.pos
+        self.relayout(nodes)
+        for node, point in self.pos.items():
+            if node in before and before[node] != point:
+                self._move_node_artists(node)
+                self.spatial.move_node(node, *point)
+
+    def _move_node_artists(self, node):
+        """Переносит вершину и инцидентные ей рёбра в текущую позицию self.pos"""
+        x, y = self.pos[node]
+        if node in self.node_patches:
+            self.node_patches[node].center = (x, y)
+        if node in self.node_labels:
+            self.node_labels[node].set_position((x, y))
+        incident = list(self.graph.in_edges(node)) + list(self.graph.out_edges(node))
+        if self.edge_layer is not None:
+            self.edge_layer.update_edges(incident, self.pos)
+            return
+        for u, v in incident:
+            self._update_edge_artists(u, v)
+
+    def add_edge_incremental(self, u, v, weight):
+        self.model.add_edge(u, v, weight)
+        self._graph_changed()
+        if self.scc_index is not None:
+            self.scc_index.add_edge(u, v)
+        self.info_panel.edge_added(u, v, weight)
+        if self.clustered:
+            # Кластеры пересобираются целиком: отдельных артистов у рёбер нет
+            self.draw_graph()
+            return
+        self._add_edge_artists(u, v, weight)
+        self.spatial.add_edge(u, v)
+        self._relax_around([u, v])
+        self.canvas.draw_idle()
+
+    def remove_edge_incremental(self, u, v):
+        self.model.remove_edge(u, v)
+        self._graph_changed()
+        if self.scc_index is not None:
+            self.scc_index.remove_edge(u, v)
+        self.info_panel.edge_removed(u, v)
+        if self.clustered:
+            self.draw_graph()
+            return
+        self._remove_edge_artists(u, v)
+        self.spatial.remove_edge(u, v)
+        self.canvas.draw_idle()
+
     def clear_output(self):
-        self.output_text.delete(1.0, tk.END)
+        self.output.clear()
 
     def copy_output(self):
+        self.output.flush()
         output = self.output_text.get(1.0, tk.END).strip()
         if output:
             self.root.clipboard_clear()
@@ -809,82 +1399,108 @@ class GraphApp:
             messagebox.showinfo("Успех", "Текст скопирован в буфер обмена")
 
     def print_output(self, text):
-        self.output_text.insert(tk.END, text + "\n")
-        self.output_text.see(tk.END)
+        self.output.write(text)
+
+    def run_job(self, title, size, compute, finish):
+        """
+        compute(job) — расчёт без обращений к Tk и self.graph; для графов
+        больше sync_run_limit вершин идёт в фоновом потоке, и окно остаётся
+        отзывчивым. finish(результат compute) печатает и рисует в потоке Tk.
+        """
+        if self.executor.busy:
+            self.print_output("Дождитесь окончания текущего вычисления или отмените его.")
+            return
+        inline = size <= self.sync_run_limit
+        if not inline:
+            self.print_output(f"{title}: вычисление в фоне...")
+
+        def cancelled(job):
+            self.print_output(f"{title}: вычисление отменено.")
+
+        def failed(job):
+            # Трассировка в окно вывода: исключение поймано в Job и до обработчика Tk не дойдёт
+            self.print_output(f"{title}: ошибка — {job.error}")
+            self.print_output("".join(traceback.format_exception(job.error)).rstrip())
+
+        self.executor.submit(compute, title, on_done=lambda job: finish(job.result), on_cancel=cancelled,
+                             on_error=failed, inline=inline)
+
+    def _watch_jobs(self, executor):
+        """Кнопка отмены и строка состояния — для любой фоновой задачи, в том числе окон ExapApi"""
+        self.cancel_button.config(state=tk.NORMAL if executor.busy else tk.DISABLED)
+        self.job_status.set(executor.describe())
+
+    def _graph_changed_since(self, version, title) -> bool:
+        """Граф правили, пока шло фоновое вычисление: результат не рисуется поверх нового графа"""
+        if self.graph_version == version:
+            return False
+        self.print_output(f"{title}: граф изменился во время вычисления, результат не отображается.")
+        return True
 
     # === АЛГОРИТМЫ ===
 
     def find_scc(self):
         self.print_output("\n" + "=" * 60)
-        self.print_output("АЛГОРИТМ КОСАРАЙЮ: Компоненты сильной связности")
+        self.print_output("АЛГОРИТМ ТАРЬЯНА: Компоненты сильной связности")
         self.print_output("=" * 60)
         if not self.graph.nodes():
             self.print_output("Граф пуст!")
             return
 
-        # === Первый DFS ===
-        self.print_output("\n→ Первый DFS (исходный граф):")
-        visited = set()
-        order = []
-
-        def dfs1(node, depth=0):
-            visited.add(node)
-            self.print_output(f"  {'  ' * depth}Вход в {node}")
-            for neighbor in sorted(self.graph.successors(node)):
-                if neighbor not in visited:
-                    dfs1(neighbor, depth + 1)
-            order.append(node)
-            self.print_output(f"  {'  ' * depth}Выход из {node} → порядок {len(order)}")
-
-        for node in sorted(self.graph.nodes()):
-            if node not in visited:
-                dfs1(node)
-
-        self.print_output(f"\nПорядок завершения: {order}")
-        self.print_output(f"Обратный порядок для второго DFS: {list(reversed(order))}")
-
-        # === Транспонирование ===
-        transposed = self.graph.reverse()
-        self.print_output("\n Построен транспонированный граф")
-
-        # === Второй DFS ===
-        self.print_output("\n Второй DFS (транспонированный граф):")
-        visited.clear()
-        scc_components = []
-
-        def dfs2(node, component, depth=0):
-            visited.add(node)
-            component.append(node)
-            self.print_output(f"  {'  ' * depth}Посетили {node}")
-            for neighbor in sorted(transposed.successors(node)):
-                if neighbor not in visited:
-                    dfs2(neighbor, component, depth + 1)
-
-        for node in reversed(order):
-            if node not in visited:
-                component = []
-                self.print_output(f"\nНачало новой компоненты от {node}:")
-                dfs2(node, component)
-                scc_components.append(component)
-                self.print_output(f"Завершена компонента: {sorted(component)}")
+        if self.graph.number_of_nodes() > self.trace_limit:
+            self._find_scc_indexed()
+            return
+
+        solver = SCCSolver(self.model.compact(), trace=True)
+        solver.find_components()
+        scc_components = solver.labelled_components()
+
+        # === Протокол DFS ===
+        self.print_output("\n→ DFS (один проход, без транспонирования):")
+        self.print_output("\n".join(solver.protocol()))
 
         # === Вывод результата ===
-        self.print_output(f"\nНайдено компонент: {len(scc_components)}")
-        for i, comp in enumerate(scc_components, 1):
-            self.print_output(f"  Компонента {i}: {sorted(comp)}")
+        self.print_output("\n".join(solver.report(self.trace_limit)))
 
-        # === Визуализация в основном окне ===
+        # === Визуализация в основном окне и пошаговое окно ===
         self.visualize_scc(scc_components)
+        self.visualize_scc_step_by_step(scc_components, solver.order_map(), self.graph)
+
+    def _find_scc_indexed(self):
+        """Большой граф: без протокола, компоненты из инкрементального индекса"""
+        if self.scc_index is not None:
+            self.print_output("\n→ Компоненты из индекса, обновлённого при правках: пересчёт не нужен")
+            self._show_scc_index(self.scc_index)
+            return
+
+        compact = self.model.compact()
+        version = self.graph_version
+
+        def compute(job):
+            start = time.perf_counter()
+            return IncrementalSCC.from_compact(compact, job), time.perf_counter() - start
+
+        def finish(result):
+            index, seconds = result
+            if self.graph_version == version:
+                self.scc_index = index
+                self.print_output(f"\n→ Построен индекс компонент ({seconds:.2f} с); "
+                                  f"дальше он обновляется при правках рёбер")
+            else:
+                self.print_output(f"\n→ Компоненты посчитаны ({seconds:.2f} с), но граф за это время изменился: "
+                                  f"индекс не сохранён")
+            self._show_scc_index(index)
 
-        # === Пошаговое окно ===
-        # Создаём отображение порядка: node -> номер (1, 2, 3...)
-        order_map = {node: i + 1 for i, node in enumerate(reversed(order))}
-        self.visualize_scc_step_by_step(scc_components, order_map, transposed)
+        self.run_job("Компоненты сильной связности", compact.n, compute, finish)
 
+    def _show_scc_index(self, index):
+        self.print_output(f"  протокол обхода не выводится: вершин больше {self.trace_limit}")
+        self.print_output("\n".join(index.report(self.trace_limit)))
+        self.visualize_scc(index.components(), index.component_index())
 
-    def visualize_scc_step_by_step(self, scc_components, order_map, transposed_graph):
+    def visualize_scc_step_by_step(self, scc_components, order_map, graph):
         step_window = tk.Toplevel(self.root)
-        step_window.title("Алгоритм Косарайю — пошаговая визуализация")
+        step_window.title("Алгоритм Тарьяна — пошаговая визуализация")
         step_window.geometry("1500x700")
 
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6), dpi=100)
@@ -893,8 +1509,7 @@ class GraphApp:
 
         self._draw_graph_on_ax(ax1, self.graph, self.pos, "Исходный граф\n(красные цифры = порядок завершения DFS)",
                                order_map)
-        self._draw_graph_on_ax(ax2, transposed_graph, pos_trans,
-                               "Транспонированный граф\n(компоненты сильной связности)")
+        self._draw_graph_on_ax(ax2, graph, pos_trans, "Компоненты сильной связности")
 
         # Раскраска компонент на правом графе
         colors = plt.cm.tab10(np.linspace(0, 1, len(scc_components)))
@@ -911,7 +1526,9 @@ class GraphApp:
 
         # Легенда
         from matplotlib.patches import Patch
-        legend_elements = [Patch(facecolor=colors[i], label=f'Компонента {i + 1}') for i in range(len(scc_components))]
+        # Не больше 10 строк легенды: на больших графах компонент тысячи
+        legend_elements = [Patch(facecolor=colors[i], label=f'Компонента {i + 1}')
+                           for i in range(min(len(scc_components), 10))]
         ax2.legend(handles=legend_elements, loc='upper right', fontsize=9)
 
         canvas = FigureCanvasTkAgg(fig, step_window)
@@ -920,7 +1537,8 @@ class GraphApp:
         canvas.draw()
 
 
-    def visualize_scc(self, scc_components):
+    def visualize_scc(self, scc_components, component_of=None):
+        """component_of — номер компоненты каждой вершины, если он уже известен (IncrementalSCC)"""
         if not self.graph.nodes():
             return
         colors = plt.cm.tab10(np.linspace(0, 1, len(scc_components)))
@@ -929,56 +1547,40 @@ class GraphApp:
         self.node_labels = {}
         self.edge_lines = {}
         self.edge_labels = {}
+        self.edge_layer = None
+        self.clustered = False
+        self._set_view_limits()
+        nodes, edges = self._visible_items()
+        self.detail = self.lod.decide(len(nodes), len(edges), px_per_unit(self.ax))
+        if self.detail["cluster"]:
+            # Раскраска тысяч компонент в кластерном виде не читается — только сводка
+            self._draw_clustered()
+            self.ax.set_title(f"Компоненты сильной связности: {len(scc_components)}", fontsize=14, fontweight='bold')
+            self.ax.set_axis_off()
+            self.ax.set_aspect('equal')
+            self.figure.tight_layout()
+            self.canvas.draw()
+            return
 
         # Рёбра
-        for u, v, data in self.graph.edges(data=True):
-            x1, y1 = self.pos[u]
-            x2, y2 = self.pos[v]
-            dx = x2 - x1
-            dy = y2 - y1
-            length = np.sqrt(dx * dx + dy * dy)
-            if length > 0:
-                shrink = 1.1
-                x2_adj = x1 + dx * (length - shrink) / length
-                y2_adj = y1 + dy * (length - shrink) / length
-            else:
-                x2_adj, y2_adj = x2, y2
-            arrow = self.ax.annotate("", xy=(x2_adj, y2_adj), xytext=(x1, y1),
-                                     arrowprops=dict(arrowstyle="->", color='gray', linewidth=1.5),
-                                     annotation_clip=False)
-            self.edge_lines[(u, v)] = arrow
-            weight = data.get('weight', 1.0)
-            mid_x = (x1 + x2) / 2
-            mid_y = (y1 + y2) / 2
-            offset_x = -0.4 * dy / (length + 1e-6)
-            offset_y = 0.4 * dx / (length + 1e-6)
-            label = self.ax.text(mid_x + offset_x, mid_y + offset_y, f"{weight:.1f}",
-                                 fontsize=10, ha='center', va='center',
-                                 bbox=dict(boxstyle="round,pad=0.3", facecolor="white", edgecolor="gray", alpha=0.7))
-            self.edge_labels[(u, v)] = label
+        self._draw_editor_edges(edges)
 
-        # Вершины
-        node_to_color = {}
-        for i, comp in enumerate(scc_components):
-            for node in comp:
-                node_to_color[node] = colors[i]
-        for node, (x, y) in self.pos.items():
-            color = node_to_color.get(node, 'lightblue')
-            circle = plt.Circle((x, y), radius=1.1, color=color, alpha=0.8, ec='black', linewidth=2)
-            self.node_patches[node] = circle
-            self.ax.add_patch(circle)
-            label = self.ax.text(x, y, node, fontsize=9, fontweight='bold', ha='center', va='center')
-            self.node_labels[node] = label
+        # Вершины; раскраска остаётся в node_colors для вершин, которые войдут в окно при панорамировании
+        if component_of is None:
+            component_of = {node: i for i, comp in enumerate(scc_components) for node in comp}
+        self.node_colors = {node: colors[c] for node, c in component_of.items()}
+        for node in nodes:
+            self._add_node_artists(node)
 
         # Легенда
         from matplotlib.patches import Patch
-        legend_elements = [Patch(facecolor=colors[i], label=f'Компонента {i + 1}') for i in range(len(scc_components))]
+        # Не больше 10 строк легенды: на больших графах компонент тысячи
+        legend_elements = [Patch(facecolor=colors[i], label=f'Компонента {i + 1}')
+                           for i in range(min(len(scc_components), 10))]
         self.ax.legend(handles=legend_elements, loc='upper right')
 
         self.ax.set_title("Компоненты сильной связности", fontsize=14, fontweight='bold')
         self.ax.set_axis_off()
-        self.ax.set_xlim(-12, 12)
-        self.ax.set_ylim(-12, 12)
         self.ax.set_aspect('equal')
         self.ax.grid(True, linestyle='--', alpha=0.3)
         self.figure.tight_layout()
@@ -1040,124 +1642,53 @@ class GraphApp:
             self.print_output("Граф состоит из одной вершины. MST не содержит рёбер.")
             return
 
-        # Построение неориентированной весовой матрицы
-        node_to_idx = {node: i for i, node in enumerate(nodes)}
-        idx_to_node = {i: node for node, i in node_to_idx.items()}
-        INF = float('inf')
-        adj_matrix = [[INF] * n for _ in range(n)]
-
-        for u, v, data in self.graph.edges(data=True):
-            i, j = node_to_idx[u], node_to_idx[v]
-            weight = data.get('weight', 1.0)
-            if weight < adj_matrix[i][j]:
-                adj_matrix[i][j] = weight
-                adj_matrix[j][i] = weight  # симметрия для неориентированного графа
-
-        # Проверка связности
-        visited = set()
-        stack = [nodes[0]]
-        visited.add(nodes[0])
-        while stack:
-            u = stack.pop()
-            u_idx = node_to_idx[u]
-            for v_idx in range(n):
-                if adj_matrix[u_idx][v_idx] != INF and idx_to_node[v_idx] not in visited:
-                    visited.add(idx_to_node[v_idx])
-                    stack.append(idx_to_node[v_idx])
-
-        if len(visited) != n:
-            self.print_output("Ошибка: граф несвязный! Алгоритм Прима применим только к связным графам.")
-            return
+        # Неориентированная версия графа в списках смежности; протокол — только для небольших графов
+        trace = n <= self.trace_limit
+        graph = self.graph
+
+        def stored_weight(u, v, weight):
+            # Вес печатается так, как хранится у ребра (5 из файла, 5.0 из редактора). С протоколом
+            # решатель работает в потоке Tk, без него вызов идёт из finish после проверки версии графа
+            a, b = solver.labels[u], solver.labels[v]
+            stored = (graph.edges[e].get('weight', 1.0) for e in ((a, b), (b, a)) if graph.has_edge(*e))
+            return next((value for value in stored if value == weight), weight)
+
+        solver = MSTSolver(self.model.compact(), trace=trace, weight_of=stored_weight)
+        version = self.graph_version
+
+        def compute(job):
+            solver.job = job
+            if not solver.is_connected():
+                return False
+            solver.solve()
+            return True
+
+        def finish(connected):
+            if self._graph_changed_since(version, "Алгоритм Прима"):
+                return
+            if not connected:
+                self.print_output("Ошибка: граф несвязный! Алгоритм Прима применим только к связным графам.")
+                return
 
-        self.print_output("\n→ Граф корректен: связный, неориентированный, взвешенный.")
-        self.print_output(f"Вершины: {sorted(nodes)}")
-        self.print_output(f"Количество вершин: {n}")
-
-        #Инициализация
-        key = [INF] * n  # key[i] — минимальный вес ребра для подключения вершины i
-        frt = [-1] * n  # frt[i] — предок вершины i в MST (-1 = нет предка)
-        in_mst = [False] * n  # включена ли вершина в дерево
-
-        # Начинаем с первой вершины
-        start_idx = 0
-        key[start_idx] = 0
-        frt[start_idx] = -1
-
-        self.print_output(f"\n→ Инициализация:")
-        self.print_output(f"  Начальная вершина: {nodes[start_idx]}")
-        self.print_output(f"  key = {[f'{x:.1f}' if x != INF else '∞' for x in key]}")
-        self.print_output(
-            f"  ftr = {[(idx_to_node[i] if frt[i] != -1 else '—') if i < len(frt) else '?' for i in range(n)]}")
-        self.print_output(f"  in_mst = {in_mst}")
-
-        total_weight = 0
-        mst_edges = []
-        order_of_addition = {}
-
-        #Основной цикл
-        for step in range(n):
-            self.print_output(f"\n→ Шаг {step + 1}/{n}:")
-
-            # Найти u из Q с минимальным key[u]
-            u = -1
-            min_key = INF
-            for v in range(n):
-                if not in_mst[v] and key[v] < min_key:
-                    min_key = key[v]
-                    u = v
-
-            if u == -1:
-                self.print_output("Нет доступных вершин — остановка.")
-                break
-
-            # добавляем u в MST
-            in_mst[u] = True
-            total_weight += key[u]
-            current_vertex = idx_to_node[u]
-            order_of_addition[current_vertex] = step + 1
-
-            if frt[u] != -1:
-                parent_vertex = idx_to_node[frt[u]]
-                weight = adj_matrix[frt[u]][u]
-                mst_edges.append((parent_vertex, current_vertex, weight))
-                self.print_output(f"  Выбрана вершина: {current_vertex}")
-                self.print_output(f"  Добавлено ребро: {parent_vertex} — {current_vertex} (вес = {weight})")
-            else:
-                self.print_output(f"  Выбрана начальная вершина: {current_vertex}")
-
-            # Обновление ключей соседей
-            updated = []
-            for v in range(n):
-                if adj_matrix[u][v] != INF and not in_mst[v]:
-                    old_key = key[v]
-                    if adj_matrix[u][v] < key[v]:
-                        key[v] = adj_matrix[u][v]
-                        frt[v] = u
-                        updated.append((idx_to_node[v], old_key, key[v]))
-
-            # Вывод состояния после обновления
-            self.print_output(f"  Текущее дерево включает: {[idx_to_node[i] for i in range(n) if in_mst[i]]}")
-            self.print_output(f"  key = {[f'{x:.1f}' if x != INF else '∞' for x in key]}")
-            self.print_output(
-                f"  frt = {[(idx_to_node[frt[i]] if frt[i] != -1 else '—') if in_mst[i] or key[i] != INF else '—' for i in range(n)]}")
-            if updated:
-                self.print_output("  Обновлены ключи:")
-                for v_name, old_k, new_k in updated:
-                    old_str = f"{old_k:.1f}" if old_k != INF else "∞"
-                    self.print_output(f"    {v_name}: {old_str} → {new_k:.1f}")
+            self.print_output("\n→ Граф корректен: связный, неориентированный, взвешенный.")
+            if trace:
+                self.print_output(f"Вершины: {sorted(nodes)}")
+            self.print_output(f"Количество вершин: {n}")
+
+            if trace:
+                self.print_output("\n".join(solver.trace))
             else:
-                self.print_output("  Нет обновлений ключей.")
+                self.print_output(f"\n→ Метод по плотности графа: {solver.method_name()}; "
+                                  f"пошаговый протокол не выводится")
 
-        #
-        self.print_output(f"\n" + "-" * 50)
-        self.print_output("РЕЗУЛЬТАТ АЛГОРИТМА ПРИМА")
-        self.print_output("-" * 50)
-        self.print_output(f"Минимальное остовное дерево содержит {len(mst_edges)} рёбер:")
-        for i, (u, v, w) in enumerate(mst_edges, 1):
-            self.print_output(f"  {i}. {u} — {v} (вес = {w})")
-        self.print_output(f"\nОбщая стоимость MST: {total_weight:.2f}")
+            self.print_output(f"\n" + "-" * 50)
+            self.print_output("РЕЗУЛЬТАТ АЛГОРИТМА ПРИМА")
+            self.print_output("-" * 50)
+            self.print_output("\n".join(solver.report(self.trace_limit)))
+
+            self.visualize_mst_side_by_side(solver.labelled_edges(), solver.labelled_order())
 
-        self.visualize_mst_side_by_side(mst_edges, order_of_addition)
+        self.run_job("Алгоритм Прима", n, compute, finish)
 
     def a_star_algorithm(self):
         self.print_output("\n" + "=" * 60)
@@ -1200,96 +1731,72 @@ class GraphApp:
             self.visualize_a_star_path([start_node], start_node, goal_node, 0.0)
             return
 
+        trace = len(nodes) <= self.trace_limit
+        solver = AStarSolver.from_compact(self.model.compact(), self.pos, trace=trace)
+
         # Проверка на отрицательные веса
-        has_negative = any(data.get('weight', 1.0) < 0 for _, _, data in self.graph.edges(data=True))
+        has_negative = solver.has_negative_weights()
         if has_negative:
             self.print_output("Внимание: в графе есть рёбра с отрицательными весами.")
             self.print_output("   A* может не найти оптимальный путь!")
 
-        # Эвристика
-        def heuristic(node):
-            x1, y1 = self.pos[node]
-            x2, y2 = self.pos[goal_node]
-            return np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+        self.print_output(f"\n→ Поиск кратчайшего пути от '{start_node}' до '{goal_node}'")
+        index = solver.graph.index
+        start, goal = index[start_node], index[goal_node]
+        # ALT: на больших графах оценки по ориентирам точнее евклидовых с общим множителем
+        use_landmarks = len(nodes) >= self.landmark_min_nodes and not has_negative
+        version = self.graph_version
+        compare = self.compare_bidirectional
+
+        def compute(job):
+            solver.job = job
+            landmarks, built = None, False
+            if use_landmarks:
+                built = not self.landmark_cache.is_fresh(version)
+                landmarks = self.landmark_cache.get(version, solver.graph, job)
+            solver.search(start, goal, solver.heuristic_to(goal, landmarks))
+            runs = solver.compare_bidirectional(start, goal, landmarks) if compare else None
+            return landmarks, built, runs
+
+        def finish(result):
+            if self._graph_changed_since(version, "Алгоритм A*"):
+                return
+            landmarks, built, runs = result
+            if landmarks is not None:
+                if built:
+                    self.print_output(f"Построены ориентиры ALT: k={landmarks.k}, {landmarks.build_time:.2f} с, "
+                                      f"{landmarks.nbytes / 2 ** 20:.1f} МБ")
+                self.print_output(f"Эвристика h(v) = оценка по {landmarks.k} ориентирам до '{goal_node}'")
+            else:
+                self.print_output(f"Эвристика h(v) = {solver.euclidean_scale():.3g} × евклидово расстояние "
+                                  f"до '{goal_node}' (наименьшее отношение веса ребра к его длине)")
 
-        # Инициализация
-        g_score = {node: float('inf') for node in nodes}
-        f_score = {node: float('inf') for node in nodes}
-        parent = {node: None for node in nodes}
+            if trace:
+                self.print_output("\n".join(solver.protocol()))
+            else:
+                self.print_output(f"Пошаговый протокол не выводится: вершин больше {self.trace_limit}")
 
-        g_score[start_node] = 0
-        f_score[start_node] = heuristic(start_node)
+            if solver.found:
+                self.print_output("\n" + "-" * 50)
+                self.print_output("РЕЗУЛЬТАТ АЛГОРИТМА A*")
+                self.print_output("-" * 50)
+                self.print_output("\n".join(solver.report()))
 
-        open_set = set([start_node])
-        closed_set = set()
+                path = [solver.graph.labels[v] for v in solver.path]
+                self.visualize_a_star_path(path, start_node, goal_node, solver.cost)
+            else:
+                self.print_output("\nПуть не найден!")
+                self.print_output(f"Вершина '{goal_node}' недостижима из '{start_node}'.")
 
-        self.print_output(f"\n→ Поиск кратчайшего пути от '{start_node}' до '{goal_node}'")
-        self.print_output(f"Эвристика h(v) = евклидово расстояние до '{goal_node}'")
-        self.print_output("\n" + "-" * 80)
-        self.print_output(
-            f"{'Шаг':<4} | {'Текущая':<10} | {'g(текущей)':<10} | {'f(текущей)':<10} | {'Открытое множество (вершина: f)':<40}")
-        self.print_output("-" * 80)
-
-        step = 0
-        found = False
-
-        while open_set:
-            # Выбираем вершину с минимальным f_score
-            current = min(open_set, key=lambda node: f_score[node])
-            open_set.remove(current)
-            closed_set.add(current)
-
-            step += 1
-            current_f = f_score[current]
-            current_g = g_score[current]
-
-            open_str = ", ".join([f"{n}: {f_score[n]:.2f}" for n in sorted(open_set, key=lambda x: f_score[x])])
-            if not open_str:
-                open_str = "∅"
-
-            self.print_output(f"{step:<4} | {current:<10} | {current_g:<10.2f} | {current_f:<10.2f} | {open_str}")
-
-            if current == goal_node:
-                found = True
-                break
-
-            for neighbor in self.graph.successors(current):
-                if neighbor in closed_set:
-                    continue
-
-                weight = self.graph[current][neighbor].get('weight', 1.0)
-                tentative_g = g_score[current] + weight
-
-                if tentative_g < g_score[neighbor]:
-                    parent[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + heuristic(neighbor)
-                    open_set.add(neighbor)
-
-                    self.print_output(
-                        f"      → Обновление {neighbor}: g={tentative_g:.2f}, f={f_score[neighbor]:.2f} (через {current})")
-
-        if found:
-            path = []
-            current = goal_node
-            while current is not None:
-                path.append(current)
-                current = parent[current]
-            path.reverse()
-
-            total_cost = g_score[goal_node]
-
-            self.print_output("\n" + "-" * 50)
-            self.print_output("РЕЗУЛЬТАТ АЛГОРИТМА A*")
-            self.print_output("-" * 50)
-            self.print_output(f"Кратчайший путь: {' → '.join(path)}")
-            self.print_output(f"Стоимость пути: {total_cost:.2f}")
-            self.print_output(f"Количество шагов: {step}")
+            if runs is not None:
+                self.print_output("\n" + "-" * 50)
+                self.print_output("СРАВНЕНИЕ С ДВУНАПРАВЛЕННЫМ ПОИСКОМ")
+                self.print_output("-" * 50)
+                for title, run in runs:
+                    cost = f"{run.cost:.2f}" if run.found else "—"
+                    self.print_output(f"  {title:<28} раскрыто вершин: {run.expanded:<8} стоимость: {cost}")
 
-            self.visualize_a_star_path(path, start_node, goal_node, total_cost)
-        else:
-            self.print_output("\nПуть не найден!")
-            self.print_output(f"Вершина '{goal_node}' недостижима из '{start_node}'.")
+        self.run_job("Алгоритм A*", len(nodes), compute, finish)
 
     def select_vertex_dialog(self, title_text):
         """диалоговое окно для выбора пути"""
@@ -1344,46 +1851,20 @@ class GraphApp:
         # Левая панель: исходный граф
         self._draw_graph_on_ax(ax1, self.graph, pos, "Исходный граф")
 
-        # Правая панель: выделенный путь
-        self._draw_graph_on_ax(ax2, self.graph, pos, f"Путь A*: {start} → {goal}\nСтоимость: {cost:.2f}")
-
         # Множество рёбер пути (для ориентированного графа)
         path_edges = set()
         for i in range(len(path) - 1):
             path_edges.add((path[i], path[i + 1]))
 
-        # Перерисовываем рёбра: путь — жирный зелёный
-        for u, v, data in self.graph.edges(data=True):
-            x1, y1 = pos[u]
-            x2, y2 = pos[v]
-            dx, dy = x2 - x1, y2 - y1
-            length = np.hypot(dx, dy)
-            shrink = 1.1 if length > 0 else 0
-            if length > 0:
-                x2_adj = x1 + dx * (length - shrink) / length
-                y2_adj = y1 + dy * (length - shrink) / length
-            else:
-                x2_adj, y2_adj = x2, y2
-
-            color = 'green' if (u, v) in path_edges else 'gray'
-            linewidth = 3.0 if (u, v) in path_edges else 1.5
-            alpha = 1.0 if (u, v) in path_edges else 0.6
-
-            if self.graph.is_directed():
-                ax2.annotate("", xy=(x2_adj, y2_adj), xytext=(x1, y1),
-                             arrowprops=dict(arrowstyle="->", color=color, linewidth=linewidth, alpha=alpha))
-            else:
-                ax2.plot([x1, x2], [y1, y2], color=color, linewidth=linewidth, alpha=alpha)
-
-            # Подпись веса
-            weight = data.get('weight', 1.0)
-            mid_x = (x1 + x2) / 2
-            mid_y = (y1 + y2) / 2
-            offset_x = -0.4 * dy / (length + 1e-6)
-            offset_y = 0.4 * dx / (length + 1e-6)
-            ax2.text(mid_x + offset_x, mid_y + offset_y, f"{weight:.1f}",
-                     fontsize=10, ha='center', va='center',
-                     bbox=dict(boxstyle="round,pad=0.3", facecolor="white", edgecolor="none", alpha=0.8))
+        # Правая панель: путь — жирный зелёный, остальные рёбра бледнее
+        edge_colors = {}
+        edge_widths = {}
+        for u, v in self.graph.edges():
+            on_path = (u, v) in path_edges
+            edge_colors[(u, v)] = to_rgba('green', 1.0) if on_path else to_rgba('gray', 0.6)
+            edge_widths[(u, v)] = 3.0 if on_path else 1.5
+        self._draw_graph_on_ax(ax2, self.graph, pos, f"Путь A*: {start} → {goal}\nСтоимость: {cost:.2f}",
+                               edge_colors=edge_colors, edge_widths=edge_widths)
 
         # Вершины
         for node, (x, y) in pos.items():
@@ -1405,11 +1886,11 @@ class GraphApp:
         canvas.draw()
 
     def dinic_algorithm(self):
-        api = ExapApi(self.root, self.graph)
+        api = ExapApi(self.root, self.graph, self.executor, self.result_cache, self.model)
         api.dinic()
 
     def johnson_algorithm(self):
-        api = ExapApi(self.root, self.graph)
+        api = ExapApi(self.root, self.graph, self.executor, self.result_cache, self.model)
         api.johnson()
 
 
@@ -1417,6 +1898,9 @@ def main():
     root = tk.Tk()
     app = GraphApp(root)
     root.mainloop()
+    # Потоки пула не демоны: без отмены выход ждал бы конца расчёта
+    app.executor.shutdown()
+    app.result_cache.save()
 
 
 if __name__ == "__main__":
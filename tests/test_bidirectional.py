@@ -0,0 +1,66 @@
+"""
+Стоимости двунаправленного поиска против nx.dijkstra_path_length.
+
+Веса рёбер нарочно не следуют геометрии (часть рёбер много короче своей
+длины на плоскости): на таких графах неподправленная евклидова оценка
+недопустима.
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from exap_api.astar import AStarSolver
+from exap_api.astar.Bidirectional import BidirectionalSolver
+from exap_api.astar.landmarks import Landmarks
+
+
+def _random_case(seed):
+    rnd = random.Random(seed)
+    n = rnd.randint(2, 40)
+    graph = nx.gnm_random_graph(n, rnd.randint(n, 4 * n), directed=True, seed=seed)
+    graph = nx.relabel_nodes(graph, str)
+    for u, v in graph.edges:
+        graph.edges[u, v]["weight"] = rnd.choice([0.1, 1, 3, 50])
+    pos = {v: (rnd.uniform(0, 100), rnd.uniform(0, 100)) for v in graph}
+    return graph, pos, "0", str(n - 1)
+
+
+def _expected(graph, start, goal):
+    try:
+        return nx.dijkstra_path_length(graph, start, goal)
+    except nx.NetworkXNoPath:
+        return float("inf")
+
+
+def _path_cost(graph, path):
+    return sum(graph.edges[u, v]["weight"] for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("seed", range(60))
+@pytest.mark.parametrize("use_landmarks", [False, True])
+def test_compare_bidirectional_costs(seed, use_landmarks):
+    graph, pos, start_node, goal_node = _random_case(seed)
+    solver = AStarSolver.from_networkx(graph, pos)
+    index = solver.graph.index
+    start, goal = index[start_node], index[goal_node]
+    landmarks = Landmarks.build(solver.graph, k=4) if use_landmarks else None
+    solver.search(start, goal, solver.heuristic_to(goal, landmarks))
+
+    expected = _expected(graph, start_node, goal_node)
+    for title, run in solver.compare_bidirectional(start, goal, landmarks):
+        assert run.cost == pytest.approx(expected), title
+        if run.found:
+            path = [solver.graph.labels[v] for v in run.path]
+            assert _path_cost(graph, path) == pytest.approx(expected), title
+
+
+def test_inconsistent_bounds_fall_back_to_dijkstra():
+    # Кратчайший путь 0 -> 1 -> 2 стоит 2; завышенная оценка у вершины 1 уводит A* на ребро 0 -> 2
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([("0", "1", 1), ("1", "2", 1), ("0", "2", 10)])
+    solver = AStarSolver.from_networkx(graph, {"0": (0, 0), "1": (5, 5), "2": (10, 0)})
+    bidirectional = BidirectionalSolver(solver.graph)
+    bidirectional.search(0, 2, [0.0, 100.0, 0.0], [0.0, 0.0, 0.0])
+    assert bidirectional.fallback
+    assert bidirectional.cost == pytest.approx(2)